@@ -0,0 +1,76 @@
+"""
+Бенчмарк запуска аналитики при росте истории до 1 млн записей.
+
+Сравниваются загрузка агрегатов из таблицы analytics_rollup
+и прежний разбор всех записей analytics_messages при старте.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_analytics
+"""
+import os  # Работа с путями
+import tempfile  # Временная директория для базы
+import time  # Измерение интервалов
+from datetime import datetime  # Разбор временных меток
+
+from src.utils.analytics import Analytics
+from src.utils.cache import ChatCache
+
+SIZES = (10_000, 100_000, 1_000_000)  # Размеры истории для замеров
+MODELS = 50  # Число различных моделей
+
+
+def fill(cache: ChatCache, start: int, stop: int):
+    """Добавление записей аналитики с номерами [start, stop)."""
+    conn = cache.get_connection()
+    conn.executemany(
+        "INSERT INTO analytics_messages (timestamp, model, message_length, "
+        "response_time, tokens_used) VALUES (?, ?, ?, ?, ?)",
+        (
+            (f"2024-01-01 00:00:{i % 60:02d}.000000",
+             f"bench/model-{i % MODELS}", 100, 1.5, 10)
+            for i in range(start, stop)
+        )
+    )
+    conn.commit()
+    cache.rebuild_analytics_rollup()
+    cache.flush()
+
+
+def legacy_load(cache: ChatCache) -> list:
+    """Прежняя загрузка: разбор каждой записи истории."""
+    session_data = []
+    for timestamp, model, length, response_time, tokens in (
+            cache.get_analytics_history()):
+        session_data.append({
+            'timestamp': datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S.%f'),
+            'model': model,
+            'message_length': length,
+            'response_time': response_time,
+            'tokens_used': tokens
+        })
+    return session_data
+
+
+def measure(func) -> float:
+    """Время выполнения func в миллисекундах."""
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ChatCache(os.path.join(tmp, "bench.db"))
+        filled = 0
+        print(f"{'records':>10} {'rollup, ms':>11} {'legacy, ms':>11}")
+        for size in SIZES:
+            fill(cache, filled, size)
+            filled = size
+            rollup = measure(lambda: Analytics(cache))
+            legacy = measure(lambda: legacy_load(cache))
+            print(f"{size:>10} {rollup:>11.3f} {legacy:>11.1f}")
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Бенчмарк записи в ChatCache: отдельная фиксация каждого запроса
+в режиме журнала по умолчанию против WAL и фоновой групповой записи.
+
+Каждый ход чата — два запроса: save_message и save_analytics.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_cache_writes
+"""
+import os  # Работа с путями
+import sqlite3  # Прямое соединение для замера прежнего режима
+import tempfile  # Временная директория для баз
+import time  # Измерение интервалов
+from datetime import datetime  # Временные метки аналитики
+
+from src.utils.cache import ChatCache
+
+TURNS = 2_000  # Количество ходов чата
+
+
+def bench_legacy(db_name: str) -> float:
+    """Прежний режим: журнал DELETE, synchronous=FULL, commit на запрос."""
+    ChatCache(db_name, write_behind=False).close()
+    conn = sqlite3.connect(db_name)
+    conn.execute("PRAGMA journal_mode = DELETE")
+    conn.execute("PRAGMA synchronous = FULL")
+    start = time.perf_counter()
+    for i in range(TURNS):
+        conn.execute(
+            "INSERT INTO messages (model, user_message, ai_response, "
+            "tokens_used) VALUES (?, ?, ?, ?)",
+            ("bench/model", f"question {i}", f"answer {i}", 10)
+        )
+        conn.commit()
+        conn.execute(
+            "INSERT INTO analytics_messages (timestamp, model, "
+            "message_length, response_time, tokens_used) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (datetime.now(), "bench/model", 12, 0.5, 10)
+        )
+        conn.commit()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+def bench_write_behind(db_name: str) -> tuple:
+    """
+    Новый режим: WAL и фоновая групповая запись.
+
+    Returns:
+        tuple: (время постановки в очередь, время до записи на диск).
+    """
+    cache = ChatCache(db_name)
+    start = time.perf_counter()
+    for i in range(TURNS):
+        cache.save_message("bench/model", f"question {i}", f"answer {i}", 10)
+        cache.save_analytics(datetime.now(), "bench/model", 12, 0.5, 10)
+    enqueued = time.perf_counter() - start
+    cache.flush()
+    durable = time.perf_counter() - start
+    cache.close()
+    return enqueued, durable
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = bench_legacy(os.path.join(tmp, "legacy.db"))
+        enqueued, durable = bench_write_behind(os.path.join(tmp, "wal.db"))
+
+    inserts = TURNS * 2
+    print(f"legacy commit-per-insert: {inserts / legacy:>10.0f} inserts/s")
+    print(f"WAL + write-behind:       {inserts / durable:>10.0f} inserts/s "
+          f"(caller blocked {enqueued / TURNS * 1e6:.1f}us per turn)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Бенчмарк обновления страницы при длинной ленте чата (10 000 сообщений).
+
+Сравниваются прежняя лента (ft.ListView, в которой каждое сообщение —
+MessageBubble) и VirtualChatList, где элементами являются только
+сообщения окна вокруг видимой области. Замеряются время page.update()
+и объём отправленных клиенту данных:
+- после добавления нового сообщения (один ход диалога);
+- при обновлении без изменений ленты (например, очистка поля ввода);
+- при прокрутке ленты, когда окно VirtualChatList сдвигается.
+
+Страница работает без клиента: команды обновления обрабатываются
+так же, как в FletSocketServer, и сериализуются в JSON.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_chat_list [MESSAGES]
+"""
+import asyncio  # Цикл событий для страницы Flet
+import json  # Сериализация пакетов команд
+import sys  # Аргументы командной строки
+import time  # Измерение интервалов
+
+import flet as ft
+from flet.core.local_connection import LocalConnection
+from flet.core.protocol import (
+    ClientActions, ClientMessage, CommandEncoder, PageCommandResponsePayload,
+    PageCommandsBatchResponsePayload
+)
+
+from src.ui.components import MessageBubble, VirtualChatList
+from src.ui.styles import AppStyles
+
+MESSAGES = 10_000  # Сообщений в ленте
+REPEATS = 20  # Повторов каждого замера
+VIEWPORT = 400  # Высота видимой области (AppStyles.CHAT_HISTORY)
+
+
+class BenchConnection(LocalConnection):
+    """Соединение без клиента: считает байты отправленных пакетов."""
+
+    def __init__(self):
+        super().__init__()
+        self.bytes_sent = 0
+
+    def _send(self, messages):
+        self.bytes_sent += len(json.dumps(
+            ClientMessage(ClientActions.PAGE_CONTROLS_BATCH, messages),
+            cls=CommandEncoder, separators=(",", ":")
+        ))
+
+    def send_command(self, session_id, command):
+        result, message = self._process_command(command)
+        if message:
+            self._send([message])
+        return PageCommandResponsePayload(result=result, error="")
+
+    def send_commands(self, session_id, commands):
+        results, messages = [], []
+        for command in commands:
+            result, message = self._process_command(command)
+            if command.name in ("add", "get"):
+                results.append(result)
+            if message:
+                messages.append(message)
+        if messages:
+            self._send(messages)
+        return PageCommandsBatchResponsePayload(results=results, error="")
+
+
+def message(i) -> str:
+    """Текст сообщения средней длины."""
+    return f"Сообщение {i}: " + "текст ответа модели " * (i % 12 + 1)
+
+
+def measure(page, conn, action) -> tuple:
+    """Среднее время (мс) и байты на action() + page.update()."""
+    conn.bytes_sent = 0
+    start = time.perf_counter()
+    for i in range(REPEATS):
+        action(i)
+        page.update()
+    elapsed = (time.perf_counter() - start) / REPEATS * 1000
+    return elapsed, conn.bytes_sent / REPEATS
+
+
+def bench_legacy(page, conn, count) -> dict:
+    chat = ft.ListView(**AppStyles.CHAT_HISTORY)
+    chat.controls = [
+        MessageBubble(message(i), is_user=i % 2 == 0) for i in range(count)
+    ]
+    page.add(chat)
+    results = {
+        "new message": measure(page, conn, lambda i: chat.controls.insert(
+            0, MessageBubble(message(i), is_user=True))),
+        "no-op update": measure(page, conn, lambda i: None),
+    }
+    page.controls.clear()
+    page.update()
+    return results
+
+
+def bench_virtual(page, conn, count) -> dict:
+    chat = VirtualChatList(**AppStyles.CHAT_HISTORY)
+    chat.append_older([[message(i), i % 2 == 0] for i in range(count)])
+    page.add(chat)
+    chat._fit(0, VIEWPORT)
+    page.update()
+
+    def scroll(i):
+        # Прокрутка вверх на полторы высоты области за шаг
+        chat._fit((i + 1) * VIEWPORT * 1.5, VIEWPORT)
+
+    results = {
+        "new message": measure(page, conn, lambda i: chat.push(
+            [message(i), True])),
+        "no-op update": measure(page, conn, lambda i: None),
+        "scroll step": measure(page, conn, scroll),
+    }
+    results["live controls"] = (len(chat.controls), len(chat._pool))
+    page.controls.clear()
+    page.update()
+    return results
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else MESSAGES
+    loop = asyncio.new_event_loop()
+    conn = BenchConnection()
+    page = ft.Page(conn, "bench", loop)
+
+    legacy = bench_legacy(page, conn, count)
+    virtual = bench_virtual(page, conn, count)
+
+    print(f"messages: {count}")
+    print(f"{'page.update()':>14} {'legacy, ms':>11} {'bytes':>8} "
+          f"{'virtual, ms':>12} {'bytes':>8}")
+    for name in ("new message", "no-op update", "scroll step"):
+        legacy_ms, legacy_bytes = legacy.get(name, (float("nan"),) * 2)
+        virtual_ms, virtual_bytes = virtual[name]
+        print(f"{name:>14} {legacy_ms:>11.2f} {legacy_bytes:>8.0f} "
+              f"{virtual_ms:>12.2f} {virtual_bytes:>8.0f}")
+    rendered, pooled = virtual["live controls"]
+    print(f"virtual list: {rendered} rendered controls, "
+          f"{pooled} pooled bubbles")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Бенчмарк загрузки истории диалога при росте базы до 1 млн сообщений.
+
+Сравниваются выборка последних сообщений диалога по индексу
+(conversation_id, timestamp) и прежний запрос по всей таблице
+с сортировкой по timestamp.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_history
+"""
+import os  # Работа с путями
+import tempfile  # Временная директория для базы
+import time  # Измерение интервалов
+
+from src.utils.cache import ChatCache
+
+SIZES = (10_000, 100_000, 1_000_000)  # Размеры базы для замеров
+MESSAGES_PER_CONVERSATION = 1_000  # Сообщений в одном диалоге
+REPEATS = 50  # Повторов каждого замера
+
+LEGACY_QUERY = '''
+    SELECT id, model, user_message, ai_response, timestamp, tokens_used
+    FROM messages
+    ORDER BY timestamp DESC
+    LIMIT 50
+'''
+
+
+def fill(cache: ChatCache, start: int, stop: int):
+    """Добавление сообщений с номерами [start, stop) пачками по диалогам."""
+    conn = cache.get_connection()
+    for offset in range(start, stop, MESSAGES_PER_CONVERSATION):
+        conversation_id = cache.create_conversation()
+        rows = [
+            ("bench/model", f"question {i}", f"answer {i}", 10,
+             f"2024-01-01 00:00:{i % 60:02d}", conversation_id)
+            for i in range(offset,
+                           min(offset + MESSAGES_PER_CONVERSATION, stop))
+        ]
+        conn.executemany(
+            "INSERT INTO messages (model, user_message, ai_response, "
+            "tokens_used, timestamp, conversation_id) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+    conn.commit()
+
+
+def measure(func) -> float:
+    """Среднее время выполнения func в миллисекундах."""
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        func()
+    return (time.perf_counter() - start) / REPEATS * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ChatCache(os.path.join(tmp, "bench.db"))
+        conn = cache.get_connection()
+        filled = 0
+        print(f"{'messages':>10} {'indexed, ms':>12} {'legacy, ms':>11}")
+        for size in SIZES:
+            fill(cache, filled, size)
+            filled = size
+            conversation_id = cache.get_latest_conversation()
+            indexed = measure(lambda: cache.get_chat_history(
+                conversation_id=conversation_id))
+            legacy = measure(lambda: conn.execute(LEGACY_QUERY).fetchall())
+            print(f"{size:>10} {indexed:>12.3f} {legacy:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
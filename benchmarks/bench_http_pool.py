@@ -0,0 +1,71 @@
+"""
+Бенчмарк задержки запросов: новая сессия на каждый запрос
+против общей сессии с пулом соединений.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_http_pool
+"""
+import asyncio  # Библиотека для асинхронного выполнения
+import statistics  # Расчёт медианы и перцентилей
+import time  # Измерение интервалов
+
+import aiohttp  # Асинхронный HTTP-клиент
+
+from benchmarks.stub_server import start_stub_server
+from src.api.openrouter import OpenRouterClient
+
+REQUESTS = 200  # Количество запросов в каждом режиме
+PAYLOAD = {"model": "stub", "messages": [{"role": "user", "content": "ping"}]}
+
+
+def _report(name: str, samples: list):
+    """Вывод сводки по задержкам в миллисекундах."""
+    samples = sorted(s * 1000 for s in samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(
+        f"{name:<8} median={statistics.median(samples):.2f}ms "
+        f"p99={p99:.2f}ms mean={statistics.mean(samples):.2f}ms"
+    )
+
+
+async def bench_cold(base_url: str) -> list:
+    """Старое поведение: новая ClientSession на каждый запрос."""
+    samples = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        async with aiohttp.ClientSession() as session:
+            async with session.post(
+                f"{base_url}/chat/completions", json=PAYLOAD
+            ) as response:
+                await response.json()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def bench_pooled(base_url: str) -> list:
+    """Новое поведение: общая сессия клиента OpenRouterClient."""
+    client = OpenRouterClient()
+    client.base_url = base_url
+    client.headers = {"Content-Type": "application/json"}
+    samples = []
+    try:
+        for _ in range(REQUESTS):
+            start = time.perf_counter()
+            await client.send_message("ping", "stub")
+            samples.append(time.perf_counter() - start)
+    finally:
+        await client.close()
+    return samples
+
+
+async def main():
+    runner, base_url = await start_stub_server()
+    try:
+        _report("cold", await bench_cold(base_url))
+        _report("pooled", await bench_pooled(base_url))
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+"""
+Бенчмарк поиска в списке моделей при вводе запроса.
+
+Запросы вводятся посимвольно; на каждое нажатие сравниваются прежний
+линейный поиск подстроки по всем опциям (с приведением к нижнему
+регистру на каждое нажатие) и ModelIndex с ограничением числа
+результатов. Для каждого варианта также измеряется объём обновления
+выпадающего списка, отправляемого клиенту Flet.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_model_search
+"""
+import asyncio  # Цикл событий для страницы Flet
+import random  # Синтетический каталог моделей
+import time  # Измерение интервалов
+
+import flet as ft
+
+from benchmarks.bench_chat_list import BenchConnection
+from src.ui.components import ModelSelector
+from src.utils.model_index import ModelIndex
+
+SIZES = (300, 3_000)  # Размеры каталога
+QUERIES = ("claude sonnet", "gpt-4o mini", "llama 70b instruct", "gemni pro")
+PROVIDERS = ("openai", "anthropic", "google", "meta-llama", "mistralai",
+             "qwen", "deepseek", "cohere", "nousresearch", "microsoft")
+FAMILIES = ("gpt-4o", "claude-3.5-sonnet", "gemini-pro", "llama-3.1",
+            "mistral-large", "qwen-2.5", "deepseek-chat", "command-r",
+            "hermes-3", "phi-3")
+VARIANTS = ("", "-mini", "-70b-instruct", "-8b-instruct", "-latest",
+            "-preview", ":free", "-turbo", "-vision", "-1022")
+
+
+def make_catalog(size) -> list:
+    """Каталог в формате OpenRouter: {"id": ..., "name": ...}."""
+    rng = random.Random(size)
+    models = []
+    for i in range(size):
+        provider = rng.choice(PROVIDERS)
+        model_id = (f"{provider}/{rng.choice(FAMILIES)}"
+                    f"{rng.choice(VARIANTS)}-{i}")
+        models.append({"id": model_id,
+                       "name": f"{provider.title()}: {model_id}"})
+    return models
+
+
+def legacy_filter(options, text) -> list:
+    """Прежний ModelSelector.filter_options (без обновления страницы)."""
+    search_text = text.lower()
+    return [
+        opt for opt in options
+        if search_text in opt.text.lower() or search_text in opt.key.lower()
+    ]
+
+
+def keystrokes(query) -> list:
+    """Префиксы запроса (одно нажатие — один префикс)."""
+    return [query[:i] for i in range(1, len(query) + 1)]
+
+
+def main():
+    loop = asyncio.new_event_loop()
+    print(f"{'models':>7} {'legacy, us':>11} {'items':>6} {'bytes':>7} "
+          f"{'index, us':>10} {'items':>6} {'bytes':>7} {'build, ms':>10}")
+    for size in SIZES:
+        models = make_catalog(size)
+        conn = BenchConnection()
+        page = ft.Page(conn, "bench", loop)
+        selector = ModelSelector(models)
+        page.add(selector)
+
+        start = time.perf_counter()
+        ModelIndex(models)
+        build = (time.perf_counter() - start) * 1000
+
+        row = []
+        for search in (
+            lambda text: legacy_filter(selector.all_options, text),
+            lambda text: [selector.all_options[i] for i in
+                          selector.index.search(text,
+                                                selector.MAX_RESULTS)],
+        ):
+            elapsed = items = sent = count = 0
+            for query in QUERIES:
+                # Перед запросом в списке весь каталог (не учитывается)
+                selector.options = selector.all_options
+                selector.update()
+                conn.bytes_sent = 0
+                for text in keystrokes(query):
+                    start = time.perf_counter()
+                    options = search(text)
+                    elapsed += time.perf_counter() - start
+                    items += len(options)
+                    count += 1
+                    selector.options = options
+                    selector.update()
+                sent += conn.bytes_sent
+            row += [elapsed / count * 1e6, items / count,
+                    sent / count]
+        print(f"{size:>7} {row[0]:>11.1f} {row[1]:>6.0f} {row[2]:>7.0f} "
+              f"{row[3]:>10.1f} {row[4]:>6.0f} {row[5]:>7.0f} {build:>10.1f}")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
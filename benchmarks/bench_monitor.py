@@ -0,0 +1,91 @@
+"""
+Бенчмарк монитора производительности на пути отправки сообщения.
+
+Сравниваются прежний вариант (замер psutil дважды на каждый вызов
+log_metrics, история в списке с pop(0), пересчёт средних по всей
+истории) и кольцевой буфер с фоновым потоком сбора метрик.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_monitor
+"""
+import logging  # Логгер без вывода для замеров
+import time  # Измерение интервалов
+
+import psutil  # Замеры прежнего варианта
+
+from src.utils.monitor import PerformanceMonitor
+
+CALLS = 2_000  # Вызовов каждой операции
+HISTORY_SIZE = 1_000  # Размер истории метрик
+
+
+class LegacyMonitor:
+    """Прежняя схема: синхронный замер и список с pop(0)."""
+
+    def __init__(self):
+        self.process = psutil.Process()
+        self.metrics_history = []
+
+    def get_metrics(self):
+        metrics = {
+            'cpu_percent': self.process.cpu_percent(),
+            'memory_percent': self.process.memory_percent(),
+            'thread_count': len(self.process.threads()),
+        }
+        self.metrics_history.append(metrics)
+        if len(self.metrics_history) > HISTORY_SIZE:
+            self.metrics_history.pop(0)
+        return metrics
+
+    def log_metrics(self, logger):
+        metrics = self.get_metrics()
+        self.get_metrics()  # Повторный замер внутри check_health
+        logger.info("Performance metrics - CPU: %.1f%%",
+                    metrics['cpu_percent'])
+
+    def get_average_metrics(self):
+        history = self.metrics_history
+        return {
+            'avg_cpu': sum(m['cpu_percent'] for m in history) / len(history),
+            'avg_memory': sum(
+                m['memory_percent'] for m in history) / len(history),
+            'avg_threads': sum(
+                m['thread_count'] for m in history) / len(history),
+        }
+
+
+def measure(func) -> float:
+    """Среднее время вызова func в микросекундах."""
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        func()
+    return (time.perf_counter() - start) / CALLS * 1e6
+
+
+def main():
+    logger = logging.getLogger("bench_monitor")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+
+    legacy = LegacyMonitor()
+    monitor = PerformanceMonitor(interval=0.5, history_size=HISTORY_SIZE)
+    monitor.start()
+    for _ in range(HISTORY_SIZE):
+        legacy.get_metrics()
+        monitor.get_metrics()
+
+    print(f"{'operation':>20} {'legacy, us':>11} {'ring, us':>9}")
+    rows = (
+        ("log_metrics", lambda: legacy.log_metrics(logger),
+         lambda: monitor.log_metrics(logger)),
+        ("get_average_metrics", legacy.get_average_metrics,
+         monitor.get_average_metrics),
+    )
+    for name, legacy_call, ring_call in rows:
+        print(f"{name:>20} {measure(legacy_call):>11.2f} "
+              f"{measure(ring_call):>9.2f}")
+    monitor.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Проверка повторных попыток и предохранителя на stub-сервере
+с внедрением сбоев.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_resilience
+"""
+import asyncio  # Библиотека для асинхронного выполнения
+import time  # Измерение интервалов
+
+from benchmarks.stub_server import start_stub_server
+from src.api.openrouter import OpenRouterClient, RetryPolicy
+
+
+async def run_scenario(name: str, requests: int, **server_options):
+    """
+    Выполнение серии запросов к stub-серверу с заданными сбоями.
+
+    Args:
+        name (str): Название сценария.
+        requests (int): Количество запросов.
+        **server_options: Параметры stub-сервера.
+    """
+    runner, base_url = await start_stub_server(**server_options)
+    client = OpenRouterClient(
+        retry_policy=RetryPolicy(max_attempts=4, base_delay=0.05,
+                                 max_delay=0.5, deadline=5.0),
+        breaker_threshold=3,
+        breaker_reset_timeout=1.0,
+    )
+    client.base_url = base_url
+    client.headers = {"Content-Type": "application/json"}
+    try:
+        print(f"-- {name}")
+        for i in range(requests):
+            start = time.perf_counter()
+            response = await client.send_message("ping", "stub")
+            elapsed = (time.perf_counter() - start) * 1000
+            result = ("error: " + response["error"][:60]
+                      if "error" in response else "ok")
+            print(f"   request {i + 1}: {elapsed:7.1f}ms {result}")
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+
+async def main():
+    await run_scenario("429 with Retry-After, then 502", 1,
+                       faults=[429, 502], retry_after=0.2)
+    await run_scenario("provider down: circuit opens", 4,
+                       faults=[502] * 20)
+    await run_scenario("non-retryable 401", 1, faults=[401])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
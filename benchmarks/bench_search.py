@@ -0,0 +1,65 @@
+"""
+Бенчмарк полнотекстового поиска ChatCache.search() на миллионах сообщений.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_search
+"""
+import os  # Работа с путями
+import random  # Генерация текста сообщений
+import tempfile  # Временная директория для базы
+import time  # Измерение интервалов
+
+from src.utils.cache import ChatCache
+
+SIZES = (100_000, 1_000_000, 2_000_000)  # Размеры базы для замеров
+BATCH = 50_000  # Сообщений в одной транзакции при заполнении
+REPEATS = 20  # Повторов каждого запроса
+QUERIES = ("word17", "word3 word42", "rare")  # Запросы для замеров
+
+# Словарь: частые слова и одно редкое, встречающееся в 0.1% сообщений
+VOCABULARY = [f"word{i}" for i in range(5_000)]
+
+
+def make_text(rng: random.Random) -> str:
+    """Случайное сообщение из 12 слов словаря."""
+    words = rng.choices(VOCABULARY, k=12)
+    if rng.random() < 0.001:
+        words.append("rare")
+    return " ".join(words)
+
+
+def fill(cache: ChatCache, start: int, stop: int, rng: random.Random):
+    """Добавление сообщений с номерами [start, stop)."""
+    conn = cache.get_connection()
+    conversation_id = cache.create_conversation()
+    for offset in range(start, stop, BATCH):
+        conn.executemany(
+            "INSERT INTO messages (model, user_message, ai_response, "
+            "tokens_used, conversation_id) VALUES (?, ?, ?, ?, ?)",
+            (("bench/model", make_text(rng), make_text(rng), 10,
+              conversation_id)
+             for _ in range(offset, min(offset + BATCH, stop)))
+        )
+        conn.commit()
+
+
+def main():
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ChatCache(os.path.join(tmp, "bench.db"), write_behind=False)
+        filled = 0
+        print(f"{'messages':>10} " + " ".join(f"{q!r:>16}" for q in QUERIES))
+        for size in SIZES:
+            fill(cache, filled, size, rng)
+            filled = size
+            timings = []
+            for query in QUERIES:
+                start = time.perf_counter()
+                for page in range(REPEATS):
+                    cache.search(query, limit=20, offset=(page % 5) * 20)
+                timings.append((time.perf_counter() - start) / REPEATS * 1000)
+            print(f"{size:>10} " + " ".join(f"{t:>14.2f}ms" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
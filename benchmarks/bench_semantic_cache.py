@@ -0,0 +1,128 @@
+"""
+Бенчмарк поиска в индексе кэша ответов на близкие запросы.
+
+Кэш заполняется синтетическими запросами (по умолчанию 100 000
+записей) к одной модели — худший случай, поиск просматривает весь
+индекс, — и к четырём моделям, когда у каждой свой индекс.
+Замеряются векторизация запроса, поиск ближайшего вектора, доля
+найденных перефразировок (изменены регистр, пробелы и одна буква),
+доля ложных попаданий для новых запросов при заданном пороге,
+а также сохранение и загрузка файла индекса.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_semantic_cache [ENTRIES]
+"""
+import os  # Временный файл индекса
+import random  # Синтетические запросы
+import sys  # Аргументы командной строки
+import tempfile  # Каталог для файла индекса
+import time  # Измерение интервалов
+
+import numpy as np  # Процентили задержек
+
+from src.utils.semantic_cache import SemanticCache, embed
+
+ENTRIES = 100_000  # Записей в индексе
+QUERIES = 500  # Запросов поиска
+THRESHOLD = 0.92  # Порог косинусной близости
+MODELS = ("openai/gpt-4o", "anthropic/claude-3.5-sonnet",
+          "meta-llama/llama-3.1-70b-instruct", "google/gemini-pro-1.5")
+WORDS = (
+    "как настроить сервер базу данных python запрос ответ ошибка "
+    "функция класс список словарь файл поток память время кэш индекс "
+    "модель текст перевод объясни напиши пример код тест сеть api "
+    "почему быстрее медленно оптимизировать sql json http async"
+).split()
+
+
+def make_prompt(rng) -> str:
+    """Синтетический запрос из 6-16 слов."""
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 16)))
+
+
+def paraphrase(rng, prompt) -> str:
+    """Перефразировка: регистр, лишние пробелы и одна изменённая буква."""
+    position = rng.randrange(len(prompt))
+    changed = prompt[:position] + rng.choice("абв") + prompt[position + 1:]
+    return "  " + changed.capitalize().replace(" ", "  ", 2) + "?"
+
+
+def percentiles(samples) -> str:
+    """p50/p99 в миллисекундах."""
+    p50, p99 = np.percentile(np.array(samples) * 1000, [50, 99])
+    return f"p50 {p50:.3f} ms, p99 {p99:.3f} ms"
+
+
+def run(entries, models):
+    """Заполнение кэша и замеры для набора моделей."""
+    rng = random.Random(42)
+    prompts = [make_prompt(rng) for _ in range(entries)]
+    prompt_models = [rng.choice(models) for _ in range(entries)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "chat_cache.semantic.npz")
+        cache = SemanticCache(None, path, THRESHOLD, max_entries=entries)
+
+        start = time.perf_counter()
+        for i, (model, prompt) in enumerate(zip(prompt_models, prompts)):
+            cache.add(model, [{"role": "user", "content": prompt}], str(i))
+        fill_time = time.perf_counter() - start
+        size = sum(index.vectors[:index.size].nbytes
+                   for index in cache.indexes.values())
+        print(f"{len(models)} model(s), {entries} entries: "
+              f"fill {fill_time / entries * 1e6:.1f} us/entry, "
+              f"vectors {size / 2**20:.1f} MB")
+
+        def search(model, text):
+            vector = embed(cache.prompt_text(
+                [{"role": "user", "content": text}]
+            ), cache.dim)
+            return cache.indexes[model].search(vector)
+
+        embed_times, search_times = [], []
+        hits = false_hits = 0
+        for _ in range(QUERIES):
+            i = rng.randrange(entries)
+            query = paraphrase(rng, prompts[i])
+            text = cache.prompt_text([{"role": "user", "content": query}])
+
+            start = time.perf_counter()
+            vector = embed(text, cache.dim)
+            embed_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            found = cache.indexes[prompt_models[i]].search(vector)
+            search_times.append(time.perf_counter() - start)
+            if found[1] >= THRESHOLD:
+                hits += prompts[int(found[0])] == prompts[i]
+
+            new_prompt = make_prompt(rng)
+            found = search(prompt_models[i], new_prompt)
+            if found[1] >= THRESHOLD:
+                false_hits += prompts[int(found[0])] != new_prompt
+
+        print(f"  embed:  {percentiles(embed_times)}")
+        print(f"  search: {percentiles(search_times)}")
+        print(f"  paraphrase hits: {hits / QUERIES:.1%}, "
+              f"false hits on new prompts: {false_hits / QUERIES:.1%} "
+              f"(threshold {THRESHOLD})")
+
+        start = time.perf_counter()
+        cache.save()
+        save_time = time.perf_counter() - start
+        start = time.perf_counter()
+        SemanticCache(None, path, max_entries=entries)
+        load_time = time.perf_counter() - start
+        print(f"  save {save_time * 1000:.0f} ms, "
+              f"load {load_time * 1000:.0f} ms, "
+              f"file {os.path.getsize(path) / 2**20:.1f} MB")
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else ENTRIES
+    run(entries, MODELS[:1])
+    run(entries, MODELS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Бенчмарк хранения метрик сессии: список словарей против колоночного
+хранилища SessionStore.
+
+Сравниваются занимаемая память, скорость добавления записей
+и скорость расчёта процентилей времени ответа.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_session_store
+"""
+import random  # Генерация тестовых метрик
+import statistics  # Процентили для списка словарей
+import time  # Измерение интервалов
+import tracemalloc  # Замер выделенной памяти
+from datetime import datetime  # Временные метки в прежнем формате
+
+from src.utils.session_store import SessionStore
+
+SIZES = (10_000, 100_000, 1_000_000)  # Количество записей для замеров
+MODELS = [f"bench/model-{i}" for i in range(20)]  # Идентификаторы моделей
+
+
+def make_records(count: int) -> list:
+    """Тестовые записи (timestamp, model, length, response_time, tokens)."""
+    rng = random.Random(count)
+    now = time.time()
+    return [
+        (now + i, rng.choice(MODELS), rng.randint(1, 2000),
+         rng.expovariate(1.0), rng.randint(1, 4000))
+        for i in range(count)
+    ]
+
+
+def fill_dicts(records: list) -> list:
+    """Прежний формат: словарь с datetime на каждую запись."""
+    data = []
+    for timestamp, model, length, response_time, tokens in records:
+        data.append({
+            'timestamp': datetime.fromtimestamp(timestamp),
+            'model': model,
+            'message_length': length,
+            'response_time': response_time,
+            'tokens_used': tokens
+        })
+    return data
+
+
+def fill_store(records: list) -> SessionStore:
+    """Новый формат: колоночное хранилище."""
+    store = SessionStore()
+    for record in records:
+        store.append(*record)
+    return store
+
+
+def measure(func):
+    """
+    Результат func, время в миллисекундах и пик выделенной памяти в МБ.
+
+    Время и память замеряются в разных запусках: tracemalloc
+    заметно замедляет выделение объектов.
+    """
+    start = time.perf_counter()
+    result = func()
+    elapsed = (time.perf_counter() - start) * 1000
+    del result
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2 ** 20
+
+
+def main():
+    # Прогрев numpy, чтобы первый замер не включал инициализацию
+    fill_store(make_records(100)).percentiles()
+
+    print(f"{'records':>10} {'layout':>8} {'memory, MB':>11} "
+          f"{'append, ms':>11} {'p50/p90/p99, ms':>16}")
+    for size in SIZES:
+        records = make_records(size)
+
+        data, append_ms, memory = measure(lambda: fill_dicts(records))
+        start = time.perf_counter()
+        quantiles = statistics.quantiles(
+            (r['response_time'] for r in data), n=100)
+        _ = quantiles[49], quantiles[89], quantiles[98]
+        query_ms = (time.perf_counter() - start) * 1000
+        print(f"{size:>10} {'dicts':>8} {memory:>11.1f} "
+              f"{append_ms:>11.1f} {query_ms:>16.2f}")
+        del data
+
+        store, append_ms, memory = measure(lambda: fill_store(records))
+        start = time.perf_counter()
+        store.percentiles()
+        query_ms = (time.perf_counter() - start) * 1000
+        print(f"{size:>10} {'columns':>8} {memory:>11.1f} "
+              f"{append_ms:>11.1f} {query_ms:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
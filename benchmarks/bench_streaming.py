@@ -0,0 +1,52 @@
+"""
+Бенчмарк времени до первого токена (TTFT): полный ответ JSON
+против потоковой выдачи через server-sent events.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_streaming
+"""
+import asyncio  # Библиотека для асинхронного выполнения
+import statistics  # Расчёт медианы
+import time  # Измерение интервалов
+
+from benchmarks.stub_server import start_stub_server
+from src.api.openrouter import OpenRouterClient
+
+REQUESTS = 20  # Количество запросов в каждом режиме
+CHUNKS = 20  # Число фрагментов в ответе stub-сервера
+DELAY = 0.02  # Пауза генерации одного фрагмента (сек.)
+
+
+async def main():
+    runner, base_url = await start_stub_server(chunks=CHUNKS, delay=DELAY)
+    client = OpenRouterClient()
+    client.base_url = base_url
+    client.headers = {"Content-Type": "application/json"}
+
+    blocking, ttft, total = [], [], []
+    try:
+        for _ in range(REQUESTS):
+            start = time.perf_counter()
+            await client.send_message("ping", "stub")
+            blocking.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            first = None
+            async for chunk in client.stream_message("ping", "stub"):
+                if first is None and "content" in chunk:
+                    first = time.perf_counter() - start
+            ttft.append(first)
+            total.append(time.perf_counter() - start)
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+    print(f"send_message     first token = "
+          f"{statistics.median(blocking) * 1000:.1f}ms (median)")
+    print(f"stream_message   first token = "
+          f"{statistics.median(ttft) * 1000:.1f}ms, full response = "
+          f"{statistics.median(total) * 1000:.1f}ms (median)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,149 @@
+"""
+Локальный stub-сервер, имитирующий OpenRouter API.
+
+Используется бенчмарками для измерений без обращения к реальному API.
+"""
+import asyncio  # Библиотека для асинхронного выполнения
+import json  # Сериализация фрагментов потока
+from aiohttp import web  # HTTP-сервер из состава aiohttp
+
+
+def _completion(model: str, content: str = "pong") -> dict:
+    """Формирование тела ответа /chat/completions."""
+    return {
+        "id": "stub",
+        "model": model,
+        "choices": [{"message": {"role": "assistant", "content": content}}],
+        "usage": {"total_tokens": 2},
+    }
+
+
+async def chat_completions(request: web.Request) -> web.StreamResponse:
+    """
+    Обработчик /chat/completions.
+
+    Без `stream` отдаёт ответ целиком после генерации всех фрагментов,
+    со `stream: true` — отправляет фрагменты как server-sent events.
+    """
+    data = await request.json()
+    model = data.get("model", "stub")
+
+    # Внедрение сбоев: очередной статус из списка faults
+    faults = request.app["faults"]
+    if faults:
+        status = faults.pop(0)
+        headers = {}
+        if status == 429 and request.app["retry_after"] is not None:
+            headers["Retry-After"] = str(request.app["retry_after"])
+        return web.json_response(
+            {"error": {"code": status, "message": "injected fault"}},
+            status=status, headers=headers
+        )
+
+    chunks = request.app["chunks"]
+    delay = request.app["delay"]
+
+    if not data.get("stream"):
+        if delay:
+            await asyncio.sleep(chunks * delay)
+        return web.json_response(_completion(model, "token " * chunks))
+
+    response = web.StreamResponse(
+        headers={"Content-Type": "text/event-stream"}
+    )
+    await response.prepare(request)
+    await response.write(b": OPENROUTER PROCESSING\n\n")
+    for _ in range(chunks):
+        await asyncio.sleep(delay)
+        chunk = {"choices": [{"delta": {"content": "token "}}]}
+        await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+    usage = {"choices": [], "usage": {"total_tokens": chunks}}
+    await response.write(f"data: {json.dumps(usage)}\n\n".encode())
+    await response.write(b"data: [DONE]\n\n")
+    await response.write_eof()
+    return response
+
+
+async def models(request: web.Request) -> web.Response:
+    """
+    Обработчик /models: каталог из `models_count` моделей.
+
+    Поддерживает условные запросы: при совпадении If-None-Match
+    отвечает 304 без тела.
+    """
+    etag = f'"catalog-{request.app["models_count"]}"'
+    if request.headers.get("If-None-Match") == etag:
+        return web.Response(status=304, headers={"ETag": etag})
+    return web.json_response({"data": [
+        {"id": f"stub/model-{i}", "name": f"Stub Model {i}",
+         "context_length": 8192}
+        for i in range(request.app["models_count"])
+    ]}, headers={"ETag": etag})
+
+
+async def credits(request: web.Request) -> web.Response:
+    """Обработчик /credits: фиксированный баланс."""
+    return web.json_response(
+        {"data": {"total_credits": 10.0, "total_usage": 2.5}}
+    )
+
+
+def create_app(chunks: int = 1, delay: float = 0.0,
+               models_count: int = 300, faults=None,
+               retry_after=None) -> web.Application:
+    """
+    Создание приложения stub-сервера.
+
+    Args:
+        chunks (int): Число фрагментов в ответе модели.
+        delay (float): Пауза генерации одного фрагмента в секундах.
+        models_count (int): Размер каталога моделей.
+        faults (list): HTTP-статусы ошибок, которые вернут очередные
+                       запросы к /chat/completions до первого успеха.
+        retry_after (float): Значение Retry-After для ответов 429.
+    """
+    app = web.Application()
+    app["chunks"] = chunks
+    app["delay"] = delay
+    app["models_count"] = models_count
+    app["faults"] = list(faults or [])
+    app["retry_after"] = retry_after
+    app.router.add_post("/api/v1/chat/completions", chat_completions)
+    app.router.add_get("/api/v1/models", models)
+    app.router.add_get("/api/v1/credits", credits)
+    return app
+
+
+async def start_stub_server(host: str = "127.0.0.1", port: int = 0,
+                            **options):
+    """
+    Запуск stub-сервера на свободном порту.
+
+    Args:
+        host (str): Адрес для прослушивания.
+        port (int): Порт (0 — выбрать свободный).
+        **options: Параметры create_app().
+
+    Returns:
+        tuple: (runner, base_url) — runner для остановки сервера
+               и базовый URL API.
+    """
+    runner = web.AppRunner(create_app(**options), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{port}/api/v1"
+
+
+if __name__ == "__main__":
+    async def _serve():
+        runner, base_url = await start_stub_server(port=8089, chunks=20,
+                                                   delay=0.02)
+        print(f"Stub server: {base_url}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(_serve())
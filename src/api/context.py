@@ -0,0 +1,106 @@
+from collections import deque  # Очередь для хранения ходов диалога
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Приблизительная оценка количества токенов в тексте.
+
+    Используется эвристика «около 4 байт UTF-8 на токен»: для латиницы
+    это ~4 символа на токен, для кириллицы ~2 символа на токен.
+
+    Args:
+        text (str): Исходный текст.
+
+    Returns:
+        int: Оценка количества токенов.
+    """
+    if not text:
+        return 0
+    return (len(text.encode("utf-8")) + 3) // 4
+
+
+class ConversationContext:
+    """
+    Контекст многоходового диалога для запросов к модели.
+
+    Хранит ходы диалога (сообщение пользователя и ответ модели) вместе
+    с заранее посчитанным числом токенов, поэтому сборка запроса не
+    пересчитывает всю переписку: из истории берутся последние ходы,
+    пока они помещаются в бюджет контекста модели.
+
+    Args:
+        max_turns (int): Максимальное число хранимых ходов.
+    """
+
+    # Служебные токены на одно сообщение (роль, разделители)
+    MESSAGE_OVERHEAD = 4
+
+    def __init__(self, max_turns=200):
+        # Ходы диалога: (сообщение пользователя, ответ модели, токены)
+        self.turns = deque(maxlen=max_turns)
+
+    def load(self, history):
+        """
+        Заполнение контекста из истории чата.
+
+        Args:
+            history (list): Пары (user_message, ai_response)
+                            в хронологическом порядке.
+        """
+        self.turns.clear()
+        for user_message, ai_response in history:
+            self.add_turn(user_message, ai_response)
+
+    def add_turn(self, user_message: str, ai_response: str):
+        """
+        Добавление завершённого хода диалога.
+
+        Args:
+            user_message (str): Сообщение пользователя.
+            ai_response (str): Ответ модели.
+        """
+        tokens = (
+            estimate_tokens(user_message) + estimate_tokens(ai_response)
+            + 2 * self.MESSAGE_OVERHEAD
+        )
+        self.turns.append((user_message, ai_response, tokens))
+
+    def clear(self):
+        """Очистка контекста."""
+        self.turns.clear()
+
+    def build_history(self, message: str, context_length: int,
+                      reserve_tokens=1000) -> list:
+        """
+        Сборка истории для запроса в пределах контекста модели.
+
+        Берутся последние ходы диалога, суммарный размер которых вместе
+        с новым сообщением и резервом под ответ не превышает
+        context_length.
+
+        Args:
+            message (str): Новое сообщение пользователя.
+            context_length (int): Размер контекста модели в токенах.
+            reserve_tokens (int): Токены, оставляемые под ответ модели.
+
+        Returns:
+            list: Сообщения [{"role": ..., "content": ...}, ...]
+                  в хронологическом порядке, без нового сообщения.
+        """
+        budget = (
+            context_length - reserve_tokens
+            - estimate_tokens(message) - self.MESSAGE_OVERHEAD
+        )
+
+        selected = []
+        for user_message, ai_response, tokens in reversed(self.turns):
+            if tokens > budget:
+                break
+            budget -= tokens
+            selected.append((user_message, ai_response))
+
+        history = []
+        for user_message, ai_response in reversed(selected):
+            history.append({"role": "user", "content": user_message})
+            history.append({"role": "assistant", "content": ai_response})
+        return history
@@ -1,6 +1,143 @@
+import asyncio  # Библиотека для обработки таймаутов асинхронных запросов
+import json  # Библиотека для разбора JSON-фрагментов потока
+import random  # Библиотека для случайного разброса задержек (jitter)
+import time  # Библиотека для проверки срока актуальности каталога
+from datetime import datetime, timezone  # Разбор даты из заголовка Retry-After
+from email.utils import parsedate_to_datetime  # Разбор HTTP-даты
 import aiohttp  # Библиотека для реализации асинхронной работы с HTTP
 import requests  # Библиотека для выполнения HTTP-запросов к API
 from src.utils.logger import AppLogger  # Импорт собственного логгера для отслеживания работы
+from src.utils.tracing import Tracer  # Трассировка этапов запроса
+from src.utils.metrics import MetricsRegistry  # Метрики для внешнего сбора
+
+
+# Размер контекста для моделей, о которых нет данных в каталоге
+DEFAULT_CONTEXT_LENGTH = 4096
+
+
+class OpenRouterError(Exception):
+    """
+    Ошибка запроса к OpenRouter API.
+
+    Args:
+        message (str): Описание ошибки.
+        status (int): HTTP-статус ответа (если ответ был получен).
+        retry_after (float): Рекомендованная сервером пауза в секундах.
+    """
+
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class RetryPolicy:
+    """
+    Параметры повторных попыток запросов к API.
+
+    Задержка между попытками растёт экспоненциально и выбирается
+    случайно в диапазоне [0, base_delay * 2^attempt] (full jitter),
+    но не больше max_delay. Заголовок Retry-After имеет приоритет.
+
+    Args:
+        max_attempts (int): Максимальное число попыток, включая первую.
+        base_delay (float): Базовая задержка в секундах.
+        max_delay (float): Максимальная задержка между попытками.
+        deadline (float): Общее время на запрос со всеми повторами.
+    """
+
+    # HTTP-статусы временных ошибок, после которых запрос повторяется
+    RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+    def __init__(self, max_attempts=4, base_delay=0.5, max_delay=10.0,
+                 deadline=60.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Расчёт паузы перед следующей попыткой.
+
+        Args:
+            attempt (int): Номер неудачной попытки (начиная с 1).
+
+        Returns:
+            float: Пауза в секундах.
+        """
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """
+    Предохранитель (circuit breaker) для одной модели.
+
+    После failure_threshold ошибок подряд предохранитель размыкается
+    и запросы к модели сразу отклоняются. Через reset_timeout секунд
+    пропускается одна пробная попытка: её успех замыкает предохранитель,
+    неудача снова размыкает его. Если исход пробной попытки так и не
+    зарегистрирован (запрос отменён), через reset_timeout секунд
+    пропускается новая.
+
+    Args:
+        failure_threshold (int): Число ошибок подряд до размыкания.
+        reset_timeout (float): Время до пробной попытки в секундах.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_at = 0.0
+
+    def allow_request(self) -> bool:
+        """
+        Проверка, можно ли сейчас выполнить запрос.
+
+        Returns:
+            bool: True, если запрос разрешён.
+        """
+        if self.state == self.CLOSED:
+            return True
+        now = time.monotonic()
+        if (self.state == self.OPEN
+                and now - self.opened_at >= self.reset_timeout) or (
+                self.state == self.HALF_OPEN
+                and now - self.probe_at >= self.reset_timeout):
+            # Пропускаем одну пробную попытку
+            self.state = self.HALF_OPEN
+            self.probe_at = now
+            return True
+        return False
+
+    def record_success(self):
+        """Регистрация успешного запроса."""
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self):
+        """Регистрация неудачного запроса."""
+        self.failures += 1
+        if (self.state == self.HALF_OPEN
+                or self.failures >= self.failure_threshold):
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """
+        Снятие пробной попытки без исхода (запрос отменён):
+        следующий запрос снова будет пробным.
+        """
+        if self.state == self.HALF_OPEN:
+            self.state = self.OPEN
 
 
 class OpenRouterClient:
@@ -11,12 +148,42 @@ class OpenRouterClient:
     моделям (GPT, Claude и др.) через единый API интерфейс.
     """
 
-    def __init__(self):
+    def __init__(self, cache=None, db=None, catalog_ttl=3600, pool_limit=10,
+                 pool_limit_per_host=5, keepalive_timeout=60,
+                 dns_cache_ttl=300, retry_policy=None,
+                 breaker_threshold=5, breaker_reset_timeout=30.0,
+                 tracer=None, metrics=None, logger=None):
         """
         Инициализация клиента OpenRouter.
+
+        Args:
+            cache (ChatCache): Хранилище для каталога моделей (необязательно).
+            db (AsyncChatCache): Асинхронный доступ к тому же хранилищу
+                                 для get_models_async() (необязательно;
+                                 без него запросы к cache выполняются
+                                 в потоке).
+            catalog_ttl (int): Срок актуальности сохранённого каталога
+                               в секундах, до истечения которого запрос
+                               к API не выполняется.
+            pool_limit (int): Максимальное число соединений в пуле.
+            pool_limit_per_host (int): Максимальное число соединений
+                                       к одному хосту.
+            keepalive_timeout (float): Время жизни простаивающего
+                                       соединения в секундах.
+            dns_cache_ttl (int): Время хранения DNS-записей в кэше
+                                 в секундах.
+            retry_policy (RetryPolicy): Параметры повторных попыток
+                                        запросов к модели.
+            breaker_threshold (int): Число ошибок подряд, после которого
+                                     запросы к модели временно отклоняются.
+            breaker_reset_timeout (float): Время до пробного запроса
+                                           к отключённой модели в секундах.
+            tracer (Tracer): Трассировка этапов запросов (необязательно).
+            metrics (MetricsRegistry): Реестр метрик (необязательно).
+            logger (AppLogger): Общий логгер приложения (необязательно).
         """
         # Инициализация логгера для отслеживания работы клиента
-        self.logger = AppLogger()
+        self.logger = logger or AppLogger()
 
         # Инициализация базовых параметров
         self._api_key = None
@@ -24,9 +191,76 @@ class OpenRouterClient:
         self.headers = None
         self.available_models = None
 
+        # Кэш каталога моделей
+        self.cache = cache
+        self.db = db
+        self.catalog_ttl = catalog_ttl
+
+        # Параметры пула HTTP-соединений
+        self.pool_limit = pool_limit
+        self.pool_limit_per_host = pool_limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+
+        # Общая HTTP-сессия (создаётся при первом запросе)
+        self._session = None
+
+        # Повторные попытки и предохранители по моделям
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset_timeout = breaker_reset_timeout
+        self._breakers = {}
+
+        # Трассировка этапов запросов
+        self.tracer = tracer or Tracer(enabled=False)
+
+        # Счётчик попыток запросов к модели по статусу ответа
+        self._attempts_metric = (metrics or MetricsRegistry()).counter(
+            "openrouter_attempts", "Completion request attempts",
+            ["model", "status"]
+        )
+
         # Логирование успешной инициализации клиента
         self.logger.info("OpenRouterClient initialized successfully")
 
+    def _get_session(self):
+        """
+        Получение общей HTTP-сессии с пулом соединений.
+
+        Сессия создаётся лениво внутри работающего event loop и
+        переиспользуется всеми запросами клиента: соединения остаются
+        открытыми (keep-alive), а DNS-ответы кэшируются.
+
+        Returns:
+            aiohttp.ClientSession: Активная HTTP-сессия.
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_limit,
+                limit_per_host=self.pool_limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self.logger.debug("HTTP session created")
+        return self._session
+
+    async def close(self):
+        """
+        Закрытие HTTP-сессии и всех соединений пула.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            self.logger.debug("HTTP session closed")
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
     @property
     def api_key(self):
         """
@@ -58,8 +292,7 @@ class OpenRouterClient:
             "Content-Type": "application/json"
         }
 
-        # Загрузка доступных моделей
-        self.available_models = self.get_models()
+        # Список моделей загружается отдельно через get_models_async()
         self.logger.info("API key set successfully")
 
     def get_models(self):
@@ -85,44 +318,204 @@ class OpenRouterClient:
                 timeout=10
             )
             response.raise_for_status()
-            models_data = response.json()
-            self.logger.info(f"Retrieved {len(models_data['data'])} models")
-            return [
-                {"id": model["id"], "name": model["name"]}
-                for model in models_data["data"]
-            ]
+            return self._parse_models(response.json())
         except requests.exceptions.Timeout:
             self.logger.error("Request timed out")
             return self._get_default_models()
         except requests.exceptions.RequestException as e:
-            self.logger.error(f"Request failed: {str(e)}", exc_info=True)
+            self.logger.error("Request failed: %s", e, exc_info=True)
             return self._get_default_models()
         except KeyError:
             self.logger.error("Malformed JSON response")
             return self._get_default_models()
 
+    async def get_models_async(self, force=False):
+        """
+        Асинхронное получение списка доступных языковых моделей.
+
+        Запрос выполняется через общую HTTP-сессию и не блокирует
+        event loop приложения. При наличии кэша каталог берётся из него,
+        пока не истёк срок catalog_ttl, а затем перепроверяется условным
+        запросом (If-None-Match / If-Modified-Since).
+
+        Args:
+            force (bool): Перепроверить каталог, даже если срок не истёк.
+
+        Returns:
+            list: Список моделей
+                  [{"id": "model-id", "name": "Model Name"}, ...]
+
+        Note:
+            При ошибках возвращается последний сохранённый каталог
+            или список базовых моделей.
+        """
+        catalog = await self._catalog_call('get_model_catalog')
+        cached_models = catalog["models"] if catalog else None
+        if not self.headers:
+            self.logger.error("Headers not initialized. Set API key first")
+            return self._fallback_models(cached_models)
+
+        if catalog and not force and (
+                time.time() - catalog["fetched_at"] < self.catalog_ttl):
+            self.logger.debug("Using cached model catalog")
+            return catalog["models"]
+
+        # Валидаторы для условного запроса
+        headers = dict(self.headers)
+        if catalog and catalog["etag"]:
+            headers["If-None-Match"] = catalog["etag"]
+        if catalog and catalog["last_modified"]:
+            headers["If-Modified-Since"] = catalog["last_modified"]
+
+        self.logger.debug("Fetching available models")
+
+        try:
+            session = self._get_session()
+            async with session.get(
+                f"{self.base_url}/models",
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                if response.status == 304 and catalog:
+                    self.logger.info("Model catalog not modified")
+                    await self._catalog_call('touch_model_catalog')
+                    return catalog["models"]
+
+                response.raise_for_status()
+                models = self._parse_models(await response.json())
+                await self._catalog_call(
+                    'save_model_catalog', models,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified")
+                )
+                return models
+        except asyncio.TimeoutError:
+            self.logger.error("Request timed out")
+            return self._fallback_models(cached_models)
+        except aiohttp.ClientError as e:
+            self.logger.error("Request failed: %s", e, exc_info=True)
+            return self._fallback_models(cached_models)
+        except KeyError:
+            self.logger.error("Malformed JSON response")
+            return self._fallback_models(cached_models)
+
+    async def _catalog_call(self, name, *args, **kwargs):
+        """
+        Обращение к хранилищу каталога моделей вне event loop.
+
+        Args:
+            name (str): Метод ChatCache (get_model_catalog и т.д.).
+
+        Returns:
+            Результат метода или None, если хранилища нет.
+        """
+        if self.db is not None:
+            return await getattr(self.db, name)(*args, **kwargs)
+        if self.cache is not None:
+            return await asyncio.to_thread(getattr(self.cache, name),
+                                           *args, **kwargs)
+        return None
+
+    def get_cached_models(self):
+        """
+        Получение последнего сохранённого каталога моделей без запроса к API.
+
+        Returns:
+            list: Список моделей или None, если каталог ещё не сохранялся.
+        """
+        catalog = self.cache.get_model_catalog() if self.cache else None
+        return catalog["models"] if catalog else None
+
+    def _parse_models(self, models_data):
+        """
+        Преобразование ответа /models в список моделей.
+
+        Args:
+            models_data (dict): Тело ответа API.
+
+        Returns:
+            list: Список моделей
+                  [{"id": "model-id", "name": "Model Name"}, ...]
+
+        Raises:
+            KeyError: Если ответ не содержит ожидаемых полей.
+        """
+        self.logger.info("Retrieved %s models", len(models_data['data']))
+        return [
+            {
+                "id": model["id"],
+                "name": model["name"],
+                "context_length": model.get("context_length")
+            }
+            for model in models_data["data"]
+        ]
+
+    def get_context_length(self, model: str) -> int:
+        """
+        Размер контекста модели в токенах по данным каталога.
+
+        Args:
+            model (str): Идентификатор модели.
+
+        Returns:
+            int: Размер контекста или DEFAULT_CONTEXT_LENGTH,
+                 если он неизвестен.
+        """
+        for item in self.available_models or []:
+            if item["id"] == model:
+                return item.get("context_length") or DEFAULT_CONTEXT_LENGTH
+        return DEFAULT_CONTEXT_LENGTH
+
     def _get_default_models(self):
         """
-        Возвращает список базовых моделей по умолчанию.
+        Возвращает последний сохранённый каталог моделей,
+        а если его нет — список базовых моделей по умолчанию.
+
+        Returns:
+            list: Список моделей.
+        """
+        return self._fallback_models(self.get_cached_models())
+
+    def _fallback_models(self, cached_models):
+        """
+        Возвращает уже загруженный сохранённый каталог моделей,
+        а если его нет — список базовых моделей по умолчанию.
+
+        Args:
+            cached_models (list): Сохранённый каталог или None.
 
         Returns:
-            list: Список стандартных моделей.
+            list: Список моделей.
         """
+        if cached_models:
+            self.logger.info(
+                "Using last known model catalog: %s", len(cached_models)
+            )
+            return cached_models
+
         models_default = [
             {"id": "deepseek-coder", "name": "DeepSeek"},
             {"id": "claude-3-sonnet", "name": "Claude 3.5 Sonnet"},
             {"id": "gpt-3.5-turbo", "name": "GPT-3.5 Turbo"}
         ]
-        self.logger.info(f"Using default models: {len(models_default)}")
+        self.logger.info("Using default models: %s", len(models_default))
         return models_default
 
-    async def send_message(self, message: str, model: str):
+    async def send_message(self, message: str, model: str, deadline=None,
+                           history=None):
         """
         Отправка сообщения выбранной языковой модели.
 
+        Временные ошибки (429, 5xx, сетевые сбои) повторяются
+        согласно retry_policy.
+
         Args:
             message (str): Сообщение для модели.
             model (str): Идентификатор модели.
+            deadline (float): Общее время на запрос в секундах
+                              (по умолчанию retry_policy.deadline).
+            history (list): Предыдущие сообщения диалога
+                            [{"role": ..., "content": ...}, ...].
 
         Returns:
             dict: Ответ модели или сообщение об ошибке.
@@ -130,32 +523,344 @@ class OpenRouterClient:
         if not self.headers:
             return {"error": "API key not set"}
 
-        self.logger.debug(f"Sending message to model: {model}")
+        self.logger.debug("Sending message to model: %s", model)
 
         data = {
             "model": model,
-            "messages": [{"role": "user", "content": message}]
+            "messages": [
+                *(history or []), {"role": "user", "content": message}
+            ]
         }
 
         try:
             self.logger.debug("Making API request")
-            # Асинхронный запрос через aiohttp
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/chat/completions",
-                    headers=self.headers,
-                    json=data,
-                    timeout=30
-                ) as response:
+            response = await self._open_completion(
+                data, aiohttp.ClientTimeout(total=30), deadline
+            )
+            async with response:
+                with self.tracer.span("api.read_body", model=model):
                     response_data = await response.json()
-                    self.logger.info("Successfully received response from API")
-                    return response_data
+            self.logger.info("Successfully received response from API")
+            return response_data
 
+        except OpenRouterError as e:
+            self.logger.error("API request failed: %s", e)
+            return {"error": str(e)}
         except Exception as e:
-            error_msg = f"API request failed: {str(e)}"
-            self.logger.error(error_msg, exc_info=True)
+            self.logger.error("API request failed: %s", e, exc_info=True)
             return {"error": str(e)}
 
+    async def stream_message(self, message: str, model: str, deadline=None,
+                             history=None):
+        """
+        Потоковая отправка сообщения выбранной языковой модели.
+
+        Запрос выполняется с параметром `stream: true`, ответ приходит
+        в виде server-sent events и отдаётся по мере поступления.
+        Повторные попытки выполняются только до начала потока.
+
+        Args:
+            message (str): Сообщение для модели.
+            model (str): Идентификатор модели.
+            deadline (float): Время на установку потока в секундах
+                              (по умолчанию retry_policy.deadline).
+            history (list): Предыдущие сообщения диалога
+                            [{"role": ..., "content": ...}, ...].
+
+        Yields:
+            dict: {"content": "..."} для каждого фрагмента ответа,
+                  {"usage": {...}} со статистикой токенов в конце потока
+                  или {"error": "..."} при ошибке.
+        """
+        if not self.headers:
+            yield {"error": "API key not set"}
+            return
+
+        self.logger.debug("Streaming message to model: %s", model)
+
+        data = {
+            "model": model,
+            "messages": [
+                *(history or []), {"role": "user", "content": message}
+            ],
+            "stream": True,
+            # Запрос статистики токенов в последнем фрагменте потока
+            "usage": {"include": True}
+        }
+
+        try:
+            response = await self._open_completion(
+                data,
+                # Ограничиваем паузу между фрагментами, а не весь поток
+                aiohttp.ClientTimeout(
+                    total=None, sock_connect=10, sock_read=60
+                ),
+                deadline
+            )
+            async with response:
+                async for payload in self._iter_sse(response):
+                    if payload == "[DONE]":
+                        break
+
+                    chunk = json.loads(payload)
+                    if "error" in chunk:
+                        error = chunk["error"]
+                        yield {"error": error.get("message", str(error))
+                               if isinstance(error, dict) else str(error)}
+                        return
+
+                    choices = chunk.get("choices") or []
+                    if choices:
+                        delta = choices[0].get("delta", {}).get("content")
+                        if delta:
+                            yield {"content": delta}
+                    if chunk.get("usage"):
+                        yield {"usage": chunk["usage"]}
+
+                self.logger.info("Successfully received stream from API")
+
+        except OpenRouterError as e:
+            self.logger.error("API stream failed: %s", e)
+            yield {"error": str(e)}
+        except Exception as e:
+            self.logger.error("API stream failed: %s", e, exc_info=True)
+            yield {"error": str(e)}
+
+    async def send_to_models(self, message: str, models: list,
+                             concurrency=4, timeout=60.0, mode="all"):
+        """
+        Параллельная отправка одного сообщения нескольким моделям.
+
+        Одновременно выполняется не более concurrency запросов; каждый
+        ограничен собственным таймаутом. Ответы отдаются по мере
+        готовности, а не в порядке списка моделей.
+
+        Args:
+            message (str): Сообщение для моделей.
+            models (list): Идентификаторы моделей.
+            concurrency (int): Максимальное число одновременных запросов.
+            timeout (float): Таймаут ответа одной модели в секундах.
+            mode (str): "all" — дождаться всех ответов,
+                        "first" — остановиться на первом успешном
+                        ответе и отменить остальные запросы.
+
+        Yields:
+            tuple: (model, response, response_time), где response —
+                   ответ в формате send_message, а response_time —
+                   время ответа модели в секундах.
+        """
+        if mode not in ("all", "first"):
+            raise ValueError(f"Unknown fan-out mode: {mode}")
+
+        self.logger.debug(
+            "Fan-out to %s models, concurrency %s", len(models), concurrency
+        )
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def ask(model):
+            async with semaphore:
+                start = time.monotonic()
+                try:
+                    response = await asyncio.wait_for(
+                        self.send_message(message, model, deadline=timeout),
+                        timeout=timeout
+                    )
+                except asyncio.TimeoutError:
+                    response = {"error": f"Timed out after {timeout:g}s"}
+                return model, response, time.monotonic() - start
+
+        tasks = [asyncio.create_task(ask(model)) for model in models]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                model, response, response_time = await next_result
+                yield model, response, response_time
+                if mode == "first" and "error" not in response:
+                    break
+        finally:
+            # Отмена незавершённых запросов (режим "first" или выход
+            # вызывающего кода из цикла) и ожидание их завершения,
+            # чтобы освобождение ответов и учёт предохранителей
+            # закончились до возврата
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def _get_breaker(self, model: str) -> CircuitBreaker:
+        """
+        Получение предохранителя для модели.
+
+        Args:
+            model (str): Идентификатор модели.
+
+        Returns:
+            CircuitBreaker: Предохранитель модели.
+        """
+        if model not in self._breakers:
+            self._breakers[model] = CircuitBreaker(
+                self.breaker_threshold, self.breaker_reset_timeout
+            )
+        return self._breakers[model]
+
+    async def _open_completion(self, data: dict, timeout, deadline=None):
+        """
+        Выполнение запроса к /chat/completions с повторными попытками.
+
+        Временные ошибки повторяются с экспоненциальной задержкой
+        (или паузой из Retry-After), пока не исчерпаны попытки или
+        общее время deadline. Ошибки учитываются предохранителем модели.
+
+        Args:
+            data (dict): Тело запроса.
+            timeout (aiohttp.ClientTimeout): Таймауты одной попытки.
+            deadline (float): Общее время на запрос в секундах.
+
+        Returns:
+            aiohttp.ClientResponse: Ответ со статусом 200.
+                                    Закрывать его должен вызывающий код.
+
+        Raises:
+            OpenRouterError: Если запрос не удался.
+        """
+        model = data["model"]
+        breaker = self._get_breaker(model)
+        policy = self.retry_policy
+        deadline_at = time.monotonic() + (deadline or policy.deadline)
+        session = self._get_session()
+        attempt = 0
+
+        while True:
+            if not breaker.allow_request():
+                raise OpenRouterError(
+                    f"Model {model} is temporarily unavailable "
+                    f"(circuit open after {breaker.failures} failures)"
+                )
+
+            attempt += 1
+            remaining = deadline_at - time.monotonic()
+            # Исход попытки регистрируется при любом выходе,
+            # иначе пробная попытка не снимается
+            recorded = False
+            try:
+                try:
+                    with self.tracer.span("api.request", model=model,
+                                          attempt=attempt) as span:
+                        response = await asyncio.wait_for(
+                            session.post(
+                                f"{self.base_url}/chat/completions",
+                                headers=self.headers,
+                                json=data,
+                                timeout=timeout
+                            ),
+                            timeout=max(remaining, 0)
+                        )
+                        span["status"] = response.status
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    self._attempts_metric.inc(model=model, status="network")
+                    error = OpenRouterError(
+                        f"{type(e).__name__}: {e}" if str(e)
+                        else type(e).__name__
+                    )
+                else:
+                    self._attempts_metric.inc(model=model,
+                                              status=response.status)
+                    if response.status == 200:
+                        breaker.record_success()
+                        recorded = True
+                        return response
+
+                    body = await response.text()
+                    response.release()
+                    error = OpenRouterError(
+                        f"HTTP {response.status}: {body}",
+                        status=response.status,
+                        retry_after=self._parse_retry_after(
+                            response.headers.get("Retry-After")
+                        )
+                    )
+                    if response.status not in policy.RETRY_STATUSES:
+                        # Ошибки запроса (400, 401, 402...) не повторяются;
+                        # сервис при этом доступен
+                        breaker.record_success()
+                        recorded = True
+                        raise error
+
+                breaker.record_failure()
+                recorded = True
+            finally:
+                if not recorded:
+                    breaker.release()
+            if attempt >= policy.max_attempts or (
+                    breaker.state == CircuitBreaker.OPEN):
+                raise error
+
+            delay = (error.retry_after if error.retry_after is not None
+                     else policy.backoff(attempt))
+            if time.monotonic() + delay >= deadline_at:
+                raise error
+
+            self.logger.warning(
+                "Attempt %s to %s failed (%s), retrying in %.2fs",
+                attempt, model, error, delay
+            )
+            with self.tracer.span("api.backoff", model=model, delay=delay):
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    def _parse_retry_after(value):
+        """
+        Разбор заголовка Retry-After.
+
+        Args:
+            value (str): Число секунд или HTTP-дата.
+
+        Returns:
+            float: Пауза в секундах или None, если заголовка нет.
+        """
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(
+            (retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0
+        )
+
+    @staticmethod
+    async def _iter_sse(response):
+        """
+        Разбор потока server-sent events.
+
+        Собирает строки `data:` одного события и отдаёт их после пустой
+        строки-разделителя. Комментарии (строки, начинающиеся с `:`)
+        и прочие поля события пропускаются.
+
+        Args:
+            response (aiohttp.ClientResponse): Ответ с потоком событий.
+
+        Yields:
+            str: Данные очередного события.
+        """
+        data_lines = []
+        async for raw_line in response.content:
+            line = raw_line.decode("utf-8").rstrip("\r\n")
+            if not line:
+                if data_lines:
+                    yield "\n".join(data_lines)
+                    data_lines = []
+                continue
+            if line.startswith(":"):
+                continue
+            if line.startswith("data:"):
+                data_lines.append(line[5:].lstrip(" "))
+        if data_lines:
+            yield "\n".join(data_lines)
+
     def get_balance(self):
         """
         Получение текущего баланса аккаунта.
@@ -167,19 +872,58 @@ class OpenRouterClient:
             # Запрос баланса через API
             response = requests.get(
                 f"{self.base_url}/credits",
-                headers=self.headers
+                headers=self.headers,
+                timeout=10
             )
-            data = response.json()
+            return self._parse_balance(response.json())
+        except Exception as e:
+            self.logger.error("API request failed: %s", e, exc_info=True)
+            return "Ошибка"
 
-            if data:
-                data = data.get("data", {})
-                # Вычисление доступного баланса
-                balance = data.get("total_credits", 0) - data.get(
-                    "total_usage", 0)
-                return f"${balance:.2f}"
+    async def get_balance_async(self):
+        """
+        Асинхронное получение текущего баланса аккаунта.
 
+        Returns:
+            str: Баланс в формате '$X.XX' или 'Ошибка' при неудаче.
+        """
+        if not self.headers:
+            self.logger.error("Headers not initialized. Set API key first")
             return "Ошибка"
+
+        try:
+            session = self._get_session()
+            async with session.get(
+                f"{self.base_url}/credits",
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                if response.status != 200:
+                    # Тело ошибки ({"error": ...}) не содержит баланса
+                    self.logger.error("Balance request failed: HTTP %s",
+                                      response.status)
+                    return "Ошибка"
+                return self._parse_balance(await response.json())
         except Exception as e:
-            error_msg = f"API request failed: {str(e)}"
-            self.logger.error(error_msg, exc_info=True)
+            self.logger.error("API request failed: %s", e, exc_info=True)
             return "Ошибка"
+
+    @staticmethod
+    def _parse_balance(data):
+        """
+        Расчёт доступного баланса из ответа /credits.
+
+        Args:
+            data (dict): Тело ответа API.
+
+        Returns:
+            str: Баланс в формате '$X.XX' или 'Ошибка'.
+        """
+        if data and isinstance(data.get("data"), dict):
+            data = data["data"]
+            # Вычисление доступного баланса
+            balance = data.get("total_credits", 0) - data.get(
+                "total_usage", 0)
+            return f"${balance:.2f}"
+
+        return "Ошибка"
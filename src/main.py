@@ -1,11 +1,25 @@
 import flet as ft  # Фреймворк для создания кроссплатформенных приложений с современным UI
 from api.openrouter import OpenRouterClient  # Клиент для взаимодействия с AI API через OpenRouter
+from api.context import ConversationContext  # Контекст многоходового диалога
 from ui.styles import AppStyles  # Модуль с настройками стилей интерфейса
-from ui.components import MessageBubble, ModelSelector, AuthWindow  # Компоненты пользовательского интерфейса
-from utils.cache import ChatCache  # Модуль для кэширования истории чата
+from ui.render import RenderScheduler  # Пакетные обновления интерфейса
+from ui.components import (  # Компоненты пользовательского интерфейса
+    MessageBubble, VirtualChatList, ModelSelector, AuthWindow, ComparisonRow,
+    SearchResult
+)
+from utils.async_cache import AsyncChatCache  # Кэширование истории чата
 from utils.logger import AppLogger  # Модуль для логирования работы приложения
 from utils.analytics import Analytics  # Модуль для сбора и анализа статистики использования
 from utils.monitor import PerformanceMonitor  # Модуль для мониторинга производительности
+from utils.tracing import Tracer  # Трассировка этапов обработки запросов
+from utils.response_cache import ResponseCache  # Кэш идентичных запросов
+from utils.semantic_cache import SemanticCache  # Кэш близких запросов
+from utils.metrics import MetricsRegistry, MetricsServer  # OpenMetrics
+from utils.tasks import (  # Фоновые операции ввода-вывода и сторож event loop
+    TaskRunner, LoopWatchdog, TaskCancelled, report_progress
+)
+from dotenv import load_dotenv  # Загрузка настроек из файла .env
+import asyncio  # Библиотека для параллельного выполнения запросов
 import random
 import time  # Библиотека для работы с временными метками
 import json  # Библиотека для работы с JSON-данными
@@ -21,28 +35,112 @@ class ChatApp:
     взаимодействие с API.
     """
 
+    # Количество ходов диалога на одной странице истории
+    HISTORY_PAGE_SIZE = 50
+
+    # Расстояние до начала диалога (в пикселях), с которого
+    # подгружается следующая страница истории
+    HISTORY_PRELOAD_PIXELS = 300
+
+    # Количество результатов поиска на одной странице
+    SEARCH_PAGE_SIZE = 20
+
     def __init__(self):
         """
         Базовая инициализация компонентов приложения.
         Полная инициализация происходит после успешной аутентификации.
         """
         # Системные компоненты
-        self.cache = ChatCache()
+        self.tracer = Tracer(path=os.getenv("TRACE_FILE") or None)
+        self.metrics = MetricsRegistry()
         self.logger = AppLogger()
 
+        # База истории чата: запись одним потоком, чтение пулом
+        # соединений только для чтения. Обработчики интерфейса ожидают
+        # запросы через self.db, компоненты, работающие в потоках
+        # (аналитика, кэш ответов, каталог моделей), используют
+        # синхронные методы тех же потоков self.cache
+        self.db = AsyncChatCache(tracer=self.tracer, metrics=self.metrics)
+        self.cache = self.db.sync
+
+        # Пул потоков для операций с SQLite и файлами: обработчики
+        # интерфейса ожидают их через await, не блокируя event loop
+        self.tasks = TaskRunner(
+            max_workers=int(os.getenv("IO_WORKERS") or 4),
+            metrics=self.metrics
+        )
+        self.watchdog = LoopWatchdog(
+            threshold=float(os.getenv("LOOP_STALL_THRESHOLD") or 0.25),
+            logger=self.logger, metrics=self.metrics
+        )
+
+        # Эндпоинт метрик для внешнего сбора (если задан METRICS_PORT)
+        self.metrics_server = None
+        metrics_port = os.getenv("METRICS_PORT")
+        if metrics_port:
+            self.metrics_server = MetricsServer(
+                self.metrics, int(metrics_port),
+                host=os.getenv("METRICS_HOST") or "127.0.0.1"
+            )
+            self.metrics_server.start()
+            self.logger.info(
+                "Метрики доступны на порту %s", self.metrics_server.port
+            )
+
+        # Кэш ответов на идентичные запросы (включается RESPONSE_CACHE=1)
+        self.response_cache = None
+        if os.getenv("RESPONSE_CACHE") == "1":
+            self.response_cache = ResponseCache(
+                self.cache,
+                ttl=float(os.getenv("RESPONSE_CACHE_TTL") or 86400),
+                max_rows=int(os.getenv("RESPONSE_CACHE_MAX_ROWS") or 10000),
+            )
+
+        # Кэш ответов на близкие запросы поверх кэша ответов
+        # (включается SEMANTIC_CACHE=1, индекс хранится рядом с базой)
+        self.semantic_cache = None
+        if self.response_cache and os.getenv("SEMANTIC_CACHE") == "1":
+            self.semantic_cache = SemanticCache(
+                self.response_cache,
+                os.path.splitext(self.cache.db_name)[0] + ".semantic.npz",
+                threshold=float(
+                    os.getenv("SEMANTIC_CACHE_THRESHOLD") or 0.92
+                ),
+                max_entries=int(
+                    os.getenv("SEMANTIC_CACHE_MAX_ENTRIES") or 100_000
+                ),
+            )
+
         # Переменные, связанные с API
         self.api_client = None
+        self.context = ConversationContext()
+        self.conversation_id = None
+
+        # Состояние постраничной загрузки истории
+        self.history_cursor = None
+        self.history_exhausted = False
+        self.history_loading = False
         self.analytics = None
         self.monitor = None
 
         # UI-компоненты
         self.page = None
+        self.renderer = None
         self.auth_window = None
         self.main_window = None
         self.balance_text = None
         self.chat_history = None
         self.message_input = None
+        self.search_input = None
         self.model_dropdown = None
+        self.compare_chips = None
+        self.save_button = None
+
+        # Текущий экспорт диалога в файл
+        self.export_task = None
+
+        # Модели, которым отправляется сообщение при сравнении
+        self.compare_models = []
 
         # Папка для экспорта истории чата
         self.exports_dir = "exports"
@@ -69,18 +167,22 @@ class ChatApp:
             bool: True, если ключ валиден, False в противном случае.
         """
         try:
-            temp_client = OpenRouterClient()
-            temp_client.api_key = key
-            balance = temp_client.get_balance()
-            return balance and balance != "Ошибка"
+            # Для проверки достаточно запроса баланса, каталог моделей не нужен
+            async with OpenRouterClient(logger=self.logger) as temp_client:
+                temp_client.api_key = key
+                balance = await temp_client.get_balance_async()
+            # Неверный ключ: /credits отвечает 401, баланс — "Ошибка"
+            return bool(balance) and balance != "Ошибка"
         except Exception as e:
-            self.logger.error(f"Ошибка валидации ключа: {e}")
+            self.logger.error("Ошибка валидации ключа: %s", e)
             return False
 
-    def init_app(self, api_key: str) -> bool:
+    async def init_app(self, api_key: str) -> bool:
         """
         Полная инициализация приложения после аутентификации.
 
+        Каталог моделей и баланс загружаются параллельно.
+
         Args:
             api_key (str): Переданный API-ключ.
 
@@ -88,48 +190,146 @@ class ChatApp:
             bool: True, если инициализация прошла успешно.
         """
         try:
-            self.api_client = OpenRouterClient()
-            self.api_client.api_key = api_key  # Модели загрузятся в этот момент
-
-            self.analytics = Analytics(self.cache)
-            self.monitor = PerformanceMonitor()
-
-            # Здесь получение моделей не вызывается повторно!
-            self.model_dropdown = ModelSelector(models=self.api_client.available_models)
+            # Клиент и аналитика читают базу при создании
+            self.api_client, self.analytics, cached_models = (
+                await self.tasks.run(self.build_services, api_key)
+            )
+            self.monitor = PerformanceMonitor(metrics=self.metrics)
+            self.monitor.start()
 
             self.balance_text = ft.Text(
                 "Баланс: Загрузка...",
                 **AppStyles.BALANCE_TEXT
             )
-            self.update_balance()
+
+            if cached_models:
+                # Сразу показываем сохранённый каталог и обновляем его в фоне
+                await self.update_balance()
+                models = cached_models
+                self.page.run_task(self.refresh_models)
+            else:
+                # Параллельная загрузка каталога моделей и баланса
+                models, _ = await asyncio.gather(
+                    self.api_client.get_models_async(),
+                    self.update_balance(),
+                )
+            self.api_client.available_models = models
+            self.model_dropdown = ModelSelector(models=models,
+                                                renderer=self.renderer)
             return True
         except Exception as e:
-            self.logger.error(f"Ошибка инициализации приложения: {e}")
+            self.logger.error("Ошибка инициализации приложения: %s", e)
             return False
 
-    def update_balance(self):
+    def build_services(self, api_key: str) -> tuple:
+        """
+        Создание клиента API и аналитики (выполняется в пуле потоков).
+
+        Args:
+            api_key (str): Переданный API-ключ.
+
+        Returns:
+            tuple: (клиент API, аналитика, сохранённый каталог моделей
+                   или None).
+        """
+        api_client = OpenRouterClient(cache=self.cache, db=self.db,
+                                      tracer=self.tracer,
+                                      metrics=self.metrics,
+                                      logger=self.logger)
+        api_client.api_key = api_key
+        analytics = Analytics(self.cache, tracer=self.tracer,
+                              metrics=self.metrics)
+        return api_client, analytics, api_client.get_cached_models()
+
+    async def refresh_models(self):
+        """
+        Фоновое обновление каталога моделей после запуска приложения.
+        """
+        try:
+            models = await self.api_client.get_models_async()
+            if models != self.api_client.available_models:
+                self.api_client.available_models = models
+                self.model_dropdown.set_models(models)
+        except Exception as e:
+            self.logger.error("Ошибка обновления списка моделей: %s", e)
+
+    async def update_balance(self):
         """Обновление отображения баланса API."""
         try:
-            balance = self.api_client.get_balance()
+            balance = await self.api_client.get_balance_async()
             self.balance_text.value = f"Баланс: {balance}"
             self.balance_text.color = ft.Colors.GREEN_400
         except Exception as e:
             self.balance_text.value = "Баланс: н/д"
             self.balance_text.color = ft.Colors.RED_400
-            self.logger.error(f"Ошибка обновления баланса: {e}")
+            self.logger.error("Ошибка обновления баланса: %s", e)
 
-    def load_chat_history(self):
-        """Загрузка истории чата из локального кэша."""
+    async def load_chat_history(self):
+        """Загрузка первой страницы текущего (последнего) диалога из кэша."""
         try:
-            history = self.cache.get_chat_history()
-            for msg in reversed(history):
-                _, model, user_message, ai_response, timestamp, tokens = msg
-                self.chat_history.controls.extend([
-                    MessageBubble(message=user_message, is_user=True),
-                    MessageBubble(message=ai_response, is_user=False),
-                ])
+            self.conversation_id = (
+                await self.db.get_latest_conversation()
+                or await self.db.create_conversation()
+            )
+            self.history_cursor = None
+            self.history_exhausted = False
+            history = await self.load_history_page()
+
+            # Восстановление контекста диалога для следующих запросов
+            self.context.load(
+                (msg[2], msg[3]) for msg in reversed(history)
+            )
         except Exception as e:
-            self.logger.error(f"Ошибка загрузки истории чата: {e}")
+            self.logger.error("Ошибка загрузки истории чата: %s", e)
+
+    async def load_history_page(self) -> list:
+        """
+        Загрузка следующей (более старой) страницы истории диалога.
+
+        Список чата отображается в обратном порядке (новые сообщения
+        внизу, с индексом 0), поэтому старые сообщения добавляются
+        в конец списка и не сдвигают текущую позицию прокрутки.
+
+        Returns:
+            list: Загруженные строки истории от новых к старым.
+        """
+        history = await self.db.get_history_page(
+            self.conversation_id,
+            before=self.history_cursor,
+            limit=self.HISTORY_PAGE_SIZE
+        )
+        older = []
+        for msg in history:
+            _, model, user_message, ai_response, timestamp, tokens = msg
+            older.extend([[ai_response, False], [user_message, True]])
+        self.chat_history.append_older(older)
+
+        if history:
+            self.history_cursor = (history[-1][4], history[-1][0])
+        if len(history) < self.HISTORY_PAGE_SIZE:
+            self.history_exhausted = True
+        return history
+
+    async def handle_history_scroll(self, e):
+        """
+        Подгрузка старых сообщений при прокрутке к началу диалога.
+
+        Args:
+            e: Событие прокрутки списка чата.
+        """
+        if self.history_exhausted or self.history_loading:
+            return
+        if e.pixels < e.max_scroll_extent - self.HISTORY_PRELOAD_PIXELS:
+            return
+
+        self.history_loading = True
+        try:
+            if await self.load_history_page():
+                self.renderer.invalidate(self.chat_history)
+        except Exception as e:
+            self.logger.error("Ошибка загрузки истории чата: %s", e)
+        finally:
+            self.history_loading = False
 
     async def send_message_click(self, _):
         """
@@ -141,69 +341,299 @@ class ChatApp:
         if not self.message_input.value:
             return
 
-        try:
-            # Обновляем состояние перед отправкой
-            self.message_input.border_color = ft.Colors.BLUE_400
-            self.page.update()
-
-            start_time = time.time()
-            user_message = self.message_input.value
-            self.message_input.value = ""
-            self.page.update()
-
-            # Отображение сообщения пользователя в чате
-            self.chat_history.controls.append(
-                MessageBubble(message=user_message, is_user=True)
-            )
+        # Все изменения интерфейса за ход отправляются пакетами
+        # планировщика; их число и объём записываются в лог и метрики
+        with self.renderer.turn() as ui_stats:
+            try:
+                with self.tracer.span("ui.send_message",
+                                      model=self.model_dropdown.value):
+                    # Обновляем состояние перед отправкой
+                    start_time = time.time()
+                    user_message = self.message_input.value
+                    self.message_input.border_color = ft.Colors.BLUE_400
+                    self.message_input.value = ""
+
+                    # Отображение сообщения пользователя в чате
+                    # (список перевёрнут: новые сообщения вставляются в начало)
+                    self.chat_history.push([user_message, True])
+
+                    # Показ индикатора загрузки до прихода первого токена
+                    loading = ft.ProgressRing()
+                    self.chat_history.push(loading)
+                    self.renderer.invalidate(self.message_input,
+                                             self.chat_history)
+
+                    # Предыдущие ходы диалога в пределах контекста модели
+                    with self.tracer.span("context.build_history"):
+                        history = self.context.build_history(
+                            user_message,
+                            self.api_client.get_context_length(
+                                self.model_dropdown.value
+                            )
+                        )
+
+                    # Ответ на идентичный, а затем на близкий запрос из кэша
+                    cache_key = cached = None
+                    request_messages = [
+                        *history, {"role": "user", "content": user_message}
+                    ]
+                    if self.response_cache:
+                        cache_key = self.response_cache.make_key(
+                            self.model_dropdown.value, request_messages
+                        )
+                        cached = await self.tasks.run(
+                            self.response_cache.get, cache_key
+                        )
+                        semantic = False
+                        if cached is None and self.semantic_cache:
+                            with self.tracer.span(
+                                    "cache.semantic_lookup") as span:
+                                found = await self.tasks.run(
+                                    self.semantic_cache.get,
+                                    self.model_dropdown.value,
+                                    request_messages
+                                )
+                                span['hit'] = found is not None
+                            if found is not None:
+                                cached, semantic = found[:2], True
+                                self.logger.debug(
+                                    "Ответ по близкому запросу "
+                                    "(сходство %.3f)", found[2]
+                                )
+                        self.analytics.track_response_cache(
+                            cached is not None, semantic=semantic
+                        )
+
+                    # Потоковое получение ответа от API
+                    response_text = ""
+                    tokens_used = 0
+                    error = None
+                    ai_bubble = None
+                    ttft = None
+                    if cached is not None:
+                        response_text, tokens_used = cached
+                    else:
+                        with self.tracer.span("ui.stream"):
+                            async for chunk in self.api_client.stream_message(
+                                user_message, self.model_dropdown.value,
+                                history=history
+                            ):
+                                if "error" in chunk:
+                                    error = chunk["error"]
+                                    break
+                                if "usage" in chunk:
+                                    tokens_used = chunk["usage"].get(
+                                        "total_tokens", 0
+                                    )
+                                    continue
+
+                                if ai_bubble is None:
+                                    # Первый фрагмент: заменяем индикатор
+                                    # пузырьком ответа
+                                    ttft = time.time() - start_time
+                                    self.tracer.mark("api.first_token")
+                                    self.logger.debug(
+                                        "Время до первого токена: %.3fс", ttft
+                                    )
+                                    ai_bubble = MessageBubble(
+                                        message="", is_user=False,
+                                        renderer=self.renderer
+                                    )
+                                    self.chat_history.replace(loading,
+                                                              ai_bubble)
+                                    self.renderer.invalidate(self.chat_history)
+                                    with self.tracer.span("ui.page_update"):
+                                        self.renderer.flush()
+                                response_text += chunk["content"]
+                                ai_bubble.append_text(chunk["content"])
+
+                    self.chat_history.remove(loading)
+
+                    # Обработка ошибки API
+                    if error is not None:
+                        response_text = f"Ошибка: {error}"
+                        self.logger.error("Ошибка API: %s", error)
+                        self.analytics.track_error(
+                            self.model_dropdown.value, time.time() - start_time
+                        )
+                    else:
+                        # В историю сохраняются только успешные ответы
+                        self.context.add_turn(user_message, response_text)
+                        await self.db.save_message(
+                            model=self.model_dropdown.value,
+                            user_message=user_message,
+                            ai_response=response_text,
+                            tokens_used=tokens_used,
+                            conversation_id=self.conversation_id,
+                        )
+                        if cache_key and cached is None:
+                            await self.tasks.run(
+                                self.cache_response, cache_key,
+                                self.model_dropdown.value, request_messages,
+                                response_text, tokens_used
+                            )
+
+                    # Вывод окончательного текста ответа ИИ в истории чата
+                    if ai_bubble is None:
+                        self.chat_history.push([response_text, False])
+                        self.renderer.invalidate(self.chat_history)
+                    else:
+                        # Последний фрагмент мог не попасть в отправленные
+                        # из-за ограничения частоты обновлений
+                        ai_bubble.text.value = response_text
+                        ai_bubble.flush()
+
+                    # Ошибки и ответы из кэша не учитываются в задержках API
+                    if error is None and cached is None:
+                        # Сохранение статистики
+                        response_time = time.time() - start_time
+                        self.analytics.track_message(
+                            model=self.model_dropdown.value,
+                            message_length=len(user_message),
+                            response_time=response_time,
+                            tokens_used=tokens_used,
+                            ttft=ttft,
+                        )
+
+                        with self.tracer.span("monitor.log_metrics"):
+                            self.monitor.log_metrics(self.logger)
+            except Exception as e:
+                self.logger.error("Ошибка отправки сообщения: %s", e)
+                self.message_input.border_color = ft.Colors.RED_500
+                self.renderer.invalidate(self.message_input)
+                self.show_error_snack(str(e))
+        self.logger.debug(
+            "Обновлений интерфейса за ход: %d (%d байт)",
+            ui_stats['updates'], ui_stats['bytes']
+        )
 
-            # Показ индикатора загрузки
-            loading = ft.ProgressRing()
-            self.chat_history.controls.append(loading)
-            self.page.update()
+    def cache_response(self, cache_key, model, request_messages,
+                       response_text, tokens_used):
+        """
+        Сохранение ответа в кэшах ответов (выполняется в пуле потоков).
 
-            # Выполнение запроса к API
-            response = await self.api_client.send_message(
-                user_message, self.model_dropdown.value
-            )
-            self.chat_history.controls.remove(loading)
+        Args:
+            cache_key (str): Ключ кэша ответов.
+            model (str): Идентификатор модели.
+            request_messages (list): Сообщения запроса к модели.
+            response_text (str): Ответ модели.
+            tokens_used (int): Количество использованных токенов.
+        """
+        self.response_cache.put(cache_key, model, response_text, tokens_used)
+        if self.semantic_cache:
+            self.semantic_cache.add(model, request_messages, cache_key)
 
-            # Обработка ответа от API
-            if "error" in response:
-                response_text = f"Ошибка: {response['error']}"
-                tokens_used = 0
-                self.logger.error(f"Ошибка API: {response['error']}")
-            else:
-                response_text = response["choices"][0]["message"]["content"]
-                tokens_used = response.get("usage", {}).get("total_tokens", 0)
-
-            # Сохранение сообщений в кэш
-            self.cache.save_message(
-                model=self.model_dropdown.value,
-                user_message=user_message,
-                ai_response=response_text,
-                tokens_used=tokens_used,
-            )
+    def add_to_comparison(self, _):
+        """
+        Добавление выбранной модели в список сравнения.
 
-            # Добавление ответа ИИ в историю чата
-            self.chat_history.controls.append(
-                MessageBubble(message=response_text, is_user=False)
-            )
+        Args:
+            _: Событие клика кнопки.
+        """
+        model = self.model_dropdown.value
+        if not model or model in self.compare_models:
+            return
 
-            # Сохранение статистики
-            response_time = time.time() - start_time
-            self.analytics.track_message(
-                model=self.model_dropdown.value,
-                message_length=len(user_message),
-                response_time=response_time,
-                tokens_used=tokens_used,
+        self.compare_models.append(model)
+        self.compare_chips.controls.append(
+            ft.Chip(
+                label=ft.Text(model, size=12),
+                on_delete=lambda _, m=model: self.remove_from_comparison(m),
+                data=model,
             )
+        )
+        self.renderer.invalidate(self.compare_chips)
 
-            self.monitor.log_metrics(self.logger)
-            self.page.update()
-        except Exception as e:
-            self.logger.error(f"Ошибка отправки сообщения: {e}")
-            self.message_input.border_color = ft.Colors.RED_500
-            self.show_error_snack(str(e))
+    def remove_from_comparison(self, model: str):
+        """
+        Удаление модели из списка сравнения.
+
+        Args:
+            model (str): Идентификатор модели.
+        """
+        if model in self.compare_models:
+            self.compare_models.remove(model)
+        self.compare_chips.controls = [
+            chip for chip in self.compare_chips.controls if chip.data != model
+        ]
+        self.renderer.invalidate(self.compare_chips)
+
+    async def compare_models_click(self, _):
+        """
+        Отправка сообщения одновременно всем моделям из списка сравнения.
+
+        Ответы выводятся рядом по мере поступления; каждый успешный ответ
+        сохраняется в истории и аналитике.
+
+        Args:
+            _: Событие клика кнопки.
+        """
+        if not self.message_input.value or not self.compare_models:
+            return
+
+        # Изменения интерфейса за ход учитываются как в send_message_click
+        with self.renderer.turn() as ui_stats:
+            try:
+                with self.tracer.span("ui.compare_models",
+                                      models=list(self.compare_models)):
+                    user_message = self.message_input.value
+                    self.message_input.value = ""
+                    models = list(self.compare_models)
+
+                    # Сообщение пользователя и карточки ответов моделей
+                    comparison = ComparisonRow(models,
+                                               renderer=self.renderer)
+                    self.chat_history.push([user_message, True])
+                    self.chat_history.push(comparison)
+                    self.renderer.invalidate(self.message_input,
+                                             self.chat_history)
+
+                    async for model, response, response_time in (
+                            self.api_client.send_to_models(user_message,
+                                                           models)):
+                        if "error" in response:
+                            self.logger.error(
+                                "Ошибка API (%s): %s", model,
+                                response['error']
+                            )
+                            self.analytics.track_error(model, response_time)
+                            comparison.set_result(
+                                model, f"Ошибка: {response['error']}",
+                                is_error=True
+                            )
+                            continue
+
+                        response_text = (
+                            response["choices"][0]["message"]["content"]
+                        )
+                        tokens_used = (
+                            response.get("usage", {}).get("total_tokens", 0)
+                        )
+                        comparison.set_result(model, response_text)
+
+                        await self.db.save_message(
+                            model=model,
+                            user_message=user_message,
+                            ai_response=response_text,
+                            tokens_used=tokens_used,
+                            conversation_id=self.conversation_id,
+                        )
+                        self.analytics.track_message(
+                            model=model,
+                            message_length=len(user_message),
+                            response_time=response_time,
+                            tokens_used=tokens_used,
+                        )
+
+                    comparison.finish("Нет ответа")
+                    self.monitor.log_metrics(self.logger)
+            except Exception as e:
+                self.logger.error("Ошибка сравнения моделей: %s", e)
+                self.show_error_snack(str(e))
+        self.logger.debug(
+            "Обновлений интерфейса за ход сравнения: %d (%d байт)",
+            ui_stats['updates'], ui_stats['bytes']
+        )
 
     def show_error_snack(self, message: str):
         """
@@ -217,9 +647,7 @@ class ChatApp:
             bgcolor=ft.Colors.GREY_900,
             duration=5000,
         )
-        self.page.overlay.append(snack)
-        snack.open = True
-        self.page.update()
+        self.renderer.open(snack)
 
     async def show_analytics(self, _):
         """
@@ -229,25 +657,109 @@ class ChatApp:
             _: Событие клика кнопки.
         """
         stats = self.analytics.get_statistics()
+        lines = [
+            ft.Text(f"Всего сообщений: {stats['total_messages']}"),
+            ft.Text(f"Всего токенов: {stats['total_tokens']}"),
+            ft.Text(
+                f"Среднее токенов/сообщение: {stats['tokens_per_message']:.2f}"
+            ),
+            ft.Text(
+                f"Сообщений в минуту: {stats['messages_per_minute']:.2f}"
+            )
+        ]
+        percentiles = stats['response_time_percentiles']
+        if percentiles:
+            lines.append(ft.Text(
+                "Время ответа за сессию: " + ", ".join(
+                    f"p{q} {value:.2f} с" for q, value in percentiles.items()
+                )
+            ))
+
+        cache_usage = stats['response_cache']
+        if self.response_cache:
+            lines.append(ft.Text(
+                f"Кэш ответов: {cache_usage['hits']} попаданий, "
+                f"{cache_usage['misses']} промахов "
+                f"({cache_usage['hit_rate']:.0%})"
+                + (f", из них по близким запросам: "
+                   f"{cache_usage['semantic_hits']}"
+                   if self.semantic_cache else "")
+            ))
+
+        # Задержки по моделям за последний час
+        for model, metrics in stats['latency']['1h'].items():
+            line = (
+                f"{model}: p50 {metrics['p50'] or 0:.2f} с, "
+                f"p99 {metrics['p99'] or 0:.2f} с, "
+                f"ошибок {metrics['error_rate']:.0%}"
+            )
+            if metrics['ttft_p50'] is not None:
+                line += f", TTFT p50 {metrics['ttft_p50']:.2f} с"
+            lines.append(ft.Text(line, size=12))
         dialog = ft.AlertDialog(
             title=ft.Text("Аналитика"),
-            content=ft.Column([
-                ft.Text(f"Всего сообщений: {stats['total_messages']}"),
-                ft.Text(f"Всего токенов: {stats['total_tokens']}"),
-                ft.Text(
-                    f"Среднее токенов/сообщение: {stats['tokens_per_message']:.2f}"
-                ),
-                ft.Text(
-                    f"Сообщений в минуту: {stats['messages_per_minute']:.2f}"
-                )
-            ]),
+            content=ft.Column(lines),
             actions=[
                 ft.TextButton("Закрыть", on_click=lambda e: self.close_dialog(dialog)),
             ],
         )
-        self.page.overlay.append(dialog)
-        dialog.open = True
-        self.page.update()
+        self.renderer.open(dialog)
+
+    async def search_history(self, _):
+        """
+        Полнотекстовый поиск по истории чата с выводом результатов
+        в диалоговом окне. Результаты подгружаются страницами.
+
+        Args:
+            _: Событие отправки поля поиска.
+        """
+        query = (self.search_input.value or "").strip()
+        if not query:
+            return
+
+        try:
+            results_list = ft.ListView(**AppStyles.SEARCH_RESULTS_LIST)
+            more_button = ft.TextButton("Ещё")
+            offset = 0
+
+            async def load_page():
+                nonlocal offset
+                results = await self.db.search(
+                    query,
+                    limit=self.SEARCH_PAGE_SIZE,
+                    offset=offset,
+                    start_mark=SearchResult.START_MARK,
+                    end_mark=SearchResult.END_MARK,
+                )
+                offset += len(results)
+                results_list.controls.extend(
+                    SearchResult(result) for result in results
+                )
+                more_button.visible = len(results) == self.SEARCH_PAGE_SIZE
+                return results
+
+            async def load_more(_):
+                await load_page()
+                self.renderer.invalidate(results_list, more_button)
+
+            more_button.on_click = load_more
+            if not await load_page():
+                results_list.controls.append(ft.Text("Ничего не найдено"))
+
+            dialog = ft.AlertDialog(
+                title=ft.Text(f"Поиск: {query}"),
+                content=results_list,
+                actions=[
+                    more_button,
+                    ft.TextButton(
+                        "Закрыть", on_click=lambda _: self.close_dialog(dialog)
+                    ),
+                ],
+            )
+            self.renderer.open(dialog)
+        except Exception as e:
+            self.logger.error("Ошибка поиска: %s", e)
+            self.show_error_snack(f"Ошибка поиска: {str(e)}")
 
     async def clear_history(self, _):
         """
@@ -258,14 +770,48 @@ class ChatApp:
             _: Событие клика кнопки.
         """
         try:
-            self.cache.clear_history()
+            await self.db.clear_history()
+            if self.response_cache:
+                await self.tasks.run(self.clear_response_caches)
+            self.conversation_id = await self.db.create_conversation()
             self.analytics.clear_data()
-            self.chat_history.controls.clear()
-            self.page.update()
+            self.context.clear()
+            self.chat_history.clear()
+            self.history_cursor = None
+            self.history_exhausted = True
+            self.renderer.invalidate(self.chat_history)
         except Exception as e:
-            self.logger.error(f"Ошибка очистки истории: {e}")
+            self.logger.error("Ошибка очистки истории: %s", e)
             self.show_error_snack(f"Ошибка очистки истории: {str(e)}")
 
+    def clear_response_caches(self):
+        """
+        Удаление сохранённых ответов из базы и файла индекса
+        (выполняется в пуле потоков).
+        """
+        self.response_cache.clear()
+        if self.semantic_cache:
+            self.semantic_cache.clear()
+
+    async def new_conversation(self, _):
+        """
+        Начало нового диалога: предыдущий остаётся в истории,
+        контекст запросов и лента сообщений очищаются.
+
+        Args:
+            _: Событие клика кнопки.
+        """
+        try:
+            self.conversation_id = await self.db.create_conversation()
+            self.context.clear()
+            self.chat_history.clear()
+            self.history_cursor = None
+            self.history_exhausted = True
+            self.renderer.invalidate(self.chat_history)
+        except Exception as e:
+            self.logger.error("Ошибка создания диалога: %s", e)
+            self.show_error_snack(f"Ошибка создания диалога: {str(e)}")
+
     async def confirm_clear_history(self, _):
         """
         Отображение диалогового окна для подтверждения очистки истории.
@@ -290,41 +836,36 @@ class ChatApp:
             ],
             actions_alignment=ft.MainAxisAlignment.END,
         )
-        self.page.overlay.append(dialog)
-        dialog.open = True
-        self.page.update()
+        self.renderer.open(dialog)
 
     async def save_dialog(self, _):
         """
         Сохранение истории диалога в JSON файл в директорию экспорта.
 
+        Файл записывается в пуле потоков; ход записи отображается
+        на кнопке "Сохранить".
+
         Args:
             _: Событие клика кнопки.
         """
+        if self.export_task and not self.export_task.done():
+            return
+
+        def show_progress(done, total):
+            self.save_button.text = f"Сохранение {done * 100 // total}%"
+            self.renderer.invalidate(self.save_button)
+
+        filename = (
+            f"chat_history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        )
+        filepath = os.path.join(self.exports_dir, filename)
         try:
-            history = self.cache.get_chat_history()
-            dialog_data = [{
-                "timestamp": msg[4],
-                "model": msg[1],
-                "user_message": msg[2],
-                "ai_response": msg[3],
-                "tokens_used": msg[5]
-            } for msg in history]
-
-            filename = (
-                f"chat_history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            history = await self.db.get_chat_history()
+            self.export_task = self.tasks.start(
+                self.export_dialog, filepath, history,
+                on_progress=show_progress
             )
-            filepath = os.path.join(self.exports_dir, filename)
-
-            # Сохранение данных в файл
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(
-                    dialog_data,
-                    f,
-                    ensure_ascii=False,
-                    indent=2,
-                    default=str
-                )
+            await self.export_task
 
             # Уведомление о сохранении
             dialog = ft.AlertDialog(
@@ -346,13 +887,85 @@ class ChatApp:
                     ),
                 ],
             )
-            self.page.overlay.append(dialog)
-            dialog.open = True
-            self.page.update()
+            self.renderer.open(dialog)
 
+        except TaskCancelled:
+            self.logger.info("Сохранение отменено")
         except Exception as e:
-            self.logger.error(f"Ошибка сохранения: {e}")
+            self.logger.error("Ошибка сохранения: %s", e)
             self.show_error_snack(f"Ошибка сохранения: {str(e)}")
+        finally:
+            self.export_task = None
+            self.save_button.text = "Сохранить"
+            self.renderer.invalidate(self.save_button)
+
+    @staticmethod
+    def export_dialog(filepath: str, history: list):
+        """
+        Запись истории диалога в JSON файл (выполняется в пуле потоков).
+
+        Записи выводятся по одной, с сообщением о прогрессе после
+        каждой; при отмене недописанный файл удаляется.
+
+        Args:
+            filepath (str): Путь к файлу.
+            history (list): Строки истории из get_chat_history().
+        """
+        try:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write("[")
+                for i, msg in enumerate(history):
+                    record = json.dumps({
+                        "timestamp": msg[4],
+                        "model": msg[1],
+                        "user_message": msg[2],
+                        "ai_response": msg[3],
+                        "tokens_used": msg[5]
+                    }, ensure_ascii=False, indent=2, default=str)
+                    # Тот же формат, что у json.dump(..., indent=2)
+                    f.write(("," if i else "") + "\n  "
+                            + record.replace("\n", "\n  "))
+                    report_progress(i + 1, len(history))
+                f.write("\n]" if history else "]")
+        except TaskCancelled:
+            os.remove(filepath)
+            raise
+
+    async def shutdown(self):
+        """
+        Освобождение ресурсов приложения перед завершением работы:
+        закрытие HTTP-сессии клиента API, остановка сбора метрик
+        и запись очереди изменений кэша.
+        """
+        # Незавершённые фоновые операции отменяются до закрытия базы
+        await self.tasks.close()
+        self.watchdog.stop()
+        if self.api_client:
+            await self.api_client.close()
+        if self.monitor:
+            self.monitor.stop()
+        if self.analytics:
+            self.analytics.save_sketches()
+        if self.semantic_cache:
+            self.semantic_cache.save()
+        await self.db.close()
+        self.tracer.close()
+        if self.metrics_server:
+            self.metrics_server.stop()
+        self.logger.info("Приложение завершено")
+
+    async def handle_window_event(self, e):
+        """
+        Обработка событий окна приложения.
+
+        При закрытии окна корректно завершает работу приложения.
+
+        Args:
+            e: Событие окна.
+        """
+        if e.data == "close":
+            await self.shutdown()
+            self.page.window.destroy()
 
     def close_dialog(self, dialog):
         """
@@ -361,10 +974,7 @@ class ChatApp:
         Args:
             dialog: Диалоговое окно, которое требуется закрыть.
         """
-        dialog.open = False
-        self.page.update()
-        if dialog in self.page.overlay:
-            self.page.overlay.remove(dialog)
+        self.renderer.close(dialog)
 
     def create_main_layout(self):
         """
@@ -380,14 +990,23 @@ class ChatApp:
         # Создание текстового поля для ввода сообщения
         self.message_input = ft.TextField(**AppStyles.MESSAGE_INPUT)
 
-        # Лист с историей чата
-        self.chat_history = ft.ListView(**AppStyles.CHAT_HISTORY)
+        # Поле полнотекстового поиска по истории
+        self.search_input = ft.TextField(
+            hint_text="Поиск по истории",
+            on_submit=self.search_history,
+            **AppStyles.HISTORY_SEARCH_FIELD
+        )
 
-        # Загрузка кэшированной истории чата
-        self.load_chat_history()
+        # Лента истории чата: элементами интерфейса являются только
+        # сообщения видимой области, старые подгружаются при прокрутке
+        self.chat_history = VirtualChatList(
+            on_scroll=self.handle_history_scroll,
+            renderer=self.renderer,
+            **AppStyles.CHAT_HISTORY
+        )
 
         # Создание кнопки "Сохранить"
-        save_button = ft.ElevatedButton(
+        self.save_button = ft.ElevatedButton(
             text="Сохранить",
             on_click=self.save_dialog,
             **AppStyles.SAVE_BUTTON
@@ -407,6 +1026,26 @@ class ChatApp:
             **AppStyles.SEND_BUTTON
         )
 
+        # Создание кнопок сравнения моделей
+        add_compare_button = ft.IconButton(
+            on_click=self.add_to_comparison,
+            **AppStyles.ADD_COMPARE_BUTTON
+        )
+        compare_button = ft.ElevatedButton(
+            text="Сравнить",
+            on_click=self.compare_models_click,
+            **AppStyles.COMPARE_BUTTON
+        )
+
+        # Список моделей, выбранных для сравнения
+        self.compare_chips = ft.Row(wrap=True, expand=True, spacing=5)
+
+        # Создание кнопки "Новый диалог"
+        new_conversation_button = ft.IconButton(
+            on_click=self.new_conversation,
+            **AppStyles.NEW_CONVERSATION_BUTTON
+        )
+
         # Создание кнопки "Аналитика"
         analytics_button = ft.ElevatedButton(
             text="Аналитика",
@@ -434,11 +1073,18 @@ class ChatApp:
             vertical_alignment=ft.CrossAxisAlignment.CENTER,  # Вертикальное выравнивание
         )
 
+        # Строка выбора моделей для сравнения
+        compare_row = ft.Row(
+            controls=[add_compare_button, self.compare_chips, compare_button],
+            **AppStyles.COMPARE_ROW
+        )
+
         # Контейнер для списка моделей
         model_selection = ft.Column(
             controls=[
                 self.model_dropdown.search_field,  # Поле ввода фильтра списка моделей
                 self.model_dropdown,  # Выпадающий список моделей
+                compare_row,  # Модели для сравнения
                 balance_container,  # Баланс и кнопка пополнения
             ],
             **AppStyles.MODEL_SELECTION_COLUMN
@@ -446,7 +1092,10 @@ class ChatApp:
 
         # Контейнер для кнопок управления
         control_buttons = ft.Row(
-            controls=[save_button, analytics_button, clear_button],  # Кнопки управления
+            controls=[
+                new_conversation_button, self.save_button,
+                analytics_button, clear_button,
+            ],  # Кнопки управления
             **AppStyles.CONTROL_BUTTONS_ROW
         )
 
@@ -466,6 +1115,7 @@ class ChatApp:
         return ft.Column(
             controls=[
                 model_selection,  # Выбор модели
+                self.search_input,  # Поиск по истории
                 self.chat_history,  # История чата
                 controls_column,  # Управляющая колонка
             ],
@@ -479,17 +1129,17 @@ class ChatApp:
         Args:
             value (str): Введённое пользователем значение.
         """
-        stored_key, stored_pin = self.cache.get_auth_data()
+        stored_key, stored_pin = await self.db.get_auth_data()
 
         # Впервые выполняем вход
         if not stored_key:
             is_valid = await self.validate_api_key(value)
             if is_valid:
                 pin = self.generate_pin()
-                self.cache.save_auth_data(value, pin)
+                await self.db.save_auth_data(value, pin)
                 await self.show_pin_dialog(pin)
-                if self.init_app(value):
-                    self.show_main_window()
+                if await self.init_app(value):
+                    await self.show_main_window()
             else:
                 # Отображение сообщения об ошибке при неверном ключе API
                 self.auth_window.error_text.value = "Неверный ключ API"
@@ -498,20 +1148,20 @@ class ChatApp:
         else:
             # Проверка введённого PIN-кода
             if value == stored_pin:
-                if self.init_app(stored_key):
-                    self.show_main_window()
+                if await self.init_app(stored_key):
+                    await self.show_main_window()
             else:
                 # Отображение ошибки, если PIN неверный
                 self.auth_window.error_text.value = "Неверный PIN"
                 self.auth_window.error_text.visible = True
                 self.auth_window.update()  # Обновляем AuthWindow для отображения ошибки
 
-    def handle_reset(self):
+    async def handle_reset(self):
         """
         Обработчик сброса настроек входа и очищения данных авторизации.
         """
         # Шаг 1: Очищаем данные аутентификации
-        self.cache.clear_auth_data()
+        await self.db.clear_auth_data()
 
         # Шаг 2: Настраиваем окно аутентификации для ввода API-ключа
         self.auth_window.input_field.label = "Введите API ключ"
@@ -545,17 +1195,18 @@ class ChatApp:
                 ft.TextButton("OK", on_click=lambda e: self.close_dialog(dialog)),
             ]
         )
-        self.page.overlay.append(dialog)
-        dialog.open = True
-        self.page.update()
+        self.renderer.open(dialog)
 
-    def show_main_window(self):
+    async def show_main_window(self):
         """
         Переход от окна авторизации к основному интерфейсу приложения.
         """
         self.auth_window.visible = False
         self.main_window.visible = True
         self.main_window.content = self.create_main_layout()
+
+        # Загрузка кэшированной истории чата
+        await self.load_chat_history()
         self.page.update()
 
     async def main(self, page: ft.Page):
@@ -566,10 +1217,16 @@ class ChatApp:
             page: Переданная страница интерфейса Flet.
         """
         self.page = page
+        self.renderer = RenderScheduler(page, metrics=self.metrics)
+        self.watchdog.start(page.loop)
         for key, value in AppStyles.PAGE_SETTINGS.items():
             setattr(page, key, value)
         AppStyles.set_window_size(page)
 
+        # Перехват закрытия окна для корректного освобождения ресурсов
+        page.window.prevent_close = True
+        page.window.on_event = self.handle_window_event
+
         # Создание окон
         self.auth_window = AuthWindow(
             on_submit=self.handle_auth,
@@ -578,7 +1235,7 @@ class ChatApp:
         self.main_window = ft.Container(visible=False)
 
         # Проверка сохранённых данных аутентификации
-        stored_key, _ = self.cache.get_auth_data()
+        stored_key, _ = await self.db.get_auth_data()
         if stored_key:
             self.auth_window.input_field.label = "Введите PIN"
 
@@ -588,6 +1245,7 @@ class ChatApp:
     @staticmethod
     def main_entry():
         """Точка входа в приложение"""
+        load_dotenv()
         app = ChatApp()
         ft.app(target=app.main)
 
@@ -1,5 +1,29 @@
+import asyncio  # Задержка поиска моделей до паузы во вводе
+import bisect  # Поиск сообщений в видимой области по смещению прокрутки
+import inspect  # Вызов синхронных и асинхронных обработчиков прокрутки
+import itertools  # Накопленные высоты сообщений
+import time  # Библиотека для ограничения частоты обновлений
 import flet as ft  # Фреймворк для создания пользовательского интерфейса
 from src.ui.styles import AppStyles  # Импорт стилей приложения
+from src.utils.model_index import ModelIndex  # Индекс поиска моделей
+
+
+def refresh(control, renderer=None):
+    """
+    Отправка изменений элемента клиенту.
+
+    С планировщиком (RenderScheduler) элемент помечается и уходит
+    в пакете ближайшего кадра; без него обновляется сразу, если уже
+    показан на странице.
+
+    Args:
+        control: Изменённый элемент.
+        renderer (RenderScheduler): Планировщик обновлений (необязательно).
+    """
+    if renderer is not None:
+        renderer.invalidate(control)
+    elif control.page:
+        control.update()
 
 
 class MessageBubble(ft.Container):
@@ -7,11 +31,25 @@ class MessageBubble(ft.Container):
     Компонент "пузырька" сообщения в чате.
 
     Отображает сообщения пользователя и AI с разными стилями, позиционированием.
+    Поддерживает дописывание текста по мере поступления потокового ответа.
+
+    Args:
+        message (str): Текст сообщения.
+        is_user (bool): Сообщение от пользователя.
+        renderer (RenderScheduler): Планировщик обновлений при потоковом
+                                    выводе (необязательно).
     """
 
-    def __init__(self, message: str, is_user: bool):
+    # Минимальный интервал между обновлениями при потоковом выводе (сек.)
+    STREAM_UPDATE_INTERVAL = 0.05
+
+    def __init__(self, message: str, is_user: bool, renderer=None):
         # Инициализация базового класса Container
         super().__init__()
+        self.renderer = renderer
+
+        # Время последнего обновления при потоковом выводе
+        self._last_update = 0.0
 
         # Отступы внутри "пузырька"
         self.padding = 10
@@ -19,6 +57,32 @@ class MessageBubble(ft.Container):
         # Закругленные края пузырька
         self.border_radius = 10
 
+        # Текст сообщения внутри пузырька
+        self.text = ft.Text(
+            color=ft.Colors.WHITE,  # Белый цвет текста
+            size=16,                # Размер шрифта
+            selectable=True,        # Дает возможность выделить текст
+            weight=ft.FontWeight.W_400  # Толщина шрифта: нормальная
+        )
+        self.content = ft.Column(
+            controls=[self.text],
+            tight=True  # Плотное расположение элементов
+        )
+        self.set_message(message, is_user)
+
+    def set_message(self, message: str, is_user: bool):
+        """
+        Установка текста и оформления сообщения.
+
+        Используется и при создании пузырька, и при его повторном
+        использовании для другого сообщения в VirtualChatList.
+
+        Args:
+            message (str): Текст сообщения.
+            is_user (bool): Сообщение от пользователя.
+        """
+        self.is_user = is_user
+
         # Настройка фона:
         # - Синий цвет, если сообщение от пользователя
         # - Серый цвет, если сообщение от AI
@@ -45,33 +109,478 @@ class MessageBubble(ft.Container):
             bottom=5
         )
 
-        # Текст сообщения внутри пузырька
+        self.text.value = message
+
+    def append_text(self, delta: str):
+        """
+        Дописывание фрагмента текста в конец сообщения.
+
+        Обновление отправляется клиенту не чаще, чем раз
+        в STREAM_UPDATE_INTERVAL секунд; остаток выводится через flush().
+
+        Args:
+            delta (str): Новый фрагмент текста.
+        """
+        self.text.value = (self.text.value or "") + delta
+        now = time.monotonic()
+        if now - self._last_update >= self.STREAM_UPDATE_INTERVAL:
+            self._last_update = now
+            # Пузырёк мог быть вытеснен из окна VirtualChatList
+            refresh(self, self.renderer)
+
+    def flush(self):
+        """
+        Принудительная отправка накопленного текста клиенту.
+        """
+        self._last_update = time.monotonic()
+        refresh(self, self.renderer)
+
+
+class VirtualChatList(ft.ListView):
+    """
+    Лента чата, в которой элементами интерфейса являются только
+    сообщения видимой области и запас OVERSCAN с каждой её стороны.
+
+    Сообщения истории хранятся как данные [текст, is_user],
+    а сообщения, которые ещё изменяются (потоковый ответ, карточки
+    сравнения, индикатор загрузки), — самими элементами. Сообщения
+    вне окна заменяются двумя пустыми контейнерами оценочной высоты,
+    поэтому размер прокручиваемой области и позиция прокрутки при
+    сдвиге окна сохраняются. Пузырьки сообщений, покинувших окно,
+    используются повторно для сообщений, попадающих в окно.
+
+    Порядок items совпадает с порядком списка с reverse=True:
+    индекс 0 — самое новое сообщение (внизу ленты).
+
+    Args:
+        on_scroll: Обработчик прокрутки (синхронный или асинхронный),
+                   вызывается после сдвига окна.
+        renderer (RenderScheduler): Планировщик обновлений при сдвиге
+                                    окна (необязательно).
+        **kwargs: Параметры ft.ListView.
+    """
+
+    # Количество сообщений в окне до первого события прокрутки
+    WINDOW = 40
+
+    # Запас сообщений за пределами видимой области с каждой стороны
+    OVERSCAN = 15
+
+    # Параметры оценки высоты сообщения (пиксели)
+    LINE_HEIGHT = 22      # Высота строки текста размера 16
+    CHARS_PER_LINE = 60   # Символов в строке пузырька
+    BUBBLE_PADDING = 30   # Внутренние и внешние отступы пузырька
+    CONTROL_HEIGHT = 120  # Элементы, не являющиеся пузырьками
+
+    def __init__(self, on_scroll=None, renderer=None, **kwargs):
+        # Инициализация базового класса ListView
+        super().__init__(**kwargs)
+        self.renderer = renderer
+        self.on_scroll = self._handle_scroll
+        self.on_visible_scroll = on_scroll
+
+        # Сообщения от новых к старым и их оценочные высоты
+        self.items = []
+        self._heights = []
+        self._offsets = None
+
+        # Границы окна [start, stop) в items
+        self.start = 0
+        self.stop = 0
+
+        # Последние известные смещение прокрутки и высота области
+        self._pixels = 0.0
+        self._viewport = None
+
+        # Пузырьки окна: id сообщения -> (сообщение, пузырёк);
+        # ссылка на сообщение не даёт повторно использовать его id
+        self._bubbles = {}
+        self._pool = []      # Свободные пузырьки
+        self._released = []  # Покинувшие окно при последнем обновлении
+
+        # Пустые контейнеры вместо сообщений вне окна
+        self._newer_spacer = ft.Container(height=0)
+        self._older_spacer = ft.Container(height=0)
+
+    def estimate_height(self, item) -> float:
+        """
+        Оценочная высота сообщения вместе с отступом между элементами.
+
+        Args:
+            item: Сообщение [текст, is_user] или элемент интерфейса.
+
+        Returns:
+            float: Высота в пикселях.
+        """
+        if isinstance(item, MessageBubble):
+            text = item.text.value or ""
+        elif isinstance(item, ft.Control):
+            return self.CONTROL_HEIGHT + (self.spacing or 0)
+        else:
+            text = item[0]
+        lines = sum(
+            len(line) // self.CHARS_PER_LINE + 1 for line in text.split("\n")
+        )
+        return (lines * self.LINE_HEIGHT + self.BUBBLE_PADDING
+                + (self.spacing or 0))
+
+    @property
+    def offsets(self) -> list:
+        """
+        Расстояние от низа ленты до начала каждого сообщения
+        (последний элемент — оценочная высота всей ленты).
+        """
+        if self._offsets is None:
+            self._offsets = list(itertools.accumulate(self._heights,
+                                                      initial=0))
+        return self._offsets
+
+    def push(self, item):
+        """
+        Добавление самого нового сообщения (внизу ленты).
+
+        Args:
+            item: Сообщение [текст, is_user] или элемент интерфейса.
+        """
+        self.items.insert(0, item)
+        self._heights.insert(0, self.estimate_height(item))
+        self._offsets = None
+        if self.start == 0:
+            # Лента у последнего сообщения — новое попадает в окно
+            self.stop += 1
+        else:
+            self.start += 1
+            self.stop += 1
+        self._fit()
+
+    def append_older(self, items):
+        """
+        Добавление более старых сообщений (вверху ленты).
+
+        Args:
+            items (list): Сообщения от новых к старым.
+        """
+        self.items.extend(items)
+        self._heights.extend(self.estimate_height(item) for item in items)
+        self._offsets = None
+        self._fit()
+
+    def replace(self, old, new):
+        """
+        Замена сообщения, например индикатора загрузки — ответом,
+        если заменяемое сообщение ещё в ленте (её могли очистить).
+
+        Args:
+            old: Заменяемый элемент.
+            new: Новое сообщение.
+        """
+        index = self._index(old)
+        if index is None:
+            return
+        self.items[index] = new
+        self._heights[index] = self.estimate_height(new)
+        self._offsets = None
+
+    def remove(self, item):
+        """
+        Удаление сообщения из ленты, если оно в ней есть.
+
+        Args:
+            item: Удаляемый элемент.
+        """
+        index = self._index(item)
+        if index is None:
+            return
+        del self.items[index]
+        del self._heights[index]
+        self._offsets = None
+        if index < self.start:
+            self.start -= 1
+        if index < self.stop:
+            self.stop -= 1
+
+    def clear(self):
+        """
+        Удаление всех сообщений из ленты.
+        """
+        self.items.clear()
+        self._heights.clear()
+        self._offsets = None
+        self.start = self.stop = 0
+
+    def __contains__(self, item):
+        return self._index(item) is not None
+
+    def _index(self, item):
+        """
+        Позиция сообщения в items (элементы сравниваются по ссылке).
+        """
+        for index, candidate in enumerate(self.items):
+            if candidate is item:
+                return index
+        return None
+
+    def _fit(self, pixels=None, viewport=None) -> bool:
+        """
+        Выбор окна для видимой области с запасом OVERSCAN.
+
+        Окно сдвигается, только когда видимая область подходит
+        к его краю ближе, чем на половину запаса.
+
+        Args:
+            pixels (float): Смещение прокрутки от низа ленты.
+            viewport (float): Высота видимой области.
+
+        Returns:
+            bool: Окно изменилось.
+        """
+        if pixels is not None:
+            self._pixels, self._viewport = pixels, viewport
+        count = len(self.items)
+        if self._viewport is None:
+            # Размер области ещё неизвестен: окно у последнего сообщения
+            start, stop = self.start, min(count, self.start + self.WINDOW)
+        else:
+            offsets = self.offsets
+            first = max(bisect.bisect_right(offsets, self._pixels) - 1, 0)
+            last = min(
+                bisect.bisect_left(offsets, self._pixels + self._viewport),
+                count
+            )
+            margin = self.OVERSCAN // 2
+            if ((self.start == 0 or first - self.start >= margin)
+                    and (self.stop == count or self.stop - last >= margin)
+                    and self.stop - self.start <= (
+                        last - first + 2 * self.OVERSCAN)):
+                return False
+            start = max(first - self.OVERSCAN, 0)
+            stop = min(last + self.OVERSCAN, count)
+        changed = (start, stop) != (self.start, self.stop)
+        self.start, self.stop = start, stop
+        return changed
+
+    async def _handle_scroll(self, e):
+        """
+        Сдвиг окна при прокрутке и вызов обработчика приложения.
+
+        Args:
+            e: Событие прокрутки списка.
+        """
+        if self._fit(e.pixels, e.viewport_dimension):
+            refresh(self, self.renderer)
+        if self.on_visible_scroll:
+            result = self.on_visible_scroll(e)
+            if inspect.isawaitable(result):
+                await result
+
+    def before_update(self):
+        """
+        Построение элементов окна перед отправкой обновления клиенту.
+
+        Пузырьки, покинувшие окно, становятся доступны для повторного
+        использования только со следующего обновления, чтобы один
+        и тот же элемент не удалялся и не добавлялся в одном пакете.
+        """
+        super().before_update()
+
+        self._pool.extend(self._released)
+        bubbles = {}
+        controls = []
+        for index in range(self.start, self.stop):
+            item = self.items[index]
+            if isinstance(item, ft.Control):
+                # Высота изменяемых элементов (потоковый ответ) уточняется
+                height = self.estimate_height(item)
+                if height != self._heights[index]:
+                    self._heights[index] = height
+                    self._offsets = None
+                controls.append(item)
+                continue
+            _, bubble = self._bubbles.pop(id(item), (None, None))
+            if bubble is None:
+                if self._pool:
+                    bubble = self._pool.pop()
+                    bubble.set_message(*item)
+                else:
+                    bubble = MessageBubble(*item)
+            bubbles[id(item)] = (item, bubble)
+            controls.append(bubble)
+        self._released = [bubble for _, bubble in self._bubbles.values()]
+        self._bubbles = bubbles
+
+        offsets = self.offsets
+        self._newer_spacer.height = offsets[self.start]
+        self._older_spacer.height = offsets[-1] - offsets[self.stop]
+        self.controls = [self._newer_spacer, *controls, self._older_spacer]
+
+
+class ComparisonRow(ft.Row):
+    """
+    Ряд карточек с ответами нескольких моделей на один запрос.
+
+    Карточки расположены рядом и заполняются по мере поступления ответов.
+
+    Args:
+        models (list): Идентификаторы сравниваемых моделей.
+        renderer (RenderScheduler): Планировщик обновлений карточек
+                                    (необязательно).
+    """
+
+    def __init__(self, models: list, renderer=None):
+        # Инициализация базового класса Row
+        super().__init__()
+        self.renderer = renderer
+
+        # Применение стилей ряда
+        for key, value in AppStyles.COMPARISON_ROW.items():
+            setattr(self, key, value)
+
+        # Элементы карточек по моделям: (карточка, индикатор, текст)
+        self.cards = {}
+        for model in models:
+            progress = ft.ProgressRing(width=20, height=20)
+            text = ft.Text(
+                color=ft.Colors.WHITE,  # Белый цвет текста
+                size=14,                # Размер шрифта
+                selectable=True         # Дает возможность выделить текст
+            )
+            card = ft.Container(
+                content=ft.Column(
+                    controls=[
+                        ft.Text(model, weight=ft.FontWeight.BOLD,
+                                color=ft.Colors.WHITE),
+                        progress,
+                        text,
+                    ],
+                    tight=True
+                ),
+                **AppStyles.COMPARISON_CARD
+            )
+            self.cards[model] = (card, progress, text)
+            self.controls.append(card)
+
+    def set_result(self, model: str, message: str, is_error=False):
+        """
+        Вывод ответа модели в её карточке.
+
+        Args:
+            model (str): Идентификатор модели.
+            message (str): Текст ответа или ошибки.
+            is_error (bool): Признак ошибки.
+        """
+        card, progress, text = self.cards[model]
+        progress.visible = False
+        text.value = message
+        if is_error:
+            text.color = ft.Colors.RED_400
+
+        # Обновляем только карточку этой модели
+        refresh(card, self.renderer)
+
+    def finish(self, message: str):
+        """
+        Завершение сравнения: карточки без ответа помечаются сообщением.
+
+        Args:
+            message (str): Текст для карточек без ответа.
+        """
+        for model, (_, progress, _) in self.cards.items():
+            if progress.visible:
+                self.set_result(model, message, is_error=True)
+
+
+class SearchResult(ft.Container):
+    """
+    Карточка результата поиска по истории чата.
+
+    Найденные слова во фрагменте сообщения выделяются цветом.
+
+    Args:
+        result (dict): Результат ChatCache.search().
+    """
+
+    # Маркеры найденных слов, передаваемые в ChatCache.search()
+    START_MARK = "\x02"
+    END_MARK = "\x03"
+
+    def __init__(self, result: dict):
+        # Инициализация базового класса Container
+        super().__init__()
+
+        # Применение стилей карточки
+        for key, value in AppStyles.SEARCH_RESULT.items():
+            setattr(self, key, value)
+
         self.content = ft.Column(
             controls=[
                 ft.Text(
-                    value=message,          # Исходный текст передается сюда
-                    color=ft.Colors.WHITE,  # Белый цвет текста
-                    size=16,                # Размер шрифта
-                    selectable=True,        # Дает возможность выделить текст
-                    weight=ft.FontWeight.W_400  # Толщина шрифта: нормальная
-                )
+                    f"{result['timestamp']} · {result['model']}",
+                    size=12,
+                    color=ft.Colors.GREY_400
+                ),
+                ft.Text(
+                    spans=self._build_spans(result["snippet"]),
+                    color=ft.Colors.WHITE,
+                    size=14,
+                    selectable=True
+                ),
             ],
-            tight=True  # Плотное расположение элементов
+            tight=True
         )
 
+    def _build_spans(self, snippet: str) -> list:
+        """
+        Разбиение фрагмента на обычный и выделенный текст.
+
+        Args:
+            snippet (str): Фрагмент с маркерами START_MARK/END_MARK.
+
+        Returns:
+            list: Список ft.TextSpan.
+        """
+        spans = []
+        # Каждая часть после START_MARK начинается с найденного слова
+        for part in snippet.split(self.START_MARK):
+            match, _, rest = part.rpartition(self.END_MARK)
+            if match:
+                spans.append(ft.TextSpan(
+                    match,
+                    ft.TextStyle(weight=ft.FontWeight.BOLD,
+                                 color=ft.Colors.AMBER_300)
+                ))
+            if rest:
+                spans.append(ft.TextSpan(rest))
+        return spans
+
 
 class ModelSelector(ft.Dropdown):
     """
     Выпадающий список для выбора AI модели с дополнительной функцией поиска.
 
+    Поиск выполняется по n-граммному индексу каталога (ModelIndex)
+    после паузы во вводе SEARCH_DEBOUNCE секунд; в списке остаются
+    не более MAX_RESULTS лучших совпадений.
+
     Args:
         models (list): Список доступных моделей в формате:
                       [{"id": "model-id", "name": "Model Name"}, ...]
+        renderer (RenderScheduler): Планировщик обновлений списка
+                                    (необязательно).
     """
 
-    def __init__(self, models: list):
+    # Пауза во вводе перед поиском (сек.)
+    SEARCH_DEBOUNCE = 0.15
+
+    # Максимальное число моделей в отфильтрованном списке
+    MAX_RESULTS = 50
+
+    def __init__(self, models: list, renderer=None):
         # Инициализация базового класса Dropdown
         super().__init__()
+        self.renderer = renderer
+
+        # Номер последнего изменения поля поиска (для отмены устаревших)
+        self._search_version = 0
 
         # Применение стилей для выпадающего списка из преднастроек
         for key, value in AppStyles.MODEL_DROPDOWN.items():
@@ -82,15 +591,7 @@ class ModelSelector(ft.Dropdown):
         self.hint_text = "Выбор модели"  # Надпись внутри
 
         # Создание опций (моделей) на основе входящего списка
-        self.options = [
-            ft.dropdown.Option(
-                key=model['id'],    # Уникальный идентификатор модели
-                text=model['name']  # Название модели
-            ) for model in models
-        ]
-
-        # Сохранение полного списка опций для поиска
-        self.all_options = self.options.copy()
+        self._build_options(models)
 
         # Установка начального значения (первая модель в списке)
         self.value = models[0]['id'] if models else None
@@ -102,32 +603,74 @@ class ModelSelector(ft.Dropdown):
             **AppStyles.MODEL_SEARCH_FIELD  # Применение стилей
         )
 
-    def filter_options(self, e):
+    def _build_options(self, models: list):
+        """
+        Построение опций выпадающего списка из списка моделей.
+
+        Args:
+            models (list): Список моделей.
+        """
+        self.options = [
+            ft.dropdown.Option(
+                key=model['id'],    # Уникальный идентификатор модели
+                text=model['name']  # Название модели
+            ) for model in models
+        ]
+
+        # Сохранение полного списка опций и индекса для поиска
+        self.all_options = self.options.copy()
+        self.index = ModelIndex(models)
+
+    def set_models(self, models: list):
+        """
+        Замена списка моделей (например, после фонового обновления каталога).
+
+        Текущий выбор сохраняется, если модель осталась в каталоге.
+
+        Args:
+            models (list): Новый список моделей.
+        """
+        self._build_options(models)
+        # Отмена отложенного поиска по старому каталогу
+        self._search_version += 1
+        if self.value not in {model['id'] for model in models}:
+            self.value = models[0]['id'] if models else None
+        self.search_field.value = ""
+
+        # Обновляем список, только если он уже отображается
+        refresh(self.search_field, self.renderer)
+        refresh(self, self.renderer)
+
+    async def filter_options(self, e):
         """
         Фильтрация списка моделей на основе текста из поля поиска.
 
+        Поиск выполняется, только если за SEARCH_DEBOUNCE секунд
+        текст больше не менялся.
+
         Args:
             e: Событие изменения текста в поле поиска.
         """
-        # Получаем текст из поля поиска в нижнем регистре
-        search_text = (
-            self.search_field.value.lower()
-            if self.search_field.value else ""
-        )
+        self._search_version += 1
+        version = self._search_version
+        await asyncio.sleep(self.SEARCH_DEBOUNCE)
+        if version != self._search_version:
+            return
+
+        search_text = self.search_field.value or ""
 
         # Если строка поиска пуста, возвращаем весь список
-        if not search_text:
+        if not search_text.strip():
             self.options = self.all_options
         else:
-            # Фильтруем список по названию модели или её идентификатору
+            # Лучшие совпадения по названию модели или её идентификатору
             self.options = [
-                opt for opt in self.all_options
-                if search_text in opt.text.lower()
-                or search_text in opt.key.lower()
+                self.all_options[i]
+                for i in self.index.search(search_text, self.MAX_RESULTS)
             ]
 
-        # Обновляем интерфейс (выпадающий список)
-        e.page.update()
+        # Обновляем только выпадающий список
+        refresh(self, self.renderer)
 
 
 class AuthWindow(ft.UserControl):
@@ -209,7 +752,7 @@ class AuthWindow(ft.UserControl):
         if self.on_submit:
             await self.on_submit(self.input_field.value)
 
-    def handle_reset(self, _):
+    async def handle_reset(self, _):
         """
         Обработчик события кнопки "Сбросить".
 
@@ -217,4 +760,4 @@ class AuthWindow(ft.UserControl):
             _: параметр события кнопки, передается автоматически.
         """
         if self.on_reset:
-            self.on_reset()
+            await self.on_reset()
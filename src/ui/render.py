@@ -0,0 +1,218 @@
+import json        # Оценка объёма отправленных клиенту команд
+import threading   # Блокировка очереди из обработчиков в потоках Flet
+from contextlib import contextmanager  # Учёт обновлений за ход диалога
+import flet as ft  # Фреймворк для создания пользовательского интерфейса
+# Внутренние модули Flet: версия закреплена в requirements.txt (0.25.2)
+from flet.core.page import Offstage  # Контейнер page.overlay
+from flet.core.protocol import CommandEncoder  # Сериализация команд Flet
+from src.utils.metrics import MetricsRegistry  # Метрики для внешнего сбора
+
+
+class RenderScheduler:
+    """
+    Планировщик обновлений интерфейса.
+
+    Обработчики изменяют элементы и помечают их invalidate(); все
+    изменения за кадр (FRAME секунд) отправляются клиенту одним
+    вызовом page.update(*controls), в который входят только помеченные
+    элементы без потомков других помеченных. Окна и уведомления
+    открываются и закрываются через open()/close(): обновляется
+    контейнер page.overlay, а не вся страница.
+
+    Для учёта нагрузки оборачивается send_commands соединения страницы:
+    считаются пакеты обновлений и их объём в JSON, всего (метрики
+    ui_updates и ui_update_bytes) и за ход диалога (turn()).
+
+    Args:
+        page (ft.Page): Страница приложения.
+        metrics (MetricsRegistry): Реестр метрик (необязательно).
+        frame (float): Длительность кадра в секундах.
+    """
+
+    # Длительность кадра по умолчанию (сек.)
+    FRAME = 1 / 60
+
+    def __init__(self, page, metrics=None, frame=FRAME):
+        self.page = page
+        self.frame = frame
+
+        metrics = metrics or MetricsRegistry()
+        self._updates_metric = metrics.counter(
+            "ui_updates", "UI update batches sent to the client")
+        self._bytes_metric = metrics.counter(
+            "ui_update_bytes", "Size of UI update batches sent to the client")
+        self._turn_updates_metric = metrics.histogram(
+            "ui_turn_updates", "UI update batches per chat turn",
+            buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 89))
+        self._turn_bytes_metric = metrics.histogram(
+            "ui_turn_bytes", "UI update bytes per chat turn",
+            buckets=(1e3, 2.5e3, 5e3, 1e4, 2.5e4, 5e4, 1e5, 2.5e5, 1e6))
+
+        # Помеченные элементы (словарь как упорядоченное множество)
+        self._pending = {}
+        self._overlay_changed = False
+        self._closing = []
+        self._scheduled = False
+        self._lock = threading.Lock()
+
+        # Счётчики открытых ходов диалога
+        self._turns = []
+
+        self._meter_connection()
+
+    def _meter_connection(self):
+        """
+        Учёт пакетов команд, отправляемых клиенту для этой страницы.
+        """
+        connection = self.page.connection
+        if connection is None:
+            return
+        send_commands = connection.send_commands
+        session_id = self.page.session_id
+
+        def metered_send_commands(target_session_id, commands):
+            # Пустой пакет (изменений нет) клиенту не отправляется
+            if target_session_id == session_id and commands:
+                size = len(json.dumps(commands, cls=CommandEncoder,
+                                      separators=(",", ":")))
+                self._updates_metric.inc()
+                self._bytes_metric.inc(size)
+                for stats in self._turns:
+                    stats['updates'] += 1
+                    stats['bytes'] += size
+            return send_commands(target_session_id, commands)
+
+        connection.send_commands = metered_send_commands
+
+    def invalidate(self, *controls):
+        """
+        Пометка элементов для обновления в ближайшем кадре.
+
+        Args:
+            *controls: Изменённые элементы.
+        """
+        with self._lock:
+            for control in controls:
+                self._pending[control] = None
+            self._schedule()
+
+    def open(self, control):
+        """
+        Показ диалога или уведомления через page.overlay.
+
+        Args:
+            control: AlertDialog, SnackBar и т.п.
+        """
+        with self._lock:
+            if control not in self.page.overlay:
+                self.page.overlay.append(control)
+                self._overlay_changed = True
+            else:
+                self._pending[control] = None
+            control.open = True
+            self._schedule()
+
+    def close(self, control):
+        """
+        Закрытие диалога; из page.overlay он удаляется после отправки
+        обновления, а у клиента — при следующем изменении overlay.
+
+        Args:
+            control: Открытый через open() элемент.
+        """
+        with self._lock:
+            control.open = False
+            self._pending[control] = None
+            self._closing.append(control)
+            self._schedule()
+
+    def _schedule(self):
+        """
+        Планирование отправки обновлений в конце кадра
+        (вызывается под блокировкой).
+        """
+        if self._scheduled:
+            return
+        self._scheduled = True
+        self.page.loop.call_soon_threadsafe(
+            self.page.loop.call_later, self.frame, self.flush
+        )
+
+    def flush(self):
+        """
+        Немедленная отправка всех накопленных обновлений одним пакетом.
+        """
+        with self._lock:
+            pending = list(self._pending)
+            overlay_changed = self._overlay_changed
+            closing = self._closing
+            self._pending = {}
+            self._overlay_changed = False
+            self._closing = []
+            self._scheduled = False
+
+        if overlay_changed:
+            pending.append(self._overlay_host())
+        controls = self._targets(pending)
+        if controls:
+            self.page.update(*controls)
+        for control in closing:
+            if control in self.page.overlay and not control.open:
+                self.page.overlay.remove(control)
+
+    def _overlay_host(self):
+        """
+        Контейнер page.overlay (или вся страница, если он не найден).
+        """
+        for child in self.page._get_children():
+            if isinstance(child, Offstage):
+                return child
+        return self.page
+
+    @staticmethod
+    def _targets(controls) -> list:
+        """
+        Элементы для обновления: уже показанные клиенту и не являющиеся
+        потомками других элементов из списка.
+
+        Args:
+            controls (list): Помеченные элементы.
+
+        Returns:
+            list: Элементы для page.update().
+        """
+        marked = set(map(id, controls))
+        targets = []
+        for control in controls:
+            if control.page is None and not isinstance(control, ft.Page):
+                # Ещё не показан: будет отправлен с родителем
+                continue
+            parent = control.parent
+            while parent is not None and id(parent) not in marked:
+                parent = parent.parent
+            if parent is None:
+                targets.append(control)
+        return targets
+
+    @contextmanager
+    def turn(self):
+        """
+        Учёт пакетов обновлений и их объёма за ход диалога.
+
+        На выходе накопленные изменения отправляются, а итог ложится
+        в гистограммы ui_turn_updates и ui_turn_bytes.
+
+        Yields:
+            dict: Счётчики 'updates' и 'bytes' (заполняются по ходу).
+        """
+        stats = {'updates': 0, 'bytes': 0}
+        self._turns.append(stats)
+        try:
+            yield stats
+        finally:
+            try:
+                self.flush()
+            finally:
+                self._turns.remove(stats)
+                self._turn_updates_metric.observe(stats['updates'])
+                self._turn_bytes_metric.observe(stats['bytes'])
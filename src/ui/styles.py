@@ -64,7 +64,8 @@ class AppStyles:
         "expand": True,  # Использовать все доступное пространство
         "spacing": 10,  # Отступ между сообщениями
         "height": 400,  # Фиксированная высота области чата
-        "auto_scroll": True,  # Автоматическая прокрутка к новым сообщениям
+        "reverse": True,  # Новые сообщения внизу, прокрутка от них
+        "on_scroll_interval": 100,  # Частота событий прокрутки (мс)
         "padding": 20,  # Внутренние отступы контейнера
     }
 
@@ -136,6 +137,59 @@ class AppStyles:
         "height": 40,  # Высота
     }
 
+    # Кнопка начала нового диалога
+    NEW_CONVERSATION_BUTTON = {
+        "icon": ft.icons.ADD_COMMENT,  # Иконка кнопки
+        "icon_color": ft.Colors.WHITE,  # Цвет иконки
+        "bgcolor": ft.Colors.BLUE_700,  # Цвет фона
+        "tooltip": "Новый диалог",  # Подсказка
+    }
+
+    # Кнопка отправки сообщения нескольким моделям для сравнения
+    COMPARE_BUTTON = {
+        "icon": ft.icons.COMPARE_ARROWS,  # Иконка кнопки
+        "style": ft.ButtonStyle(
+            color=ft.Colors.WHITE,  # Цвет текста кнопки
+            bgcolor=ft.Colors.PURPLE_700,  # Цвет фона кнопки
+            padding=10,  # Внутренние отступы кнопки
+        ),
+        # Подсказка
+        "tooltip": "Отправить сообщение всем моделям из списка сравнения",
+        "width": 130,  # Ширина кнопки
+        "height": 40,  # Высота кнопки
+    }
+
+    # Кнопка добавления выбранной модели в список сравнения
+    ADD_COMPARE_BUTTON = {
+        "icon": ft.icons.ADD,  # Иконка кнопки
+        "icon_color": ft.Colors.WHITE,  # Цвет иконки
+        "bgcolor": ft.Colors.PURPLE_700,  # Цвет фона
+        "tooltip": "Добавить выбранную модель к сравнению",  # Подсказка
+    }
+
+    # Строка со списком моделей для сравнения
+    COMPARE_ROW = {
+        "spacing": 10,  # Расстояние между элементами
+        # Вертикальное выравнивание
+        "vertical_alignment": ft.CrossAxisAlignment.CENTER,
+    }
+
+    # Ряд карточек с ответами разных моделей
+    COMPARISON_ROW = {
+        "spacing": 10,  # Расстояние между карточками
+        "scroll": ft.ScrollMode.AUTO,  # Горизонтальная прокрутка
+        # Выравнивание по верху
+        "vertical_alignment": ft.CrossAxisAlignment.START,
+    }
+
+    # Карточка с ответом одной модели при сравнении
+    COMPARISON_CARD = {
+        "width": 260,  # Ширина карточки
+        "padding": 10,  # Внутренние отступы
+        "bgcolor": ft.Colors.GREY_700,  # Цвет фона
+        "border_radius": 10,  # Скругление углов
+    }
+
     # Строка ввода с текстовым полем и кнопкой
     INPUT_ROW = {
         "spacing": 10,  # Расстояние между элементами
@@ -182,6 +236,38 @@ class AppStyles:
         "height": 45,  # Высота поля
     }
 
+    # Поле полнотекстового поиска по истории чата
+    HISTORY_SEARCH_FIELD = {
+        "width": 400,  # Ширина поля
+        "border_radius": 8,  # Радиус углов
+        "bgcolor": ft.Colors.GREY_900,  # Цвет фона поля
+        "border_color": ft.Colors.GREY_700,  # Цвет границы поля
+        "color": ft.Colors.WHITE,  # Цвет текста
+        "content_padding": 10,  # Внутренний отступ текста
+        "cursor_color": ft.Colors.WHITE,  # Цвет курсора
+        "focused_border_color": ft.Colors.BLUE_400,  # Цвет границы при фокусе
+        "hint_style": ft.TextStyle(
+            color=ft.Colors.GREY_400,  # Цвет подсказки (hint)
+            size=14,  # Размер текста подсказки
+        ),
+        "prefix_icon": ft.icons.MANAGE_SEARCH,  # Иконка поиска
+        "height": 40,  # Высота поля
+    }
+
+    # Карточка результата поиска по истории
+    SEARCH_RESULT = {
+        "padding": 10,  # Внутренние отступы
+        "bgcolor": ft.Colors.GREY_800,  # Цвет фона
+        "border_radius": 8,  # Скругление углов
+    }
+
+    # Список результатов поиска в диалоговом окне
+    SEARCH_RESULTS_LIST = {
+        "spacing": 8,  # Расстояние между результатами
+        "width": 480,  # Ширина списка
+        "height": 420,  # Высота списка
+    }
+
     # Колонка выбора модели
     MODEL_SELECTION_COLUMN = {
         "spacing": 10,  # Расстояние между элементами в колонке
@@ -1,5 +1,9 @@
 import time                  # Библиотека для работы с временными метками и измерения интервалов
 from datetime import datetime  # Библиотека для работы с датой и временем в удобном формате
+from src.utils.session_store import SessionStore  # Метрики сессии
+from src.utils.sketch import SlidingSketch  # Скетчи квантилей задержек
+from src.utils.tracing import Tracer  # Трассировка этапов запроса
+from src.utils.metrics import MetricsRegistry  # Метрики для внешнего сбора
 
 
 class Analytics:
@@ -12,24 +16,59 @@ class Analytics:
     - Использование токенов
     - Длину сообщений
     - Общую длительность сессии
+    - Процентили задержек, время до первого токена и долю ошибок
+      по моделям за скользящие окна
     """
 
-    def __init__(self, cache):
+    # Отчётные квантили задержек
+    QUANTILES = (0.5, 0.9, 0.99)
+
+    # Окна отчёта о задержках в секундах (None — за всё время)
+    WINDOWS = {'5m': 300, '1h': 3600, 'all': None}
+
+    def __init__(self, cache, tracer=None, metrics=None):
         """
         Инициализация системы аналитики.
 
         Args:
             cache (ChatCache): Класс для работы с базой данных.
+            tracer (Tracer): Трассировка этапов запроса (необязательно).
+            metrics (MetricsRegistry): Реестр метрик (необязательно).
 
         Создаются структуры для хранения данных:
         - Времени начала сессии
-        - Статистики использования моделей
-        - Истории сообщений
+        - Статистики использования моделей (за всё время)
+        - Истории сообщений текущей сессии
         """
         self.cache = cache
+        self.tracer = tracer or Tracer(enabled=False)
         self.start_time = time.time()
+
+        # Метрики, обновляемые при каждом сообщении
+        metrics = metrics or MetricsRegistry()
+        self._requests_metric = metrics.counter(
+            "chat_requests", "Successful chat requests", ["model"])
+        self._errors_metric = metrics.counter(
+            "chat_request_errors", "Failed chat requests", ["model"])
+        self._tokens_metric = metrics.counter(
+            "chat_tokens", "Tokens used by chat requests", ["model"])
+        self._latency_metric = metrics.histogram(
+            "chat_response_seconds", "Chat response time", ["model"])
+        self._ttft_metric = metrics.histogram(
+            "chat_time_to_first_token_seconds",
+            "Time to the first streamed token", ["model"])
+        self._response_cache_metric = metrics.counter(
+            "chat_response_cache_lookups", "Response cache lookups",
+            ["result"])
+
+        # Обращения к кэшу ответов за сессию
+        self.response_cache_usage = {'hits': 0, 'misses': 0,
+                                     'semantic_hits': 0}
         self.model_usage = {}
-        self.session_data = []
+        self.session_data = SessionStore()
+
+        # Скетчи задержек: (модель, метрика) -> SlidingSketch
+        self.sketches = {}
 
         # Загрузка исторических данных из базы
         self._load_historical_data()
@@ -37,32 +76,63 @@ class Analytics:
     def _load_historical_data(self):
         """
         Загрузка исторических данных из базы.
-        Обновляет статистику и историю сообщений из сохранённых данных.
+
+        Читаются только агрегаты по моделям из таблицы analytics_rollup,
+        поэтому время запуска зависит от числа моделей, а не сообщений.
+        Исходные записи доступны постранично через iter_history().
         """
-        history = self.cache.get_analytics_history()
+        for model, count, tokens, _, _ in self.cache.get_analytics_rollup():
+            self.model_usage[model] = {'count': count, 'tokens': tokens}
 
-        for record in history:
-            timestamp, model, message_length, response_time, tokens_used = (
-                record
-            )
+        for key, data in self.cache.get_analytics_sketches().items():
+            self.sketches[key] = SlidingSketch.from_dict(data)
 
-            # Обновление статистики моделей
-            if model not in self.model_usage:
-                self.model_usage[model] = {'count': 0, 'tokens': 0}
-            self.model_usage[model]['count'] += 1
-            self.model_usage[model]['tokens'] += tokens_used
+    def _sketch(self, model, metric):
+        """
+        Получение (или создание) скетча метрики модели.
+
+        Args:
+            model (str): Идентификатор модели.
+            metric (str): latency, ttft, tps или errors.
+
+        Returns:
+            SlidingSketch: Скетч метрики.
+        """
+        sketch = self.sketches.get((model, metric))
+        if sketch is None:
+            sketch = self.sketches[(model, metric)] = SlidingSketch()
+        return sketch
+
+    def iter_history(self, page_size=1000):
+        """
+        Ленивый обход всей сохранённой истории аналитики.
 
-            # Добавление сообщения в историю сессии
-            self.session_data.append({
-                'timestamp': datetime.strptime(timestamp,
-                                               '%Y-%m-%d %H:%M:%S.%f'),
-                'model': model,
-                'message_length': message_length,
-                'response_time': response_time,
-                'tokens_used': tokens_used
-            })
+        Записи читаются из базы страницами по page_size строк.
+
+        Args:
+            page_size (int): Размер страницы.
+
+        Yields:
+            dict: Запись с временной меткой, моделью и метриками.
+        """
+        cursor = None
+        while True:
+            rows = self.cache.get_analytics_page(cursor, page_size)
+            for (_, timestamp, model, message_length, response_time,
+                 tokens_used) in rows:
+                yield {
+                    'timestamp': datetime.fromisoformat(timestamp),
+                    'model': model,
+                    'message_length': message_length,
+                    'response_time': response_time,
+                    'tokens_used': tokens_used
+                }
+            if len(rows) < page_size:
+                return
+            cursor = (rows[-1][1], rows[-1][0])
 
-    def track_message(self, model, message_length, response_time, tokens_used):
+    def track_message(self, model, message_length, response_time, tokens_used,
+                      ttft=None):
         """
         Отслеживание метрик для одного сообщения.
 
@@ -73,29 +143,119 @@ class Analytics:
             message_length (int): Длина сообщения в символах.
             response_time (float): Время ответа в секундах.
             tokens_used (int): Количество использованных токенов.
+            ttft (float): Время до первого токена в секундах,
+                          если ответ получен потоком.
+        """
+        with self.tracer.span("analytics.track_message", model=model):
+            timestamp = datetime.now()
+
+            # Сохранение данных сообщения в базе
+            self.cache.save_analytics(
+                timestamp, model, message_length, response_time, tokens_used
+            )
+
+            # Добавление новой модели в статистику, если её ещё нет
+            if model not in self.model_usage:
+                self.model_usage[model] = {'count': 0, 'tokens': 0}
+
+            # Обновление статистики модели
+            self.model_usage[model]['count'] += 1
+            self.model_usage[model]['tokens'] += tokens_used
+
+            # Добавление сообщения в историю
+            self.session_data.append(
+                timestamp.timestamp(), model, message_length, response_time,
+                tokens_used
+            )
+
+            # Обновление метрик
+            self._requests_metric.inc(model=model)
+            self._tokens_metric.inc(tokens_used, model=model)
+            self._latency_metric.observe(response_time, model=model)
+            if ttft is not None:
+                self._ttft_metric.observe(ttft, model=model)
+
+            # Обновление скетчей задержек
+            self._sketch(model, 'latency').add(response_time)
+            if response_time > 0:
+                self._sketch(model, 'tps').add(tokens_used / response_time)
+            if ttft is not None:
+                self._sketch(model, 'ttft').add(ttft)
+
+    def track_error(self, model, response_time=0.0):
         """
-        timestamp = datetime.now()
+        Отслеживание неудачного запроса к модели.
 
-        # Сохранение данных сообщения в базе
-        self.cache.save_analytics(
-            timestamp, model, message_length, response_time, tokens_used
+        Args:
+            model (str): Идентификатор модели.
+            response_time (float): Время до получения ошибки в секундах.
+        """
+        self._sketch(model, 'errors').add(response_time)
+        self._errors_metric.inc(model=model)
+
+    def track_response_cache(self, hit, semantic=False):
+        """
+        Учёт обращения к кэшу ответов.
+
+        Args:
+            hit (bool): Ответ найден в кэше.
+            semantic (bool): Ответ найден по близкому, а не идентичному
+                             запросу.
+        """
+        self.response_cache_usage['hits' if hit else 'misses'] += 1
+        if hit and semantic:
+            self.response_cache_usage['semantic_hits'] += 1
+        self._response_cache_metric.inc(
+            result=('semantic_hit' if semantic else 'hit') if hit else 'miss'
         )
 
-        # Добавление новой модели в статистику, если модель ещё не использована
-        if model not in self.model_usage:
-            self.model_usage[model] = {'count': 0, 'tokens': 0}
-
-        # Обновление статистики модели
-        self.model_usage[model]['count'] += 1
-        self.model_usage[model]['tokens'] += tokens_used
-
-        # Добавление сообщения в историю
-        self.session_data.append({
-            'timestamp': timestamp,
-            'model': model,
-            'message_length': message_length,
-            'response_time': response_time,
-            'tokens_used': tokens_used
+    def get_latency_report(self, window=None):
+        """
+        Отчёт о задержках по моделям за окно.
+
+        Args:
+            window (float): Длина окна в секундах; None — за всё время.
+
+        Returns:
+            dict: {модель: метрики}, где метрики включают:
+                - count: число успешных ответов
+                - p50, p90, p99: процентили времени ответа
+                - ttft_p50, ttft_p90, ttft_p99: процентили времени
+                  до первого токена (None, если не измерялось)
+                - tokens_per_second: медиана скорости генерации
+                - error_rate: доля неудачных запросов
+        """
+        now = time.time()
+        models = {model for model, _ in self.sketches}
+        report = {}
+        for model in sorted(models):
+            latency, ttft, tps, errors = (
+                self.sketches[(model, metric)].window(window, now)
+                if (model, metric) in self.sketches else None
+                for metric in ('latency', 'ttft', 'tps', 'errors')
+            )
+            count = latency.count if latency else 0
+            error_count = errors.count if errors else 0
+            if not count and not error_count:
+                continue
+
+            metrics = {'count': count}
+            for prefix, sketch in (('', latency), ('ttft_', ttft)):
+                for q in self.QUANTILES:
+                    metrics[f"{prefix}p{q * 100:g}"] = (
+                        sketch.quantile(q) if sketch else None
+                    )
+            metrics['tokens_per_second'] = tps.quantile(0.5) if tps else None
+            metrics['error_rate'] = error_count / (count + error_count)
+            report[model] = metrics
+        return report
+
+    def save_sketches(self):
+        """
+        Сохранение скетчей задержек в базе для следующего запуска.
+        """
+        self.cache.save_analytics_sketches({
+            key: sketch.to_dict() for key, sketch in self.sketches.items()
         })
 
     def get_statistics(self):
@@ -108,6 +268,9 @@ class Analytics:
                 - Использованные токены
                 - Длительность сессии
                 - Средние метрики
+                - Процентили времени ответа за сессию
+                - Отчёты о задержках по моделям за окна WINDOWS
+                - Обращения к кэшу ответов
                 - Статистика по моделям.
         """
         # Расчёт длительности сессии
@@ -119,6 +282,9 @@ class Analytics:
         total_messages = sum(model['count']
                              for model in self.model_usage.values())
 
+        lookups = (self.response_cache_usage['hits']
+                   + self.response_cache_usage['misses'])
+
         # Формирование статистики
         return {
             'total_messages': total_messages,
@@ -134,6 +300,24 @@ class Analytics:
                 total_tokens / total_messages if total_messages > 0 else 0
             ),
 
+            # Процентили времени ответа за текущую сессию
+            'response_time_percentiles': self.session_data.percentiles(),
+
+            # Обращения к кэшу ответов за сессию
+            'response_cache': {
+                **self.response_cache_usage,
+                'hit_rate': (
+                    self.response_cache_usage['hits'] / lookups
+                    if lookups else 0
+                ),
+            },
+
+            # Процентили задержек, TTFT и доля ошибок по моделям
+            'latency': {
+                name: self.get_latency_report(seconds)
+                for name, seconds in self.WINDOWS.items()
+            },
+
             # Детальная статистика использования моделей
             'model_usage': self.model_usage
         }
@@ -143,10 +327,10 @@ class Analytics:
         Экспорт собранных данных сессии.
 
         Returns:
-            list: История сообщений с временными метками,
-                  моделями и метриками.
+            iterator: Записи сообщений текущей сессии с временными метками,
+                      моделями и метриками. Полная история — iter_history().
         """
-        return self.session_data
+        return iter(self.session_data)
 
     def clear_data(self):
         """
@@ -155,8 +339,16 @@ class Analytics:
         Сбрасывает:
         - Статистику использования моделей.
         - Историю сообщений.
+        - Скетчи задержек.
         - Время начала текущей сессии.
+
+        Сохранённые в базе записи, агрегаты и скетчи тоже удаляются,
+        чтобы статистика не вернулась после перезапуска.
         """
+        self.cache.clear_analytics()
         self.model_usage.clear()  # Очистка статистики
         self.session_data.clear()  # Очистка истории сообщений
+        self.sketches.clear()  # Очистка скетчей задержек
+        # Счётчики кэша ответов
+        self.response_cache_usage.update(hits=0, misses=0, semantic_hits=0)
         self.start_time = time.time()  # Перезапуск времени сессии
@@ -0,0 +1,366 @@
+import asyncio     # Ожидание запросов из обработчиков Flet
+import atexit      # Запись принятых изменений при завершении процесса
+import contextvars  # Текущий span трассировки в потоках базы
+import functools   # Передача аргументов запроса в поток
+import queue       # Очередь изменений потока записи
+import sqlite3     # Ошибки фиксации групповой транзакции
+import threading   # Поток записи
+import time        # Время от постановки изменения до фиксации
+from concurrent.futures import Future, ThreadPoolExecutor, wait  # Потоки
+from src.utils.cache import ChatCache  # Запросы к базе истории чата
+from src.utils.logger import AppLogger  # Логирование ошибок фоновой записи
+
+
+# Методы ChatCache, выполняемые на соединениях только для чтения
+READ_METHODS = (
+    'get_latest_conversation', 'get_conversations', 'get_auth_data',
+    'get_model_catalog', 'get_chat_history', 'get_history_page', 'search',
+    'get_analytics_rollup', 'get_analytics_page', 'find_response',
+    'get_analytics_sketches', 'get_analytics_history',
+    'get_formatted_history',
+)
+
+# Методы ChatCache, выполняемые потоком записи
+WRITE_METHODS = (
+    'save_message', 'create_conversation', 'save_auth_data',
+    'clear_auth_data', 'save_model_catalog', 'touch_model_catalog',
+    'save_analytics', 'rebuild_analytics_rollup', 'save_response',
+    'touch_response', 'prune_responses', 'clear_responses',
+    'save_analytics_sketches', 'clear_analytics', 'clear_history',
+)
+
+# Изменения, результат которых нужен вызывающему коду синхронно
+RESULT_WRITE_METHODS = ('create_conversation',)
+
+
+def _submit(executor, func, args, kwargs):
+    """
+    Постановка вызова в поток executor в копии текущего контекста
+    (как asyncio.to_thread), чтобы этапы попадали в текущую трассировку.
+
+    Returns:
+        concurrent.futures.Future: Результат вызова.
+    """
+    return executor.submit(contextvars.copy_context().run,
+                           functools.partial(func, *args, **kwargs))
+
+
+class BatchWriter:
+    """
+    Поток записи с групповой фиксацией.
+
+    Потоку принадлежит ChatCache с единственным соединением на запись
+    (создаётся функцией factory в самом потоке). Изменения выполняются
+    по очереди; всё, что накопилось в очереди к началу записи (но не
+    больше max_batch изменений), фиксируется одной транзакцией, как
+    в WriteBehindQueue. Каждое изменение выполняется в своей точке
+    сохранения: ошибка откатывает только его. Результат изменения
+    становится доступен после фиксации транзакции, поэтому
+    дождавшийся его код видит изменение на любом соединении.
+
+    Args:
+        factory (callable): Создание ChatCache (вызывается в потоке).
+        max_batch (int): Максимальное число изменений в одной транзакции.
+    """
+
+    # Маркер остановки потока записи
+    _STOP = object()
+
+    def __init__(self, factory, max_batch=500):
+        self.max_batch = max_batch
+        self.cache = None
+        self.closed = False
+        self._queue = queue.Queue()
+        self._ready = Future()
+        self._thread = threading.Thread(
+            target=self._run, args=(factory,), name="db-writer", daemon=True
+        )
+        self._thread.start()
+        self.cache = self._ready.result()
+
+    @property
+    def thread(self):
+        return self._thread
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Постановка изменения в очередь (интерфейс Executor.submit).
+
+        Returns:
+            concurrent.futures.Future: Результат после фиксации.
+        """
+        if self.closed:
+            raise RuntimeError("BatchWriter is closed")
+        future = Future()
+        self._queue.put((func, args, kwargs, future, time.perf_counter()))
+        return future
+
+    def shutdown(self, wait=True):
+        """
+        Запись оставшихся изменений и остановка потока.
+        """
+        if not self.closed:
+            self.closed = True
+            self._queue.put(self._STOP)
+        if wait and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _run(self, factory):
+        """
+        Основной цикл потока записи.
+        """
+        try:
+            cache = factory()
+            cache.defer_commits()
+        except BaseException as e:
+            self._ready.set_exception(e)
+            return
+        self._ready.set_result(cache)
+
+        stopped = False
+        while not stopped:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if self._STOP in batch:
+                stopped = True
+                batch = [item for item in batch if item is not self._STOP]
+            self._write_batch(cache, batch)
+
+    def _write_batch(self, cache, batch):
+        """
+        Выполнение пачки изменений одной транзакцией.
+
+        Args:
+            cache (ChatCache): ChatCache потока записи.
+            batch (list): Изменения (func, args, kwargs, future,
+                          время постановки).
+        """
+        batch = [item for item in batch
+                 if item[3].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        connection = cache.get_connection()
+        outcomes = []
+        try:
+            connection.execute("BEGIN")
+            for func, args, kwargs, _, _ in batch:
+                connection.execute("SAVEPOINT change")
+                try:
+                    outcomes.append((func(*args, **kwargs), None))
+                except Exception as e:
+                    connection.execute("ROLLBACK TO change")
+                    outcomes.append((None, e))
+                connection.execute("RELEASE change")
+            connection.commit()
+        except sqlite3.Error as e:
+            connection.rollback()
+            outcomes = [(None, e)] * len(batch)
+        done = time.perf_counter()
+        for (_, _, _, future, enqueued), (result, error) in zip(batch,
+                                                                outcomes):
+            if error is None:
+                cache.write_metric.observe(done - enqueued)
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+class AsyncChatCache:
+    """
+    Асинхронный интерфейс к базе истории чата.
+
+    Запросы ChatCache выполняются вне event loop:
+    - все изменения — одним потоком записи (BatchWriter), которому
+      принадлежит единственное соединение на запись (в нём же при
+      открытии применяются миграции схемы); накопившиеся в очереди
+      изменения фиксируются одной транзакцией;
+    - чтение — пулом из readers потоков, у каждого своё соединение
+      только для чтения; в режиме WAL чтение не ждёт записи и видит
+      все изменения, запись которых уже дождались через await.
+
+    Методы повторяют методы ChatCache (save_message, get_chat_history,
+    save_analytics и т.д.) и возвращают корутины. Для синхронных
+    компонентов (Analytics, ResponseCache, каталог моделей) атрибут
+    sync предоставляет те же методы поверх тех же потоков. close()
+    дожидается выполнения принятых запросов, останавливает потоки
+    и закрывает все соединения; после него запросы завершаются
+    RuntimeError.
+
+    Args:
+        db_name (str): Путь к файлу базы данных.
+        readers (int): Число потоков (и соединений) чтения.
+        tracer (Tracer): Трассировка запросов (необязательно).
+        metrics (MetricsRegistry): Реестр метрик (необязательно).
+    """
+
+    def __init__(self, db_name='chat_cache.db', readers=2, tracer=None,
+                 metrics=None):
+        self.db_name = db_name
+        self.closed = False
+        # База создаётся и мигрирует на соединении потока записи
+        self._writer = BatchWriter(functools.partial(
+            ChatCache, db_name, write_behind=False, tracer=tracer,
+            metrics=metrics
+        ))
+        self.cache = self._writer.cache
+        self._readers = ThreadPoolExecutor(
+            readers, thread_name_prefix="db-reader",
+            initializer=self.cache.open_connection,
+            initargs=(True,)
+        )
+        self.sync = SyncChatCache(self)
+        # Изменения, поставленные без ожидания, записываются при выходе
+        atexit.register(self.close_sync)
+
+    def _submit(self, executor, name, args, kwargs):
+        """
+        Постановка метода ChatCache в поток executor.
+        """
+        if self.closed:
+            raise RuntimeError("AsyncChatCache is closed")
+        return _submit(executor, getattr(self.cache, name), args, kwargs)
+
+    async def _run(self, executor, name, args, kwargs):
+        """
+        Выполнение метода ChatCache в потоке executor.
+        """
+        return await asyncio.wrap_future(
+            self._submit(executor, name, args, kwargs)
+        )
+
+    async def close(self):
+        """
+        Выполнение принятых запросов, остановка потоков
+        и закрытие соединений.
+        """
+        if self.closed:
+            return
+        await asyncio.to_thread(self.close_sync)
+
+    def close_sync(self):
+        """
+        Синхронный close() (например, при завершении процесса).
+        """
+        if self.closed:
+            return
+        self.closed = True
+        atexit.unregister(self.close_sync)
+        self._readers.shutdown(wait=True)
+        self._writer.shutdown(wait=True)
+        self.cache.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class SyncChatCache:
+    """
+    Синхронные методы ChatCache поверх потоков AsyncChatCache.
+
+    Используется компонентами, которые обращаются к базе из пула
+    задач или обработчиков (Analytics, ResponseCache, каталог моделей
+    OpenRouterClient), вместо отдельного соединения на запись:
+    - изменения ставятся в очередь единственного потока записи
+      и не ждут фиксации (как фоновая запись ChatCache);
+      create_conversation возвращает идентификатор после записи;
+    - чтение выполняется соединением только для чтения; если
+      поставленные через sync изменения ещё не зафиксированы,
+      оно сначала дожидается последнего из них (поток записи
+      фиксирует изменения по порядку).
+
+    Args:
+        db (AsyncChatCache): Асинхронный интерфейс базы.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.db_name = db.db_name
+        self.logger = AppLogger()
+        # Последнее изменение, поставленное без ожидания
+        self._last_write = None
+
+    def flush(self):
+        """
+        Ожидание записи всех изменений, поставленных в очередь.
+
+        В потоке записи не ждёт: его изменения уже видны ему самому,
+        а ожидание собственной очереди привело бы к взаимоблокировке.
+        """
+        pending = self._last_write
+        if pending is None or pending.done():
+            return
+        if threading.current_thread() is self.db._writer.thread:
+            return
+        wait([pending])
+
+    def get_response(self, key, now):
+        """
+        ChatCache.get_response(): поиск соединением чтения,
+        отметка времени обращения — в очереди записи.
+        """
+        row = self._read('find_response', (key, now), {})
+        if row is not None:
+            self._write('touch_response', (key, now), {})
+        return row
+
+    def _read(self, name, args, kwargs):
+        self.flush()
+        return self.db._submit(self.db._readers, name, args, kwargs).result()
+
+    def _write(self, name, args, kwargs):
+        future = self.db._submit(self.db._writer, name, args, kwargs)
+        if name in RESULT_WRITE_METHODS:
+            return future.result()
+        self._last_write = future
+        future.add_done_callback(self._log_failure)
+        return None
+
+    def _log_failure(self, future):
+        """
+        Запись ошибки изменения, результат которого не ожидается.
+        """
+        if not future.cancelled() and future.exception() is not None:
+            self.logger.error("Write failed: %s", future.exception())
+
+
+def _method(name, executor, kind):
+    """
+    Асинхронная обёртка метода ChatCache.
+    """
+    async def method(self, *args, **kwargs):
+        return await self._run(getattr(self, executor), name, args, kwargs)
+
+    method.__name__ = name
+    method.__qualname__ = f"AsyncChatCache.{name}"
+    method.__doc__ = (f"ChatCache.{name}() в потоке {kind}.\n\n"
+                      + (getattr(ChatCache, name).__doc__ or ""))
+    return method
+
+
+def _sync_method(name, dispatch, kind):
+    """
+    Синхронная обёртка метода ChatCache.
+    """
+    def method(self, *args, **kwargs):
+        return getattr(self, dispatch)(name, args, kwargs)
+
+    method.__name__ = name
+    method.__qualname__ = f"SyncChatCache.{name}"
+    method.__doc__ = (f"ChatCache.{name}() в потоке {kind}.\n\n"
+                      + (getattr(ChatCache, name).__doc__ or ""))
+    return method
+
+
+for _name in READ_METHODS:
+    setattr(AsyncChatCache, _name, _method(_name, '_readers', "чтения"))
+    setattr(SyncChatCache, _name, _sync_method(_name, '_read', "чтения"))
+for _name in WRITE_METHODS:
+    setattr(AsyncChatCache, _name, _method(_name, '_writer', "записи"))
+    setattr(SyncChatCache, _name, _sync_method(_name, '_write', "записи"))
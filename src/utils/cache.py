@@ -1,33 +1,169 @@
+import atexit      # Регистрация сброса очереди записи при выходе
+import json        # Библиотека для сериализации каталога моделей
+import pathlib     # URI файла базы для соединений только для чтения
+import queue       # Очередь запросов на запись
 import sqlite3      # Библиотека для работы с SQLite базой данных
 import threading   # Библиотека для обеспечения потокобезопасности
+import time        # Библиотека для работы с временными метками
+from src.utils.logger import AppLogger  # Логирование ошибок фоновой записи
+from src.utils.tracing import Tracer  # Трассировка запросов к базе
+from src.utils.metrics import MetricsRegistry  # Метрики задержки записи
 
 
-class ChatCache:
+# Настройки соединений SQLite: WAL позволяет читать во время записи,
+# synchronous=NORMAL в режиме WAL не теряет целостность при сбое процесса
+CONNECTION_PRAGMAS = [
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",     # 16 МБ страничного кэша
+    "PRAGMA mmap_size = 268435456",   # 256 МБ отображения файла в память
+    "PRAGMA busy_timeout = 5000",     # Ожидание блокировки до 5 секунд
+]
+
+
+def connect(db_name, read_only=False):
     """
-    Класс для кэширования истории чата в SQLite базе данных.
+    Открытие соединения с базой данных с настроенными параметрами.
+
+    Args:
+        db_name (str): Путь к файлу базы данных.
+        read_only (bool): Открыть базу только для чтения.
+
+    Returns:
+        sqlite3.Connection: Соединение с базой.
     """
+    if read_only:
+        uri = pathlib.Path(db_name).absolute().as_uri() + "?mode=ro"
+        connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    else:
+        connection = sqlite3.connect(db_name, check_same_thread=False)
+    for pragma in CONNECTION_PRAGMAS:
+        connection.execute(pragma)
+    return connection
 
-    def __init__(self):
-        """Инициализация системы кэширования."""
-        self.db_name = 'chat_cache.db'
-        self.local = threading.local()
-        self._initialize_database()
 
-    def get_connection(self):
+class WriteBehindQueue:
+    """
+    Фоновая запись в SQLite с групповой фиксацией.
+
+    Запросы на запись ставятся в очередь и выполняются отдельным потоком
+    со своим соединением: всё, что накопилось в очереди к моменту
+    записи (но не больше max_batch запросов), фиксируется одной
+    транзакцией.
+
+    Args:
+        db_name (str): Путь к файлу базы данных.
+        max_batch (int): Максимальное число запросов в одной транзакции.
+        write_metric (Histogram): Гистограмма времени от постановки
+                                  запроса в очередь до фиксации
+                                  (необязательно).
+    """
+
+    # Маркер остановки потока записи
+    _STOP = object()
+
+    def __init__(self, db_name, max_batch=500, write_metric=None):
+        self.db_name = db_name
+        self.max_batch = max_batch
+        self.write_metric = write_metric
+        self.logger = AppLogger()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name="ChatCacheWriter", daemon=True
+        )
+        self._thread.start()
+
+    def put(self, query, params=()):
         """
-        Получение соединения с базой данных для текущего потока.
+        Постановка запроса на запись в очередь.
+
+        Args:
+            query (str): SQL-запрос.
+            params (tuple): Параметры запроса.
         """
-        if not hasattr(self.local, 'connection'):
-            self.local.connection = sqlite3.connect(
-                self.db_name, check_same_thread=False
-            )
-        return self.local.connection
+        self._queue.put((query, params, time.perf_counter()))
 
-    def _initialize_database(self):
+    def flush(self):
+        """
+        Ожидание записи всех запросов, поставленных в очередь.
+        """
+        self._queue.join()
+
+    def close(self):
+        """
+        Запись оставшихся запросов и остановка потока записи.
+        """
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+
+    def _run(self):
         """
-        Инициализация базы данных и создание необходимых таблиц.
+        Основной цикл потока записи.
         """
-        queries = [
+        connection = connect(self.db_name)
+        stopped = False
+        while not stopped:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if self._STOP in batch:
+                stopped = True
+                batch = [item for item in batch if item is not self._STOP]
+
+            try:
+                self._write_batch(connection, batch)
+                if self.write_metric is not None:
+                    done = time.perf_counter()
+                    for _, _, enqueued in batch:
+                        self.write_metric.observe(done - enqueued)
+            finally:
+                for _ in range(len(batch) + (1 if stopped else 0)):
+                    self._queue.task_done()
+        connection.close()
+
+    def _write_batch(self, connection, batch):
+        """
+        Запись пачки запросов одной транзакцией.
+
+        Если транзакция не удалась, запросы повторяются по одному,
+        чтобы ошибочный запрос не отменил запись остальных.
+
+        Args:
+            connection (sqlite3.Connection): Соединение потока записи.
+            batch (list): Запросы (query, params, время постановки).
+        """
+        if not batch:
+            return
+        try:
+            with connection:
+                for query, params, _ in batch:
+                    connection.execute(query, params)
+            return
+        except sqlite3.Error as e:
+            self.logger.error("Batch write failed, retrying one by one: %s", e)
+
+        for query, params, _ in batch:
+            try:
+                with connection:
+                    connection.execute(query, params)
+            except sqlite3.Error as e:
+                self.logger.error("Write failed: %s", e, exc_info=True)
+
+
+class ChatCache:
+    """
+    Класс для кэширования истории чата в SQLite базе данных.
+    """
+
+    # Миграции схемы базы данных: (версия, запросы).
+    # Номер применённой версии хранится в PRAGMA user_version.
+    MIGRATIONS = [
+        (1, [
             '''CREATE TABLE IF NOT EXISTS messages (
                    id INTEGER PRIMARY KEY AUTOINCREMENT,
                    model TEXT,
@@ -49,38 +185,314 @@ class ChatCache:
                    api_key TEXT NOT NULL,
                    pin TEXT NOT NULL,
                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+               )''',
+            '''CREATE TABLE IF NOT EXISTS model_catalog (
+                   id INTEGER PRIMARY KEY CHECK (id = 1),
+                   models TEXT NOT NULL,
+                   etag TEXT,
+                   last_modified TEXT,
+                   fetched_at FLOAT
                )'''
-        ]
+        ]),
+        (2, [
+            '''CREATE TABLE conversations (
+                   id INTEGER PRIMARY KEY AUTOINCREMENT,
+                   title TEXT,
+                   created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+               )''',
+            '''ALTER TABLE messages ADD COLUMN conversation_id INTEGER
+               REFERENCES conversations(id)''',
+            # Существующие сообщения переносятся в один общий диалог
+            '''INSERT INTO conversations (title)
+               SELECT 'Диалог' WHERE EXISTS (SELECT 1 FROM messages)''',
+            '''UPDATE messages
+               SET conversation_id = (SELECT MIN(id) FROM conversations)''',
+            '''CREATE INDEX idx_messages_conversation_timestamp
+               ON messages (conversation_id, timestamp)''',
+            '''CREATE INDEX idx_analytics_messages_timestamp
+               ON analytics_messages (timestamp)'''
+        ]),
+        (3, [
+            # Полнотекстовый индекс по сообщениям (external content FTS5)
+            '''CREATE VIRTUAL TABLE messages_fts USING fts5(
+                   user_message, ai_response,
+                   content='messages', content_rowid='id',
+                   tokenize='unicode61 remove_diacritics 2'
+               )''',
+            '''CREATE TRIGGER messages_fts_insert AFTER INSERT ON messages
+               BEGIN
+                   INSERT INTO messages_fts (rowid, user_message, ai_response)
+                   VALUES (new.id, new.user_message, new.ai_response);
+               END''',
+            '''CREATE TRIGGER messages_fts_delete AFTER DELETE ON messages
+               BEGIN
+                   INSERT INTO messages_fts
+                       (messages_fts, rowid, user_message, ai_response)
+                   VALUES ('delete', old.id, old.user_message,
+                           old.ai_response);
+               END''',
+            '''CREATE TRIGGER messages_fts_update
+               AFTER UPDATE OF user_message, ai_response ON messages
+               BEGIN
+                   INSERT INTO messages_fts
+                       (messages_fts, rowid, user_message, ai_response)
+                   VALUES ('delete', old.id, old.user_message,
+                           old.ai_response);
+                   INSERT INTO messages_fts (rowid, user_message, ai_response)
+                   VALUES (new.id, new.user_message, new.ai_response);
+               END''',
+            # Индексация уже сохранённых сообщений
+            "INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')"
+        ]),
+        (4, [
+            # Агрегаты аналитики по моделям, обновляемые при каждой записи
+            '''CREATE TABLE analytics_rollup (
+                   model TEXT PRIMARY KEY,
+                   message_count INTEGER NOT NULL,
+                   tokens_used INTEGER NOT NULL,
+                   message_length INTEGER NOT NULL,
+                   response_time FLOAT NOT NULL
+               )''',
+            '''INSERT INTO analytics_rollup
+               SELECT model, COUNT(*), COALESCE(SUM(tokens_used), 0),
+                      COALESCE(SUM(message_length), 0),
+                      COALESCE(SUM(response_time), 0)
+               FROM analytics_messages
+               GROUP BY model'''
+        ]),
+        (5, [
+            # Сохранённые скетчи задержек аналитики (JSON)
+            '''CREATE TABLE analytics_sketches (
+                   model TEXT NOT NULL,
+                   metric TEXT NOT NULL,
+                   data TEXT NOT NULL,
+                   PRIMARY KEY (model, metric)
+               )'''
+        ]),
+        (6, [
+            # Постоянный уровень кэша ответов на идентичные запросы
+            '''CREATE TABLE response_cache (
+                   key TEXT PRIMARY KEY,
+                   model TEXT NOT NULL,
+                   response TEXT NOT NULL,
+                   tokens_used INTEGER NOT NULL,
+                   created_at REAL NOT NULL,
+                   accessed_at REAL NOT NULL,
+                   expires_at REAL NOT NULL
+               )''',
+            '''CREATE INDEX idx_response_cache_accessed_at
+               ON response_cache (accessed_at)'''
+        ]),
+    ]
+
+    def __init__(self, db_name='chat_cache.db', write_behind=True,
+                 tracer=None, metrics=None):
+        """
+        Инициализация системы кэширования.
+
+        Args:
+            db_name (str): Путь к файлу базы данных.
+            write_behind (bool): Выполнять запись в фоновом потоке
+                                 с групповой фиксацией транзакций.
+            tracer (Tracer): Трассировка запросов (необязательно).
+            metrics (MetricsRegistry): Реестр метрик (необязательно).
+        """
+        self.db_name = db_name
+        self.tracer = tracer or Tracer(enabled=False)
+        self.write_metric = (metrics or MetricsRegistry()).histogram(
+            "cache_write_seconds",
+            "Time from a cache write request to its commit"
+        )
+        self.local = threading.local()
+
+        # Все открытые соединения (по одному на поток) для закрытия в close()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._initialize_database()
+
+        # Фоновая запись; очередь сбрасывается при завершении процесса
+        self.writer = (
+            WriteBehindQueue(db_name, write_metric=self.write_metric)
+            if write_behind else None
+        )
+        if self.writer:
+            atexit.register(self.close)
+
+    def get_connection(self):
+        """
+        Получение соединения с базой данных для текущего потока.
+        """
+        if not hasattr(self.local, 'connection'):
+            self.open_connection()
+        return self.local.connection
+
+    def open_connection(self, read_only=False):
+        """
+        Открытие соединения для текущего потока (вместо уже открытого).
+
+        Args:
+            read_only (bool): Соединение только для чтения.
+
+        Returns:
+            sqlite3.Connection: Соединение с базой.
+        """
+        connection = connect(self.db_name, read_only=read_only)
+        with self._connections_lock:
+            self._connections.append(connection)
+        self.local.connection = connection
+        return connection
+
+    def flush(self):
+        """
+        Ожидание записи всех изменений, поставленных в очередь.
+        """
+        if self.writer:
+            self.writer.flush()
+
+    def close(self):
+        """
+        Запись всех изменений из очереди, остановка фоновой записи
+        и закрытие соединений всех потоков. Последующие запросы
+        открывают новые соединения, изменения выполняются синхронно.
+        """
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+        self._close_connections()
+
+    def _close_connections(self):
+        """
+        Закрытие соединений, открытых всеми потоками.
+        """
+        with self._connections_lock:
+            connections = self._connections
+            self._connections = []
+            self.local = threading.local()
+        for connection in connections:
+            connection.close()
+
+    def _initialize_database(self):
+        """
+        Инициализация базы данных: применение недостающих миграций схемы.
+
+        Каждая миграция выполняется в отдельной транзакции вместе
+        с обновлением user_version, поэтому существующие файлы базы
+        обновляются на месте и не остаются в промежуточном состоянии.
+        """
         conn = self.get_connection()
-        cursor = conn.cursor()
-        for query in queries:
-            cursor.execute(query)
-        conn.commit()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for target_version, queries in self.MIGRATIONS:
+            if target_version <= version:
+                continue
+            try:
+                conn.execute("BEGIN")
+                for query in queries:
+                    conn.execute(query)
+                conn.execute(f"PRAGMA user_version = {target_version}")
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
 
     def execute_query(self, query, params=None, fetch=False):
         """
         Общий метод для выполнения SQL-запросов.
+
+        Запросы на запись при включённой фоновой записи ставятся
+        в очередь; запросы на чтение сначала дожидаются записи очереди,
+        чтобы видеть все ранее сделанные изменения.
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
         params = params or ()
-        cursor.execute(query, params)
-        if fetch:
-            result = cursor.fetchall()
-        else:
-            conn.commit()
-            result = None
-        return result
+        with self.tracer.span("cache.read" if fetch else "cache.write"):
+            if self.writer:
+                if not fetch:
+                    self.writer.put(query, params)
+                    return None
+                self.writer.flush()
+
+            start = time.perf_counter()
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            if fetch:
+                result = cursor.fetchall()
+            else:
+                if self._commit(conn):
+                    self.write_metric.observe(time.perf_counter() - start)
+                result = None
+            return result
+
+    def defer_commits(self):
+        """
+        Отключение фиксации после каждого изменения в текущем потоке:
+        транзакцией управляет вызывающий код (групповая фиксация
+        потока записи AsyncChatCache).
+        """
+        self.local.defer_commits = True
+
+    def _commit(self, conn):
+        """
+        Фиксация изменений, если поток не откладывает фиксацию.
+
+        Returns:
+            bool: Изменения зафиксированы.
+        """
+        if getattr(self.local, 'defer_commits', False):
+            return False
+        conn.commit()
+        return True
 
-    def save_message(self, model, user_message, ai_response, tokens_used):
+    def save_message(self, model, user_message, ai_response, tokens_used,
+                     conversation_id=None):
         """
         Сохранение нового сообщения в базу данных.
         """
         query = '''
-            INSERT INTO messages (model, user_message, ai_response, tokens_used)
-            VALUES (?, ?, ?, ?)
+            INSERT INTO messages (model, user_message, ai_response,
+                                  tokens_used, conversation_id)
+            VALUES (?, ?, ?, ?, ?)
         '''
-        self.execute_query(query, (model, user_message, ai_response, tokens_used))
+        with self.tracer.span("cache.save_message"):
+            self.execute_query(query, (model, user_message, ai_response,
+                                       tokens_used, conversation_id))
+
+    def create_conversation(self, title=None):
+        """
+        Создание нового диалога.
+
+        Returns:
+            int: Идентификатор диалога.
+        """
+        # Идентификатор нужен сразу, поэтому запись выполняется синхронно
+        self.flush()
+        conn = self.get_connection()
+        cursor = conn.execute(
+            "INSERT INTO conversations (title) VALUES (?)", (title,)
+        )
+        self._commit(conn)
+        return cursor.lastrowid
+
+    def get_latest_conversation(self):
+        """
+        Получение идентификатора последнего созданного диалога.
+
+        Returns:
+            int: Идентификатор диалога или None, если диалогов нет.
+        """
+        query = "SELECT MAX(id) FROM conversations"
+        result = self.execute_query(query, fetch=True)
+        return result[0][0] if result else None
+
+    def get_conversations(self, limit=50):
+        """
+        Получение списка последних диалогов.
+        """
+        query = '''
+            SELECT id, title, created_at FROM conversations
+            ORDER BY id DESC
+            LIMIT ?
+        '''
+        return self.execute_query(query, params=(limit,), fetch=True)
 
     def save_auth_data(self, api_key, pin):
         """
@@ -111,17 +523,171 @@ class ChatCache:
         query = "DELETE FROM auth_data"
         self.execute_query(query)
 
-    def get_chat_history(self, limit=50):
+    def save_model_catalog(self, models, etag=None, last_modified=None):
         """
-        Получение последних сообщений из истории чата.
+        Сохранение каталога моделей вместе с валидаторами HTTP-кэша.
         """
         query = '''
-            SELECT id, model, user_message, ai_response, timestamp, tokens_used
-            FROM messages
-            ORDER BY timestamp DESC
-            LIMIT ?
+            INSERT OR REPLACE INTO model_catalog
+            (id, models, etag, last_modified, fetched_at)
+            VALUES (1, ?, ?, ?, ?)
         '''
-        return self.execute_query(query, params=(limit,), fetch=True)
+        self.execute_query(query, (json.dumps(models, ensure_ascii=False),
+                                   etag, last_modified, time.time()))
+
+    def touch_model_catalog(self):
+        """
+        Продление срока актуальности сохранённого каталога моделей.
+        """
+        query = "UPDATE model_catalog SET fetched_at = ? WHERE id = 1"
+        self.execute_query(query, (time.time(),))
+
+    def get_model_catalog(self):
+        """
+        Получение сохранённого каталога моделей.
+
+        Returns:
+            dict: Ключи models, etag, last_modified, fetched_at
+                  или None, если каталог ещё не сохранялся.
+        """
+        query = '''
+            SELECT models, etag, last_modified, fetched_at
+            FROM model_catalog WHERE id = 1
+        '''
+        result = self.execute_query(query, fetch=True)
+        if not result:
+            return None
+        models, etag, last_modified, fetched_at = result[0]
+        return {
+            "models": json.loads(models),
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": fetched_at or 0
+        }
+
+    def get_chat_history(self, limit=50, conversation_id=None):
+        """
+        Получение последних сообщений из истории чата.
+
+        Если передан conversation_id, выборка ограничивается диалогом
+        и идёт по индексу (conversation_id, timestamp).
+        """
+        if conversation_id is None:
+            query = '''
+                SELECT id, model, user_message, ai_response, timestamp,
+                       tokens_used
+                FROM messages
+                ORDER BY timestamp DESC, id DESC
+                LIMIT ?
+            '''
+            return self.execute_query(query, params=(limit,), fetch=True)
+
+        return self.get_history_page(conversation_id, limit=limit)
+
+    def get_history_page(self, conversation_id, before=None, limit=50):
+        """
+        Получение страницы истории диалога (keyset-пагинация).
+
+        Страницы идут от новых сообщений к старым. Курсор before —
+        пара (timestamp, id) самого старого сообщения предыдущей
+        страницы, поэтому стоимость запроса не зависит от того,
+        насколько далеко пролистана история.
+
+        Args:
+            conversation_id (int): Идентификатор диалога.
+            before (tuple): Курсор (timestamp, id) или None
+                            для первой страницы.
+            limit (int): Размер страницы.
+
+        Returns:
+            list: Строки (id, model, user_message, ai_response,
+                  timestamp, tokens_used) от новых к старым.
+        """
+        if before is None:
+            query = '''
+                SELECT id, model, user_message, ai_response, timestamp,
+                       tokens_used
+                FROM messages
+                WHERE conversation_id = ?
+                ORDER BY timestamp DESC, id DESC
+                LIMIT ?
+            '''
+            params = (conversation_id, limit)
+        else:
+            query = '''
+                SELECT id, model, user_message, ai_response, timestamp,
+                       tokens_used
+                FROM messages
+                WHERE conversation_id = ? AND (timestamp, id) < (?, ?)
+                ORDER BY timestamp DESC, id DESC
+                LIMIT ?
+            '''
+            params = (conversation_id, before[0], before[1], limit)
+        return self.execute_query(query, params=params, fetch=True)
+
+    def search(self, query, limit=20, offset=0, conversation_id=None,
+               start_mark="[", end_mark="]"):
+        """
+        Полнотекстовый поиск по истории сообщений.
+
+        Результаты упорядочены по релевантности (BM25); найдены должны
+        быть все слова запроса.
+
+        Args:
+            query (str): Строка поиска.
+            limit (int): Размер страницы результатов.
+            offset (int): Смещение страницы.
+            conversation_id (int): Ограничить поиск диалогом.
+            start_mark (str): Маркер начала найденного фрагмента.
+            end_mark (str): Маркер конца найденного фрагмента.
+
+        Returns:
+            list: Результаты [{"id", "conversation_id", "model",
+                  "timestamp", "snippet"}, ...].
+        """
+        match = self._build_match_query(query)
+        if not match:
+            return []
+
+        conversation_filter = (
+            "AND m.conversation_id = ?" if conversation_id is not None else ""
+        )
+        query = f'''
+            SELECT m.id, m.conversation_id, m.model, m.timestamp,
+                   snippet(messages_fts, -1, ?, ?, '…', 12)
+            FROM messages_fts
+            JOIN messages m ON m.id = messages_fts.rowid
+            WHERE messages_fts MATCH ? {conversation_filter}
+            ORDER BY bm25(messages_fts)
+            LIMIT ? OFFSET ?
+        '''
+        params = [start_mark, end_mark, match]
+        if conversation_id is not None:
+            params.append(conversation_id)
+        params.extend([limit, offset])
+
+        rows = self.execute_query(query, params=tuple(params), fetch=True)
+        return [
+            {
+                "id": row[0],
+                "conversation_id": row[1],
+                "model": row[2],
+                "timestamp": row[3],
+                "snippet": row[4]
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def _build_match_query(query):
+        """
+        Преобразование пользовательской строки в запрос FTS5.
+
+        Каждое слово экранируется как фраза, чтобы кавычки и операторы
+        FTS5 в тексте не приводили к синтаксическим ошибкам.
+        """
+        terms = ['"' + term.replace('"', '""') + '"' for term in query.split()]
+        return " ".join(terms)
 
     def save_analytics(self, timestamp, model, message_length,
                        response_time, tokens_used):
@@ -136,6 +702,202 @@ class ChatCache:
         self.execute_query(query, (timestamp, model, message_length,
                                    response_time, tokens_used))
 
+        # Инкрементальное обновление агрегатов модели
+        query_rollup = '''
+            INSERT INTO analytics_rollup (model, message_count, tokens_used,
+                                          message_length, response_time)
+            VALUES (?, 1, ?, ?, ?)
+            ON CONFLICT (model) DO UPDATE SET
+                message_count = message_count + 1,
+                tokens_used = tokens_used + excluded.tokens_used,
+                message_length = message_length + excluded.message_length,
+                response_time = response_time + excluded.response_time
+        '''
+        self.execute_query(query_rollup, (model, tokens_used, message_length,
+                                          response_time))
+
+    def get_analytics_rollup(self):
+        """
+        Получение агрегатов аналитики по моделям.
+
+        Returns:
+            list: Строки (model, message_count, tokens_used,
+                  message_length, response_time), где последние три
+                  значения — суммы по всем сообщениям модели.
+        """
+        query = '''
+            SELECT model, message_count, tokens_used, message_length,
+                   response_time
+            FROM analytics_rollup
+        '''
+        return self.execute_query(query, fetch=True)
+
+    def rebuild_analytics_rollup(self):
+        """
+        Пересчёт агрегатов аналитики по исходным записям (GROUP BY model).
+        """
+        self.execute_query("DELETE FROM analytics_rollup")
+        self.execute_query('''
+            INSERT INTO analytics_rollup
+            SELECT model, COUNT(*), COALESCE(SUM(tokens_used), 0),
+                   COALESCE(SUM(message_length), 0),
+                   COALESCE(SUM(response_time), 0)
+            FROM analytics_messages
+            GROUP BY model
+        ''')
+
+    def get_analytics_page(self, after=None, limit=1000):
+        """
+        Получение страницы исходных записей аналитики (keyset-пагинация).
+
+        Args:
+            after (tuple): Курсор (timestamp, id) последней записи
+                           предыдущей страницы или None.
+            limit (int): Размер страницы.
+
+        Returns:
+            list: Строки (id, timestamp, model, message_length,
+                  response_time, tokens_used) в хронологическом порядке.
+        """
+        if after is None:
+            query = '''
+                SELECT id, timestamp, model, message_length, response_time,
+                       tokens_used
+                FROM analytics_messages
+                ORDER BY timestamp ASC, id ASC
+                LIMIT ?
+            '''
+            params = (limit,)
+        else:
+            query = '''
+                SELECT id, timestamp, model, message_length, response_time,
+                       tokens_used
+                FROM analytics_messages
+                WHERE (timestamp, id) > (?, ?)
+                ORDER BY timestamp ASC, id ASC
+                LIMIT ?
+            '''
+            params = (after[0], after[1], limit)
+        return self.execute_query(query, params=params, fetch=True)
+
+    def save_response(self, key, model, response, tokens_used, created_at,
+                      expires_at):
+        """
+        Сохранение ответа модели в кэше ответов.
+        """
+        query = '''
+            INSERT OR REPLACE INTO response_cache
+            (key, model, response, tokens_used, created_at, accessed_at,
+             expires_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        '''
+        self.execute_query(query, (key, model, response, tokens_used,
+                                   created_at, created_at, expires_at))
+
+    def get_response(self, key, now):
+        """
+        Получение актуального ответа из кэша ответов
+        с отметкой времени обращения.
+
+        Args:
+            key (str): Ключ запроса.
+            now (float): Текущее время в секундах эпохи.
+
+        Returns:
+            tuple: (ответ, токены, время окончания актуальности)
+                   или None.
+        """
+        row = self.find_response(key, now)
+        if row is not None:
+            self.touch_response(key, now)
+        return row
+
+    def find_response(self, key, now):
+        """
+        Поиск актуального ответа в кэше ответов (только чтение).
+
+        Args:
+            key (str): Ключ запроса.
+            now (float): Текущее время в секундах эпохи.
+
+        Returns:
+            tuple: (ответ, токены, время окончания актуальности)
+                   или None.
+        """
+        rows = self.execute_query(
+            '''SELECT response, tokens_used, expires_at FROM response_cache
+               WHERE key = ? AND expires_at > ?''',
+            params=(key, now), fetch=True
+        )
+        return rows[0] if rows else None
+
+    def touch_response(self, key, now):
+        """
+        Отметка времени обращения к ответу (для вытеснения по LRU).
+        """
+        self.execute_query(
+            "UPDATE response_cache SET accessed_at = ? WHERE key = ?",
+            (now, key)
+        )
+
+    def prune_responses(self, now, max_rows):
+        """
+        Удаление устаревших ответов и давно не использованных ответов
+        сверх max_rows.
+        """
+        self.execute_query("DELETE FROM response_cache WHERE expires_at <= ?",
+                           (now,))
+        self.execute_query('''
+            DELETE FROM response_cache WHERE key IN (
+                SELECT key FROM response_cache
+                ORDER BY accessed_at DESC
+                LIMIT -1 OFFSET ?
+            )
+        ''', (max_rows,))
+
+    def clear_responses(self):
+        """
+        Удаление всех ответов из кэша ответов.
+        """
+        self.execute_query("DELETE FROM response_cache")
+
+    def save_analytics_sketches(self, sketches):
+        """
+        Сохранение скетчей задержек аналитики вместо ранее сохранённых.
+
+        Args:
+            sketches (dict): {(model, metric): словарь скетча}.
+        """
+        self.execute_query("DELETE FROM analytics_sketches")
+        query = '''
+            INSERT INTO analytics_sketches (model, metric, data)
+            VALUES (?, ?, ?)
+        '''
+        for (model, metric), data in sketches.items():
+            self.execute_query(query, (model, metric, json.dumps(data)))
+
+    def get_analytics_sketches(self):
+        """
+        Получение сохранённых скетчей задержек аналитики.
+
+        Returns:
+            dict: {(model, metric): словарь скетча}.
+        """
+        query = "SELECT model, metric, data FROM analytics_sketches"
+        return {
+            (model, metric): json.loads(data)
+            for model, metric, data in self.execute_query(query, fetch=True)
+        }
+
+    def clear_analytics(self):
+        """
+        Удаление всех данных аналитики: исходных записей,
+        агрегатов по моделям и скетчей задержек.
+        """
+        self.execute_query("DELETE FROM analytics_messages")
+        self.execute_query("DELETE FROM analytics_rollup")
+        self.execute_query("DELETE FROM analytics_sketches")
+
     def get_analytics_history(self):
         """
         Получение всей истории аналитики.
@@ -149,10 +911,10 @@ class ChatCache:
 
     def clear_history(self):
         """
-        Очистка истории сообщений.
+        Очистка истории сообщений и списка диалогов.
         """
-        query = "DELETE FROM messages"
-        self.execute_query(query)
+        self.execute_query("DELETE FROM messages")
+        self.execute_query("DELETE FROM conversations")
 
     def get_formatted_history(self):
         """
@@ -161,7 +923,7 @@ class ChatCache:
         query = '''
             SELECT id, model, user_message, ai_response, timestamp, tokens_used
             FROM messages
-            ORDER BY timestamp ASC
+            ORDER BY timestamp ASC, id ASC
         '''
         rows = self.execute_query(query, fetch=True)
         return [
@@ -178,7 +940,7 @@ class ChatCache:
 
     def __del__(self):
         """
-        Закрытие соединения с базой данных.
+        Закрытие соединений с базой данных.
         """
-        if hasattr(self.local, 'connection'):
-            self.local.connection.close()
+        if hasattr(self, '_connections'):
+            self._close_connections()
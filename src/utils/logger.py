@@ -1,35 +1,126 @@
+import atexit      # Остановка фонового потока логирования при выходе
+import copy        # Копирование записей перед постановкой в очередь
+import json        # Форматирование записей в JSON
 import logging     # Стандартная библиотека Python для логирования
+import logging.handlers  # QueueHandler и QueueListener
 import os         # Библиотека для работы с операционной системой и файлами
+import queue       # Очередь записей между приложением и потоком вывода
 from datetime import datetime  # Библиотека для работы с датой и временем
 
 
+class DailyFileHandler(logging.FileHandler):
+    """
+    Запись логов в файл с датой в имени (chat_app_ГГГГ-ММ-ДД.log).
+
+    При смене даты файл закрывается и следующая запись попадает
+    в файл нового дня, поэтому долго работающий процесс не пишет
+    всё в файл дня запуска.
+
+    Args:
+        logs_dir (str): Директория лог-файлов.
+        prefix (str): Начало имени файла.
+    """
+
+    def __init__(self, logs_dir, prefix="chat_app"):
+        self.logs_dir = logs_dir
+        self.prefix = prefix
+        self.current_date = datetime.now().strftime("%Y-%m-%d")
+        super().__init__(self._path(self.current_date), encoding='utf-8')
+
+    def _path(self, date):
+        """
+        Путь к файлу логов за указанную дату.
+        """
+        return os.path.join(self.logs_dir, f"{self.prefix}_{date}.log")
+
+    def emit(self, record):
+        """
+        Запись сообщения с переходом на файл нового дня при смене даты.
+        """
+        date = datetime.fromtimestamp(record.created).strftime("%Y-%m-%d")
+        if date != self.current_date:
+            self.current_date = date
+            self.close()
+            self.baseFilename = os.path.abspath(self._path(date))
+        super().emit(record)
+
+
+class RecordQueueHandler(logging.handlers.QueueHandler):
+    """
+    Постановка записей лога в очередь фонового потока.
+
+    В отличие от стандартного QueueHandler, текст исключения
+    сохраняется отдельно от сообщения (exc_text), чтобы форматтеры
+    потока вывода могли вывести его в своём формате.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Форматирование записи лога в одну строку JSON.
+
+    Поля: time, level, logger, message и, при наличии, exception.
+    """
+
+    def format(self, record):
+        data = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exception'] = record.exc_text
+        return json.dumps(data, ensure_ascii=False)
+
+
 class AppLogger:
     """
     Класс для логирования работы приложения.
 
     Возможности:
-    - Сохранение логов в файлы (с именем в формате текущей даты).
+    - Сохранение логов в файлы (с именем в формате текущей даты,
+      новый файл при смене даты).
     - Вывод логов в консоль.
     - Поддержка разных уровней логирования (debug, info, warning, error).
-    - Форматирование сообщений с временными метками.
+    - Форматирование сообщений с временными метками или в JSON.
+
+    Вызов логгера только ставит запись в очередь: вывод в файл
+    и консоль выполняет фоновый поток QueueListener. Сообщения
+    принимают аргументы в стиле logging ("... %s", value), которые
+    подставляются, только если уровень сообщения включён.
     """
 
+    # Фоновый поток вывода записей (общий для всех экземпляров)
+    _listener = None
+
     def __init__(self):
         """
         Инициализация системы логирования.
 
         Настраивает директорию хранения логов, форматирование сообщений
         и обработчики для записи в файл и вывода в консоль.
+        Уровень задаётся переменной окружения LOG_LEVEL (по умолчанию
+        DEBUG), формат файла — LOG_FORMAT (text или json).
         """
         # Директория для хранения лог-файлов
         self.logs_dir = "logs"
         if not os.path.exists(self.logs_dir):
             os.makedirs(self.logs_dir)
 
-        # Формирование имени файла с логами
-        current_date = datetime.now().strftime("%Y-%m-%d")
-        log_file = os.path.join(self.logs_dir, f"chat_app_{current_date}.log")
-
         # Форматирование сообщений
         formatter = logging.Formatter(
             '%(asctime)s - %(levelname)s - %(message)s',
@@ -42,24 +133,42 @@ class AppLogger:
         # Проверка, есть ли уже установленные обработчики (чтобы избежать дублирования)
         if not self.logger.hasHandlers():
             # Устанавливаем уровень логирования
-            self.logger.setLevel(logging.DEBUG)
+            self.logger.setLevel(
+                os.getenv("LOG_LEVEL", "DEBUG").upper()
+            )
 
-            # Обработчик для записи логов в файл
-            file_handler = logging.FileHandler(
-                log_file,  # Указываем путь к файлу
-                encoding='utf-8'  # Кодировка для поддержки Unicode
+            # Обработчик для записи логов в файл текущего дня
+            file_handler = DailyFileHandler(self.logs_dir)
+            file_handler.setFormatter(
+                JsonFormatter() if os.getenv("LOG_FORMAT") == "json"
+                else formatter
             )
-            file_handler.setFormatter(formatter)
 
             # Обработчик для вывода логов в консоль
             console_handler = logging.StreamHandler()
             console_handler.setFormatter(formatter)
 
-            # Добавляем обработчики к логгеру
-            self.logger.addHandler(file_handler)
-            self.logger.addHandler(console_handler)  # Вывод в консоль
+            # Логгер только ставит записи в очередь, вывод выполняет
+            # фоновый поток
+            log_queue = queue.SimpleQueue()
+            self.logger.addHandler(RecordQueueHandler(log_queue))
+            AppLogger._listener = logging.handlers.QueueListener(
+                log_queue, file_handler, console_handler,
+                respect_handler_level=True
+            )
+            AppLogger._listener.start()
+            atexit.register(AppLogger.stop)
+
+    @staticmethod
+    def stop():
+        """
+        Вывод оставшихся записей и остановка фонового потока логирования.
+        """
+        if AppLogger._listener is not None:
+            AppLogger._listener.stop()
+            AppLogger._listener = None
 
-    def info(self, message: str):
+    def info(self, message: str, *args):
         """
         Логирование информационного сообщения.
 
@@ -67,10 +176,11 @@ class AppLogger:
 
         Args:
             message (str): Текст сообщения.
+            *args: Аргументы для подстановки в message.
         """
-        self.logger.info(message)
+        self.logger.info(message, *args)
 
-    def error(self, message: str, exc_info=None):
+    def error(self, message: str, *args, exc_info=None):
         """
         Логирование ошибки.
 
@@ -78,12 +188,13 @@ class AppLogger:
 
         Args:
             message (str): Текст сообщения об ошибке.
+            *args: Аргументы для подстановки в message.
             exc_info: Информация об исключении (например, стек вызовов).
                       Если `exc_info=True`, добавляет полное окно стека.
         """
-        self.logger.error(message, exc_info=exc_info)
+        self.logger.error(message, *args, exc_info=exc_info)
 
-    def debug(self, message: str):
+    def debug(self, message: str, *args):
         """
         Логирование отладочного сообщения.
 
@@ -91,10 +202,11 @@ class AppLogger:
 
         Args:
             message (str): Текст отладочного сообщения.
+            *args: Аргументы для подстановки в message.
         """
-        self.logger.debug(message)
+        self.logger.debug(message, *args)
 
-    def warning(self, message: str):
+    def warning(self, message: str, *args):
         """
         Логирование предупреждения.
 
@@ -102,5 +214,6 @@ class AppLogger:
 
         Args:
             message (str): Текст предупреждающего сообщения.
+            *args: Аргументы для подстановки в message.
         """
-        self.logger.warning(message)
+        self.logger.warning(message, *args)
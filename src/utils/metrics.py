@@ -0,0 +1,303 @@
+import bisect      # Поиск интервала гистограммы
+import threading   # Блокировки и поток HTTP-сервера
+# HTTP-эндпоинт метрик
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Границы интервалов гистограмм задержек по умолчанию (секунды)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+                   5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(names, values, extra=()):
+    """
+    Форматирование набора меток в синтаксисе OpenMetrics.
+
+    Args:
+        names (tuple): Имена меток.
+        values (tuple): Значения меток.
+        extra (tuple): Дополнительные пары (имя, значение).
+
+    Returns:
+        str: Строка вида {model="x",le="0.1"} или пустая строка.
+    """
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        f'{name}="' + str(value).replace("\\", "\\\\")
+        .replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class Metric:
+    """
+    Базовое семейство метрик с набором меток.
+
+    Args:
+        name (str): Имя метрики.
+        documentation (str): Описание метрики.
+        labelnames (tuple): Имена меток.
+    """
+
+    TYPE = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        """
+        Ключ значения метрики по меткам.
+        """
+        return tuple(labels[name] for name in self.labelnames)
+
+    def render(self):
+        """
+        Строки OpenMetrics для семейства.
+
+        Returns:
+            list: Строки без завершающего перевода строки.
+        """
+        lines = [
+            f"# TYPE {self.name} {self.TYPE}",
+            f"# HELP {self.name} {self.documentation}",
+        ]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value):
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """
+    Монотонно растущий счётчик.
+    """
+
+    TYPE = "counter"
+
+    def inc(self, amount=1, **labels):
+        """
+        Увеличение счётчика.
+
+        Args:
+            amount (float): Величина увеличения.
+            **labels: Значения меток.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _render_value(self, key, value):
+        return [f"{self.name}_total{_format_labels(self.labelnames, key)} "
+                f"{value}"]
+
+
+class Gauge(Metric):
+    """
+    Текущее значение величины.
+    """
+
+    TYPE = "gauge"
+
+    def set(self, value, **labels):
+        """
+        Установка значения.
+
+        Args:
+            value (float): Новое значение.
+            **labels: Значения меток.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _render_value(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}"]
+
+
+class Histogram(Metric):
+    """
+    Гистограмма с фиксированными границами интервалов.
+
+    Args:
+        buckets (tuple): Верхние границы интервалов по возрастанию.
+    """
+
+    TYPE = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(),
+                 buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        """
+        Учёт наблюдения.
+
+        Args:
+            value (float): Наблюдаемое значение.
+            **labels: Значения меток.
+        """
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Счётчики по интервалам (+Inf последним), сумма, количество
+                state = self._values[key] = [[0] * (len(self.buckets) + 1),
+                                             0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _render_value(self, key, value):
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        bounds = [repr(float(bound)) for bound in self.buckets] + ["+Inf"]
+        for bound, bucket_count in zip(bounds, counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.labelnames, key, (("le", bound),))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {total}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Реестр метрик приложения.
+
+    Компоненты регистрируют семейства метрик и обновляют их по мере
+    работы, поэтому формирование ответа на запрос метрик не обращается
+    ни к базе данных, ни к psutil.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, documentation, labelnames, **kwargs):
+        """
+        Получение зарегистрированного семейства или создание нового.
+        """
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(
+                    name, documentation, labelnames, **kwargs
+                )
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered "
+                                 f"as {metric.TYPE}")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        """
+        Регистрация счётчика.
+
+        Returns:
+            Counter: Семейство счётчиков.
+        """
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        """
+        Регистрация текущего значения.
+
+        Returns:
+            Gauge: Семейство значений.
+        """
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(),
+                  buckets=DEFAULT_BUCKETS):
+        """
+        Регистрация гистограммы.
+
+        Returns:
+            Histogram: Семейство гистограмм.
+        """
+        return self._register(Histogram, name, documentation, labelnames,
+                              buckets=buckets)
+
+    def render(self) -> str:
+        """
+        Все метрики в текстовом формате OpenMetrics.
+
+        Returns:
+            str: Текст ответа, завершённый маркером # EOF.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    Локальный HTTP-эндпоинт /metrics в формате OpenMetrics.
+
+    Сервер работает в фоновом потоке и отдаёт содержимое реестра.
+
+    Args:
+        registry (MetricsRegistry): Реестр метрик.
+        port (int): Порт (0 — выбрать свободный).
+        host (str): Адрес прослушивания.
+    """
+
+    CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+    def __init__(self, registry, port, host="127.0.0.1"):
+        self.registry = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.split("?")[0] != "/metrics":
+                    handler.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                handler.send_response(200)
+                handler.send_header("Content-Type", self.CONTENT_TYPE)
+                handler.send_header("Content-Length", str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, *args):
+                # Запросы сборщика метрик не пишутся в лог
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="metrics-server",
+            daemon=True
+        )
+
+    def start(self):
+        """
+        Запуск сервера в фоновом потоке.
+        """
+        self._thread.start()
+
+    def stop(self):
+        """
+        Остановка сервера.
+        """
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,178 @@
+import heapq       # Отбор лучших результатов без полной сортировки
+import itertools   # Ограничение числа кандидатов нечёткого поиска
+import math        # Минимальное число общих биграмм нечёткого совпадения
+from collections import Counter  # Подсчёт общих n-грамм при нечётком поиске
+
+
+class ModelIndex:
+    """
+    Индекс каталога моделей для поиска по мере ввода.
+
+    При построении для строки "идентификатор название" каждой модели
+    (в нижнем регистре) сохраняются все n-граммы длиной до N символов
+    и множества моделей, в которых они встречаются. Поиск пересекает
+    множества самых редких n-грамм запроса, поэтому его стоимость
+    зависит от числа совпадений, а не от размера каталога.
+
+    Ранжирование:
+    - точное вхождение всех слов запроса выше нечёткого совпадения,
+      вхождение с начала слова (после "/", "-", пробела и т.п.)
+      выше вхождения в середине, при равенстве выше короткие строки;
+    - нечёткие совпадения (опечатки, пропуски) упорядочены по доле
+      общих с запросом биграмм, не меньшей FUZZY_MIN; кандидаты
+      берутся из списков самых редких биграмм запроса.
+
+    Args:
+        models (list): Модели [{"id": ..., "name": ...}, ...].
+    """
+
+    # Максимальная длина индексируемой n-граммы
+    N = 3
+
+    # Минимальная доля общих биграмм для нечёткого совпадения
+    FUZZY_MIN = 0.4
+
+    # Предельное число кандидатов нечёткого поиска
+    FUZZY_CANDIDATES = 500
+
+    # Символы, после которых начинается слово
+    WORD_SEPARATORS = " /-:._()"
+
+    def __init__(self, models: list):
+        self.texts = [
+            f"{model['id']} {model.get('name') or ''}".lower()
+            for model in models
+        ]
+        self.lengths = [len(text) for text in self.texts]
+
+        # n-грамма -> модели, в которых она встречается / начинает слово
+        self.postings = {}
+        self.word_starts = {}
+        for i, text in enumerate(self.texts):
+            for gram in self._grams(text):
+                self.postings.setdefault(gram, set()).add(i)
+            for position in range(len(text)):
+                if position and text[position - 1] not in (
+                        self.WORD_SEPARATORS):
+                    continue
+                for n in range(1, self.N + 1):
+                    gram = text[position:position + n]
+                    if len(gram) == n:
+                        self.word_starts.setdefault(gram, set()).add(i)
+
+    @classmethod
+    def _grams(cls, text: str, n=None) -> set:
+        """
+        N-граммы строки.
+
+        Args:
+            text (str): Строка в нижнем регистре.
+            n (int): Длина n-грамм запроса (строка короче n — целиком);
+                     без n — все длины от 1 до N (для индекса).
+
+        Returns:
+            set: N-граммы.
+        """
+        if n is not None:
+            if len(text) <= n:
+                return {text}
+            return {text[i:i + n] for i in range(len(text) - n + 1)}
+        return {
+            text[i:i + n]
+            for n in range(1, cls.N + 1)
+            for i in range(len(text) - n + 1)
+        }
+
+    def _exact(self, token: str) -> set:
+        """
+        Модели, строка которых содержит token.
+        """
+        postings = sorted(
+            (self.postings.get(gram, set())
+             for gram in self._grams(token, self.N)),
+            key=len
+        )
+        if not postings or not postings[0]:
+            return set()
+        candidates = postings[0].intersection(*postings[1:])
+        if len(token) <= self.N:
+            return candidates
+        # Все триграммы на месте — проверяем их порядок
+        return {i for i in candidates if token in self.texts[i]}
+
+    def search(self, query: str, limit: int = 50) -> list:
+        """
+        Поиск моделей по запросу.
+
+        Args:
+            query (str): Текст запроса (регистр не важен).
+            limit (int): Максимальное число результатов.
+
+        Returns:
+            list: Номера моделей от лучших к худшим.
+        """
+        tokens = query.lower().split()
+        if not tokens:
+            return []
+
+        # Точные вхождения всех слов запроса
+        exact = None
+        for token in sorted(tokens, key=len, reverse=True):
+            matches = self._exact(token)
+            exact = matches if exact is None else exact & matches
+            if not exact:
+                break
+
+        # Группы точных совпадений по числу слов запроса, с которых
+        # начинается слово строки; внутри группы — короткие строки выше
+        tiers = [set() for _ in range(len(tokens) + 1)]
+        if len(tokens) == 1:
+            starts = exact & self.word_starts.get(tokens[0][:self.N], set())
+            tiers[1], tiers[0] = starts, exact - starts
+        else:
+            hits = Counter()
+            for token in tokens:
+                hits.update(exact & self.word_starts.get(token[:self.N],
+                                                         set()))
+            for i in exact:
+                tiers[hits[i]].add(i)
+
+        length = self.lengths.__getitem__
+        ranked = []
+        for tier in reversed(tiers):
+            ranked.extend(heapq.nsmallest(limit - len(ranked), tier,
+                                          key=length))
+            if len(ranked) >= limit:
+                return ranked
+
+        # Нечёткие совпадения, если точных не хватает до limit
+        grams = set().union(
+            *(self._grams(token, 2) for token in tokens if len(token) > 2)
+        )
+        if not grams:
+            return ranked
+        # Совпадение с долей не меньше FUZZY_MIN содержит хотя бы одну
+        # из len(grams) - needed + 1 самых редких биграмм, поэтому
+        # кандидаты берутся только из их списков (не больше
+        # FUZZY_CANDIDATES), а не из всего каталога
+        needed = math.ceil(self.FUZZY_MIN * len(grams))
+        postings = sorted((self.postings.get(gram, set()) for gram in grams),
+                          key=len)
+        candidates = set()
+        for posting in postings[:len(grams) - needed + 1]:
+            candidates.update(itertools.islice(
+                posting, self.FUZZY_CANDIDATES - len(candidates)
+            ))
+            if len(candidates) >= self.FUZZY_CANDIDATES:
+                break
+        candidates -= exact
+
+        shared = Counter()
+        for posting in postings:
+            shared.update(candidates & posting)
+        fuzzy = [i for i, count in shared.items() if count >= needed]
+        ranked.extend(heapq.nsmallest(
+            limit - len(ranked), fuzzy,
+            key=lambda i: (-shared[i], self.lengths[i])
+        ))
+        return ranked
@@ -1,6 +1,8 @@
 import psutil      # Библиотека для мониторинга системных ресурсов (CPU, память, потоки)
+import threading   # Фоновый поток сбора метрик
 import time        # Библиотека для работы с временными метками и измерения интервалов
 from datetime import datetime  # Библиотека для работы с датой и временем
+from src.utils.metrics import MetricsRegistry  # Метрики для внешнего сбора
 
 
 class PerformanceMonitor:
@@ -13,22 +15,59 @@ class PerformanceMonitor:
     - Количество активных потоков
     - Время работы приложения
     - Проверка состояния системы
+
+    Метрики собираются фоновым потоком (start/stop) с интервалом
+    interval секунд в кольцевой буфер фиксированного размера с текущими
+    суммами, поэтому чтение последнего замера и средних значений
+    не обращается к psutil и выполняется за O(1).
+
+    Args:
+        interval (float): Интервал между замерами в секундах.
+        history_size (int): Количество хранимых замеров.
+        metrics (MetricsRegistry): Реестр, в котором обновляются
+                                   показатели процесса (необязательно).
     """
 
-    def __init__(self):
+    # Метрики, для которых поддерживаются текущие суммы
+    AGGREGATED = ('cpu_percent', 'memory_percent', 'thread_count')
+
+    def __init__(self, interval=5.0, history_size=1000, metrics=None):
         """
         Инициализация монитора производительности.
 
         Настраивает:
         - Время старта мониторинга
-        - Историю метрик
+        - Кольцевой буфер истории метрик и текущие суммы
         - Процесс для анализа
         - Пороговые значения для метрик
         """
         self.start_time = time.time()  # Время запуска для расчёта uptime
-        self.metrics_history = []      # История собранных метрик
+        self.interval = interval       # Интервал фонового сбора метрик
         self.process = psutil.Process()  # Текущий процесс приложения
 
+        # Кольцевой буфер истории: позиция следующей записи и заполненность
+        self.metrics_history = [None] * history_size
+        self._next = 0
+        self._count = 0
+        self._sums = dict.fromkeys(self.AGGREGATED, 0.0)
+        self._latest = None
+        self._lock = threading.Lock()
+
+        # Показатели процесса для внешнего сбора метрик
+        metrics = metrics or MetricsRegistry()
+        self._gauges = {
+            'cpu_percent': metrics.gauge(
+                "app_cpu_percent", "Process CPU usage, percent"),
+            'memory_rss': metrics.gauge(
+                "app_memory_rss_bytes", "Process resident memory"),
+            'thread_count': metrics.gauge(
+                "app_threads", "Process thread count"),
+        }
+
+        # Фоновый поток сбора метрик
+        self._thread = None
+        self._stop_event = threading.Event()
+
         # Пороговые значения для анализа производительности
         self.thresholds = {
             'cpu_percent': 80.0,     # Максимальная загрузка CPU (%)
@@ -52,18 +91,17 @@ class PerformanceMonitor:
                 'memory_percent': (
                     self.process.memory_percent()  # Использование памяти
                 ),
-                'thread_count': len(
-                    self.process.threads()  # Количество потоков
+                'memory_rss': (
+                    self.process.memory_info().rss  # Резидентная память
+                ),
+                'thread_count': (
+                    self.process.num_threads()  # Количество потоков
                 ),
                 'uptime': time.time() - self.start_time  # Время работы
             }
 
             # Добавление данных в историю метрик
-            self.metrics_history.append(metrics)
-
-            # Лимит хранения истории (последние 1000 записей)
-            if len(self.metrics_history) > 1000:
-                self.metrics_history.pop(0)
+            self._record(metrics)
 
             return metrics
 
@@ -74,18 +112,100 @@ class PerformanceMonitor:
                 'timestamp': datetime.now()
             }
 
-    def check_health(self) -> dict:
+    def _record(self, metrics: dict):
+        """
+        Запись замера в кольцевой буфер с обновлением текущих сумм.
+
+        Args:
+            metrics (dict): Замер метрик.
+        """
+        with self._lock:
+            evicted = self.metrics_history[self._next]
+            if evicted is not None:
+                for key in self.AGGREGATED:
+                    self._sums[key] -= evicted[key]
+            for key in self.AGGREGATED:
+                self._sums[key] += metrics[key]
+
+            self.metrics_history[self._next] = metrics
+            self._next = (self._next + 1) % len(self.metrics_history)
+            self._count = min(self._count + 1, len(self.metrics_history))
+            self._latest = metrics
+
+        for key, gauge in self._gauges.items():
+            gauge.set(metrics[key])
+
+    def latest(self):
+        """
+        Последний замер метрик без обращения к psutil.
+
+        Returns:
+            dict: Последний замер или None, если замеров ещё не было.
+        """
+        return self._latest
+
+    def get_history(self) -> list:
+        """
+        История замеров от старых к новым.
+
+        Returns:
+            list: Словари метрик.
+        """
+        with self._lock:
+            start = (self._next - self._count) % len(self.metrics_history)
+            return [
+                self.metrics_history[(start + i) % len(self.metrics_history)]
+                for i in range(self._count)
+            ]
+
+    def start(self):
+        """
+        Запуск фонового сбора метрик.
+        """
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="performance-monitor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """
+        Остановка фонового сбора метрик.
+        """
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        """
+        Цикл фонового потока: замер метрик каждые interval секунд.
+        """
+        while True:
+            self.get_metrics()
+            if self._stop_event.wait(self.interval):
+                return
+
+    def check_health(self, metrics=None) -> dict:
         """
         Проверка состояния системы.
 
-        Сравнивает текущие метрики с пороговыми значениями и определяет
+        Сравнивает метрики с пороговыми значениями и определяет
         потенциальные проблемы с производительностью.
 
+        Args:
+            metrics (dict): Проверяемый замер; по умолчанию последний,
+                            а если замеров ещё не было — новый.
+
         Returns:
             dict: Статус системы: 'healthy', 'warning' или 'error'.
             Содержит список предупреждений при необходимости.
         """
-        metrics = self.get_metrics()  # Получение текущих метрик
+        if metrics is None:
+            metrics = self.latest() or self.get_metrics()
 
         # Если была ошибка при сборе метрик
         if 'error' in metrics:
@@ -123,35 +243,36 @@ class PerformanceMonitor:
 
     def get_average_metrics(self) -> dict:
         """
-        Расчёт средних значений метрик за всю историю наблюдений.
+        Расчёт средних значений метрик по замерам в кольцевом буфере.
 
         Returns:
             dict: Словарь со средними значениями CPU, памяти, потоков,
                   либо сообщение об отсутствии данных.
         """
+        with self._lock:
+            count = self._count
+            sums = dict(self._sums)
+
         # Проверка наличия данных для расчёта
-        if not self.metrics_history:
+        if not count:
             return {"error": "No metrics available"}
 
-        # Вычисление средних метрик
+        # Средние значения по текущим суммам кольцевого буфера
         avg_metrics = {
-            'avg_cpu': sum(
-                m['cpu_percent'] for m in self.metrics_history
-            ) / len(self.metrics_history),
-            'avg_memory': sum(
-                m['memory_percent'] for m in self.metrics_history
-            ) / len(self.metrics_history),
-            'avg_threads': sum(
-                m['thread_count'] for m in self.metrics_history
-            ) / len(self.metrics_history),
-            'samples_count': len(self.metrics_history)  # Количество замеров
+            'avg_cpu': sums['cpu_percent'] / count,
+            'avg_memory': sums['memory_percent'] / count,
+            'avg_threads': sums['thread_count'] / count,
+            'samples_count': count  # Количество замеров
         }
 
         return avg_metrics
 
     def log_metrics(self, logger) -> None:
         """
-        Логирование текущих метрик и состояния системы.
+        Логирование последнего замера метрик и состояния системы.
+
+        Использует последний замер фонового потока и не обращается
+        к psutil, поэтому может вызываться из обработчиков интерфейса.
 
         Записывает в лог:
         - Значения метрик производительности.
@@ -160,20 +281,21 @@ class PerformanceMonitor:
         Args:
             logger: Экземпляр логгера для записи данных.
         """
-        metrics = self.get_metrics()   # Текущие метрики
-        health = self.check_health()   # Состояние системы
+        metrics = self.latest()   # Последний замер
+        if metrics is None:
+            return
+        health = self.check_health(metrics)   # Состояние системы
 
-        # Логирование текущих метрик, если нет ошибок
+        # Логирование метрик, если нет ошибок
         if 'error' not in metrics:
             logger.info(
-                f"Performance metrics - "
-                f"CPU: {metrics['cpu_percent']:.1f}%, "
-                f"Memory: {metrics['memory_percent']:.1f}%, "
-                f"Threads: {metrics['thread_count']}, "
-                f"Uptime: {metrics['uptime']:.0f}s"
+                "Performance metrics - CPU: %.1f%%, Memory: %.1f%%, "
+                "Threads: %s, Uptime: %.0fs",
+                metrics['cpu_percent'], metrics['memory_percent'],
+                metrics['thread_count'], metrics['uptime']
             )
 
         # Логирование предупреждений о производительности
         if health['status'] == 'warning':
             for warning in health['warnings']:
-                logger.warning(f"Performance warning: {warning}")
+                logger.warning("Performance warning: %s", warning)
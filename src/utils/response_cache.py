@@ -0,0 +1,130 @@
+import hashlib     # Хэш ключа кэша
+import json        # Сериализация запроса для ключа
+import threading   # Блокировка уровня в памяти (вызовы из пула потоков)
+import time        # Срок актуальности записей
+from collections import OrderedDict  # Порядок использования для LRU
+
+
+class ResponseCache:
+    """
+    Кэш ответов моделей на идентичные запросы.
+
+    Двухуровневый: в памяти хранятся последние использованные ответы
+    (LRU), в таблице response_cache базы ChatCache — ответы за ttl
+    секунд, но не более max_rows записей (вытесняются давно
+    не использованные).
+
+    Args:
+        cache (ChatCache): База для постоянного уровня.
+        max_entries (int): Размер уровня в памяти.
+        ttl (float): Срок актуальности ответа в секундах.
+        max_rows (int): Максимальное число записей в базе.
+        prune_interval (int): Через сколько сохранений удаляются
+                              устаревшие и лишние записи базы.
+    """
+
+    def __init__(self, cache, max_entries=256, ttl=86400.0, max_rows=10000,
+                 prune_interval=100):
+        self.cache = cache
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.prune_interval = prune_interval
+
+        # Ключ -> (ответ, токены, время окончания актуальности)
+        self._entries = OrderedDict()
+        self._puts = 0
+        self._lock = threading.Lock()
+
+        self.cache.prune_responses(time.time(), max_rows)
+
+    @staticmethod
+    def make_key(model, messages, params=None):
+        """
+        Ключ кэша для запроса.
+
+        Текст сообщений нормализуется: пробелы по краям удаляются,
+        последовательности пробельных символов заменяются одним пробелом.
+
+        Args:
+            model (str): Идентификатор модели.
+            messages (list): Сообщения запроса
+                             [{"role": ..., "content": ...}, ...].
+            params (dict): Параметры запроса (temperature и т.п.).
+
+        Returns:
+            str: SHA-256 нормализованного запроса.
+        """
+        normalized = [
+            [message["role"], " ".join(message["content"].split())]
+            for message in messages
+        ]
+        payload = json.dumps([model, normalized, params or {}],
+                             ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Получение ответа из кэша.
+
+        Args:
+            key (str): Ключ из make_key().
+
+        Returns:
+            tuple: (ответ, токены) или None, если ответа нет
+                   или он устарел.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[2] > now:
+                    self._entries.move_to_end(key)
+                    return entry[0], entry[1]
+                del self._entries[key]
+
+        row = self.cache.get_response(key, now)
+        if row is None:
+            return None
+        self._remember(key, row)
+        return row[0], row[1]
+
+    def put(self, key, model, response, tokens_used):
+        """
+        Сохранение ответа в обоих уровнях кэша.
+
+        Args:
+            key (str): Ключ из make_key().
+            model (str): Идентификатор модели.
+            response (str): Текст ответа.
+            tokens_used (int): Количество использованных токенов.
+        """
+        now = time.time()
+        expires_at = now + self.ttl
+        self._remember(key, (response, tokens_used, expires_at))
+        self.cache.save_response(key, model, response, tokens_used,
+                                 now, expires_at)
+
+        with self._lock:
+            self._puts += 1
+            prune = self._puts % self.prune_interval == 0
+        if prune:
+            self.cache.prune_responses(now, self.max_rows)
+
+    def _remember(self, key, entry):
+        """
+        Добавление записи в уровень в памяти с вытеснением старых.
+        """
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Удаление всех сохранённых ответов.
+        """
+        with self._lock:
+            self._entries.clear()
+        self.cache.clear_responses()
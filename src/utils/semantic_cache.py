@@ -0,0 +1,245 @@
+import os          # Пути к файлу индекса
+import threading   # Блокировка индексов (вызовы из пула потоков)
+import zlib        # Стабильный между запусками хэш n-грамм
+import numpy as np  # Векторы запросов и поиск по косинусной близости
+
+
+def embed(text, dim=256, n=3):
+    """
+    Локальное векторное представление текста на хэшированных n-граммах.
+
+    Текст приводится к нижнему регистру, пробелы нормализуются;
+    каждая символьная n-грамма хэшируется в одну из dim координат
+    со знаком, зависящим от хэша. Вектор нормируется, поэтому
+    скалярное произведение двух векторов равно косинусной близости.
+
+    Args:
+        text (str): Текст запроса.
+        dim (int): Размерность вектора.
+        n (int): Длина n-граммы.
+
+    Returns:
+        numpy.ndarray: Вектор float32 длины dim.
+    """
+    normalized = f" {' '.join(text.lower().split())} "
+    vector = np.zeros(dim, dtype=np.float32)
+    if len(normalized) < n:
+        return vector
+    hashes = np.fromiter(
+        (zlib.crc32(normalized[i:i + n].encode("utf-8"))
+         for i in range(len(normalized) - n + 1)),
+        dtype=np.uint32
+    )
+    signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+    np.add.at(vector, hashes % dim, signs)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SemanticIndex:
+    """
+    Индекс векторов запросов к одной модели в массиве NumPy.
+
+    Векторы хранятся построчно в матрице, поиск — одно умножение
+    матрицы на вектор запроса. Матрица растёт удвоением до max_entries,
+    после чего новые записи заменяют самые старые (кольцевой буфер).
+
+    Args:
+        dim (int): Размерность векторов.
+        max_entries (int): Максимальное число записей.
+    """
+
+    # Начальная ёмкость матрицы векторов
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, dim=256, max_entries=100_000):
+        self.dim = dim
+        self.max_entries = max_entries
+        self.size = 0
+        self.next = 0
+        self.vectors = np.zeros(
+            (min(self.INITIAL_CAPACITY, max_entries), dim), dtype=np.float32
+        )
+        self.keys = [None] * len(self.vectors)
+
+    def add(self, vector, key):
+        """
+        Добавление вектора запроса.
+
+        Args:
+            vector (numpy.ndarray): Нормированный вектор запроса.
+            key (str): Ключ ответа в кэше ответов.
+        """
+        if self.next == len(self.vectors) < self.max_entries:
+            self._grow(min(len(self.vectors) * 2, self.max_entries))
+
+        self.vectors[self.next] = vector
+        self.keys[self.next] = key
+        self.size = max(self.size, self.next + 1)
+        self.next = (self.next + 1) % self.max_entries
+
+    def _grow(self, capacity):
+        """
+        Увеличение ёмкости матрицы векторов.
+        """
+        vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        vectors[:len(self.vectors)] = self.vectors
+        self.vectors = vectors
+        self.keys.extend([None] * (capacity - len(self.keys)))
+
+    def search(self, vector):
+        """
+        Поиск ближайшего запроса.
+
+        Args:
+            vector (numpy.ndarray): Нормированный вектор запроса.
+
+        Returns:
+            tuple: (ключ, косинусная близость) или None, если индекс пуст.
+        """
+        if not self.size:
+            return None
+        scores = self.vectors[:self.size] @ vector
+        best = int(np.argmax(scores))
+        return self.keys[best], float(scores[best])
+
+    def restore(self, vectors, keys, next_row):
+        """
+        Восстановление записей, сохранённых из vectors, keys и next.
+
+        Args:
+            vectors (numpy.ndarray): Векторы записей.
+            keys (list): Ключи записей.
+            next_row (int): Строка для следующей записи.
+        """
+        size = min(len(vectors), self.max_entries)
+        if size > len(self.vectors):
+            self._grow(size)
+        self.vectors[:size] = vectors[:size]
+        self.keys[:size] = keys[:size]
+        self.size = size
+        self.next = next_row % self.max_entries
+
+
+class SemanticCache:
+    """
+    Кэш ответов на близкие по смыслу запросы.
+
+    Надстройка над ResponseCache: ответы хранятся там же, а индексы
+    векторов запросов (отдельный для каждой модели) связывают новый
+    запрос с ключом ответа на самый близкий запрос той же модели.
+    Ответ возвращается, если косинусная близость не ниже threshold
+    и ответ ещё актуален. Индексы сохраняются в один файл .npz.
+    Индексы защищены блокировкой: поиск и добавление можно вызывать
+    из разных потоков (векторизация выполняется вне блокировки).
+
+    Args:
+        response_cache (ResponseCache): Хранилище ответов.
+        path (str): Путь к файлу индекса.
+        threshold (float): Минимальная косинусная близость.
+        dim (int): Размерность векторов.
+        max_entries (int): Максимальное число запросов на модель.
+    """
+
+    def __init__(self, response_cache, path, threshold=0.92, dim=256,
+                 max_entries=100_000):
+        self.response_cache = response_cache
+        self.path = path
+        self.threshold = threshold
+        self.dim = dim
+        self.max_entries = max_entries
+        self.indexes = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self.load()
+
+    @staticmethod
+    def prompt_text(messages):
+        """
+        Текст запроса для векторизации: все сообщения с ролями.
+        """
+        return "\n".join(
+            f"{message['role']}: {message['content']}" for message in messages
+        )
+
+    def get(self, model, messages):
+        """
+        Поиск ответа на близкий запрос.
+
+        Args:
+            model (str): Идентификатор модели.
+            messages (list): Сообщения запроса.
+
+        Returns:
+            tuple: (ответ, токены, близость) или None.
+        """
+        if model not in self.indexes:
+            return None
+        vector = embed(self.prompt_text(messages), self.dim)
+        with self._lock:
+            index = self.indexes.get(model)
+            found = index.search(vector) if index is not None else None
+        if found is None or found[1] < self.threshold:
+            return None
+        cached = self.response_cache.get(found[0])
+        if cached is None:
+            return None
+        return cached[0], cached[1], found[1]
+
+    def add(self, model, messages, key):
+        """
+        Добавление запроса, ответ на который сохранён под ключом key.
+
+        Args:
+            model (str): Идентификатор модели.
+            messages (list): Сообщения запроса.
+            key (str): Ключ ответа в ResponseCache.
+        """
+        vector = embed(self.prompt_text(messages), self.dim)
+        with self._lock:
+            index = self.indexes.get(model)
+            if index is None:
+                index = self.indexes[model] = SemanticIndex(self.dim,
+                                                            self.max_entries)
+            index.add(vector, key)
+
+    def save(self):
+        """
+        Сохранение индексов рядом с базой (через временный файл).
+        """
+        with self._lock:
+            arrays = {'models': np.array(list(self.indexes), dtype=str)}
+            for i, index in enumerate(self.indexes.values()):
+                arrays[f'vectors_{i}'] = index.vectors[:index.size].copy()
+                arrays[f'keys_{i}'] = np.array(index.keys[:index.size],
+                                               dtype=str)
+                arrays[f'next_{i}'] = np.array(index.next)
+
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "wb") as file:
+            np.savez(file, **arrays)
+        os.replace(temp_path, self.path)
+
+    def load(self):
+        """
+        Загрузка индексов, сохранённых save(). Файл с другой
+        размерностью векторов пропускается.
+        """
+        with np.load(self.path) as data, self._lock:
+            for i, model in enumerate(data['models'].tolist()):
+                vectors = data[f'vectors_{i}']
+                if vectors.shape[1] != self.dim:
+                    return
+                index = self.indexes[model] = SemanticIndex(self.dim,
+                                                            self.max_entries)
+                index.restore(vectors, data[f'keys_{i}'].tolist(),
+                              int(data[f'next_{i}']))
+
+    def clear(self):
+        """
+        Удаление всех записей индексов и их файла.
+        """
+        with self._lock:
+            self.indexes.clear()
+        if os.path.exists(self.path):
+            os.remove(self.path)
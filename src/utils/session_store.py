@@ -0,0 +1,189 @@
+from datetime import datetime  # Преобразование временных меток при экспорте
+import numpy as np  # Типизированные массивы и векторные вычисления
+
+
+class SessionStore:
+    """
+    Колоночное хранилище метрик сообщений текущей сессии.
+
+    Каждая метрика хранится в отдельном типизированном массиве numpy:
+    - timestamp: время сообщения в секундах эпохи (float64)
+    - model: номер модели в таблице интернированных имён (int32)
+    - message_length, tokens_used: длина сообщения и токены (int32)
+    - response_time: время ответа в секундах (float32)
+
+    Массивы растут удвоением ёмкости, поэтому добавление записи
+    в среднем выполняется за O(1).
+    """
+
+    # Типы колонок хранилища
+    COLUMNS = {
+        'timestamp': np.float64,
+        'model': np.int32,
+        'message_length': np.int32,
+        'response_time': np.float32,
+        'tokens_used': np.int32,
+    }
+
+    # Начальная ёмкость массивов
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self):
+        self._size = 0
+        self._columns = {
+            name: np.empty(self.INITIAL_CAPACITY, dtype=dtype)
+            for name, dtype in self.COLUMNS.items()
+        }
+
+        # Интернирование идентификаторов моделей
+        self.models = []
+        self._model_ids = {}
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        """
+        Обход записей в виде словарей (для экспорта).
+
+        Yields:
+            dict: Запись с временной меткой, моделью и метриками.
+        """
+        columns = {name: self.column(name).tolist() for name in self.COLUMNS}
+        for i in range(self._size):
+            yield {
+                'timestamp': datetime.fromtimestamp(columns['timestamp'][i]),
+                'model': self.models[columns['model'][i]],
+                'message_length': columns['message_length'][i],
+                'response_time': columns['response_time'][i],
+                'tokens_used': columns['tokens_used'][i]
+            }
+
+    def append(self, timestamp, model, message_length, response_time,
+               tokens_used):
+        """
+        Добавление записи о сообщении.
+
+        Args:
+            timestamp (float): Время сообщения в секундах эпохи.
+            model (str): Идентификатор модели.
+            message_length (int): Длина сообщения в символах.
+            response_time (float): Время ответа в секундах.
+            tokens_used (int): Количество использованных токенов.
+        """
+        if self._size == len(self._columns['timestamp']):
+            self._grow()
+
+        model_id = self._model_ids.get(model)
+        if model_id is None:
+            model_id = self._model_ids[model] = len(self.models)
+            self.models.append(model)
+
+        i = self._size
+        self._columns['timestamp'][i] = timestamp
+        self._columns['model'][i] = model_id
+        self._columns['message_length'][i] = message_length
+        self._columns['response_time'][i] = response_time
+        self._columns['tokens_used'][i] = tokens_used
+        self._size += 1
+
+    def _grow(self):
+        """
+        Увеличение ёмкости всех колонок вдвое.
+        """
+        for name, column in self._columns.items():
+            grown = np.empty(len(column) * 2, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def column(self, name, model=None):
+        """
+        Получение заполненной части колонки (без копирования).
+
+        Args:
+            name (str): Имя колонки из COLUMNS.
+            model (str): Ограничить записями указанной модели.
+
+        Returns:
+            numpy.ndarray: Значения колонки.
+        """
+        values = self._columns[name][:self._size]
+        if model is None:
+            return values
+        model_id = self._model_ids.get(model)
+        if model_id is None:
+            return values[:0]
+        return values[self._columns['model'][:self._size] == model_id]
+
+    def nbytes(self):
+        """
+        Объём памяти, занятый массивами колонок, в байтах.
+        """
+        return sum(column.nbytes for column in self._columns.values())
+
+    def percentiles(self, name='response_time', q=(50, 90, 99), model=None):
+        """
+        Расчёт процентилей колонки.
+
+        Args:
+            name (str): Имя колонки.
+            q (tuple): Запрашиваемые процентили.
+            model (str): Ограничить записями указанной модели.
+
+        Returns:
+            dict: Процентиль -> значение; пустой словарь без данных.
+        """
+        values = self.column(name, model)
+        if not len(values):
+            return {}
+        return dict(zip(q, np.percentile(values, q).tolist()))
+
+    def histograms(self, name='response_time', bins=10):
+        """
+        Гистограммы колонки по моделям с общими границами интервалов.
+
+        Args:
+            name (str): Имя колонки.
+            bins (int): Количество интервалов.
+
+        Returns:
+            tuple: (границы интервалов, {модель: счётчики}).
+        """
+        values = self.column(name)
+        if not len(values):
+            return np.empty(0), {}
+        edges = np.histogram_bin_edges(values, bins=bins)
+
+        # Номер интервала каждой записи; максимум попадает в последний
+        bucket = np.clip(np.searchsorted(edges, values, side='right') - 1,
+                         0, bins - 1)
+        model_ids = self.column('model')
+        counts = np.zeros((len(self.models), bins), dtype=np.int64)
+        np.add.at(counts, (model_ids, bucket), 1)
+        return edges, dict(zip(self.models, counts))
+
+    def rates(self, bucket=60.0, model=None):
+        """
+        Количество сообщений по интервалам времени.
+
+        Args:
+            bucket (float): Длина интервала в секундах.
+            model (str): Ограничить записями указанной модели.
+
+        Returns:
+            tuple: (начала интервалов в секундах эпохи, счётчики).
+        """
+        timestamps = self.column('timestamp', model)
+        if not len(timestamps):
+            return np.empty(0), np.empty(0, dtype=np.int64)
+        start = np.floor(timestamps.min() / bucket) * bucket
+        counts = np.bincount(((timestamps - start) // bucket).astype(np.int64))
+        return start + np.arange(len(counts)) * bucket, counts
+
+    def clear(self):
+        """
+        Удаление всех записей с сохранением выделенной памяти.
+        """
+        self._size = 0
+        self.models.clear()
+        self._model_ids.clear()
@@ -0,0 +1,214 @@
+import math  # Логарифмическое разбиение значений на интервалы
+import time  # Текущее время для скользящих окон
+from collections import deque  # Кольцо временных интервалов окна
+
+
+class LatencySketch:
+    """
+    Потоковый скетч квантилей с логарифмическими интервалами
+    (в стиле HDR-гистограммы).
+
+    Значение v попадает в интервал с номером ceil(log(v) / log(gamma)),
+    поэтому оценка любого квантиля отличается от точного значения
+    не более чем на relative_accuracy. Добавление значения — O(1),
+    память зависит только от диапазона значений, но не от их числа.
+
+    Args:
+        relative_accuracy (float): Допустимая относительная погрешность.
+    """
+
+    # Значения меньше этого порога считаются нулевыми
+    MIN_VALUE = 1e-6
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value, count=1):
+        """
+        Добавление значения.
+
+        Args:
+            value (float): Значение (например, время ответа в секундах).
+            count (int): Сколько раз учесть значение.
+        """
+        self.count += count
+        self.total += value * count
+        if value < self.MIN_VALUE:
+            self.zero_count += count
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def merge(self, other):
+        """
+        Добавление всех значений другого скетча с той же точностью.
+
+        Args:
+            other (LatencySketch): Объединяемый скетч.
+        """
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+
+    def quantile(self, q):
+        """
+        Оценка квантиля.
+
+        Args:
+            q (float): Квантиль от 0 до 1.
+
+        Returns:
+            float: Оценка значения или None, если скетч пуст.
+        """
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # Середина интервала (gamma^(i-1), gamma^i]
+                return 2 * self._gamma ** index / (self._gamma + 1)
+        return 2 * self._gamma ** max(self.buckets) / (self._gamma + 1)
+
+    def mean(self):
+        """
+        Среднее значение или None, если скетч пуст.
+        """
+        return self.total / self.count if self.count else None
+
+    def to_dict(self):
+        """
+        Сериализация скетча в словарь, пригодный для JSON.
+        """
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'buckets': [[index, count]
+                        for index, count in self.buckets.items()],
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'total': self.total,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Восстановление скетча из результата to_dict().
+
+        Args:
+            data (dict): Сериализованный скетч.
+
+        Returns:
+            LatencySketch: Восстановленный скетч.
+        """
+        sketch = cls(data['relative_accuracy'])
+        sketch.buckets = {index: count for index, count in data['buckets']}
+        sketch.zero_count = data['zero_count']
+        sketch.count = data['count']
+        sketch.total = data['total']
+        return sketch
+
+
+class SlidingSketch:
+    """
+    Скетч квантилей за всё время и за скользящее окно.
+
+    Окно состоит из кольца интервалов длиной slot_seconds; каждый
+    интервал хранит собственный LatencySketch. Запрос за окно
+    объединяет только попавшие в него интервалы.
+
+    Args:
+        slot_seconds (float): Длина одного интервала в секундах.
+        slots (int): Количество хранимых интервалов (глубина окна).
+        relative_accuracy (float): Точность скетчей.
+    """
+
+    def __init__(self, slot_seconds=60.0, slots=60, relative_accuracy=0.01):
+        self.slot_seconds = slot_seconds
+        self.slots = slots
+        self.relative_accuracy = relative_accuracy
+        self.total = LatencySketch(relative_accuracy)
+        self._window = deque()  # Пары (начало интервала, скетч)
+
+    def add(self, value, now=None):
+        """
+        Добавление значения в общий скетч и в текущий интервал окна.
+
+        Args:
+            value (float): Значение.
+            now (float): Время значения в секундах эпохи (по умолчанию
+                         текущее).
+        """
+        now = time.time() if now is None else now
+        start = now - now % self.slot_seconds
+        if not self._window or self._window[-1][0] != start:
+            self._window.append((start, LatencySketch(self.relative_accuracy)))
+            while len(self._window) > self.slots:
+                self._window.popleft()
+        self._window[-1][1].add(value)
+        self.total.add(value)
+
+    def window(self, seconds=None, now=None):
+        """
+        Скетч значений за последние seconds секунд.
+
+        Точность границы окна — один интервал slot_seconds.
+
+        Args:
+            seconds (float): Длина окна; None — за всё время.
+            now (float): Момент окончания окна в секундах эпохи.
+
+        Returns:
+            LatencySketch: Скетч значений окна.
+        """
+        if seconds is None:
+            return self.total
+        now = time.time() if now is None else now
+        merged = LatencySketch(self.relative_accuracy)
+        for start, sketch in self._window:
+            if start + self.slot_seconds > now - seconds:
+                merged.merge(sketch)
+        return merged
+
+    def to_dict(self):
+        """
+        Сериализация в словарь, пригодный для JSON.
+        """
+        return {
+            'slot_seconds': self.slot_seconds,
+            'slots': self.slots,
+            'relative_accuracy': self.relative_accuracy,
+            'total': self.total.to_dict(),
+            'window': [[start, sketch.to_dict()]
+                       for start, sketch in self._window],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Восстановление из результата to_dict().
+
+        Args:
+            data (dict): Сериализованный скетч.
+
+        Returns:
+            SlidingSketch: Восстановленный скетч.
+        """
+        sliding = cls(data['slot_seconds'], data['slots'],
+                      data['relative_accuracy'])
+        sliding.total = LatencySketch.from_dict(data['total'])
+        sliding._window.extend(
+            (start, LatencySketch.from_dict(sketch))
+            for start, sketch in data['window']
+        )
+        return sliding
@@ -0,0 +1,355 @@
+import asyncio     # Ожидание задач из обработчиков Flet
+import contextvars  # Текущий span трассировки в потоке пула
+import functools   # Передача аргументов задачи в пул потоков
+import sys         # Стек потока event loop при зависании
+import threading   # Поток сторожа и текущая задача потока пула
+import time        # Измерение длительности задач и зависаний
+import traceback   # Форматирование стека зависшего потока
+from concurrent.futures import ThreadPoolExecutor  # Ограниченный пул потоков
+from src.utils.logger import AppLogger  # Логирование зависаний event loop
+from src.utils.metrics import MetricsRegistry  # Метрики задач и зависаний
+
+
+# Задача, выполняемая текущим потоком пула
+_current = threading.local()
+
+
+class TaskCancelled(Exception):
+    """
+    Задача отменена до завершения (через BackgroundTask.cancel()).
+
+    В отличие от asyncio.CancelledError, означающей отмену ожидающей
+    корутины, перехватывается обычным except Exception.
+    """
+
+
+def check_cancelled():
+    """
+    Прерывание задачи пула, если она отменена.
+
+    Вызывается из длительных операций между шагами; вне задачи
+    TaskRunner ничего не делает.
+
+    Raises:
+        TaskCancelled: Если текущая задача отменена.
+    """
+    task = getattr(_current, 'task', None)
+    if task is not None:
+        task.check()
+
+
+def report_progress(done, total=None):
+    """
+    Сообщение о ходе выполнения текущей задачи пула.
+
+    Обработчик прогресса задачи вызывается в event loop; вне задачи
+    TaskRunner ничего не делает.
+
+    Args:
+        done (int): Выполнено шагов.
+        total (int): Всего шагов (None, если неизвестно).
+
+    Raises:
+        TaskCancelled: Если текущая задача отменена.
+    """
+    task = getattr(_current, 'task', None)
+    if task is not None:
+        task.report(done, total)
+
+
+class BackgroundTask:
+    """
+    Задача, выполняемая в пуле TaskRunner.
+
+    Отмена задачи, ещё ожидающей свободного потока, снимает её
+    с очереди; уже выполняющаяся задача прерывается при следующем
+    вызове check_cancelled() или report_progress().
+
+    Args:
+        name (str): Имя задачи (метка метрик).
+        loop (asyncio.AbstractEventLoop): Цикл, в котором вызывается
+                                          обработчик прогресса.
+        on_progress (callable): Обработчик прогресса (done, total)
+                                (необязательно).
+    """
+
+    def __init__(self, name, loop, on_progress=None):
+        self.name = name
+        self.loop = loop
+        self.on_progress = on_progress
+        self.progress = (0, None)
+        self.future = None
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+    def cancel(self):
+        """
+        Отмена задачи.
+        """
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def check(self):
+        """
+        Проверка отмены (вызывается из потока пула).
+
+        Raises:
+            TaskCancelled: Если задача отменена.
+        """
+        if self._cancelled.is_set():
+            raise TaskCancelled(self.name)
+
+    def report(self, done, total=None):
+        """
+        Передача прогресса в event loop (вызывается из потока пула).
+
+        Raises:
+            TaskCancelled: Если задача отменена.
+        """
+        self.check()
+        self.progress = (done, total)
+        if self.on_progress is not None:
+            self.loop.call_soon_threadsafe(self.on_progress, done, total)
+
+    def __await__(self):
+        return self._wait().__await__()
+
+    async def _wait(self):
+        """
+        Ожидание результата; отменённая через cancel() задача,
+        снятая с очереди пула, завершается TaskCancelled.
+        """
+        try:
+            return await self.future
+        except asyncio.CancelledError:
+            if self.cancelled:
+                raise TaskCancelled(self.name) from None
+            raise
+
+
+class TaskRunner:
+    """
+    Выполнение блокирующих операций (SQLite, файлы) вне event loop.
+
+    Операции выполняются ограниченным пулом из max_workers потоков,
+    остальные ждут в очереди пула. Обработчики Flet ожидают результат
+    через await runner.run(func, ...), не блокируя цикл; при отмене
+    ожидающей корутины отменяется и задача. Задача выполняется
+    в копии контекста вызывающего кода (как asyncio.to_thread),
+    поэтому её этапы попадают в текущую трассировку.
+
+    Args:
+        max_workers (int): Число потоков пула.
+        metrics (MetricsRegistry): Реестр метрик (необязательно).
+    """
+
+    def __init__(self, max_workers=4, metrics=None):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers,
+                                            thread_name_prefix="io")
+        self._tasks = set()
+
+        metrics = metrics or MetricsRegistry()
+        self._seconds_metric = metrics.histogram(
+            "background_task_seconds", "Background I/O task duration",
+            ["task"])
+        self._active_metric = metrics.gauge(
+            "background_tasks", "Background I/O tasks queued or running")
+        self._cancelled_metric = metrics.counter(
+            "background_tasks_cancelled", "Cancelled background I/O tasks",
+            ["task"])
+
+    def start(self, func, *args, name=None, on_progress=None, **kwargs):
+        """
+        Постановка задачи в пул (вызывается из event loop).
+
+        Args:
+            func (callable): Блокирующая функция.
+            *args: Позиционные аргументы функции.
+            name (str): Имя задачи (по умолчанию имя функции).
+            on_progress (callable): Обработчик прогресса (done, total),
+                                    вызываемый в event loop.
+            **kwargs: Именованные аргументы функции.
+
+        Returns:
+            BackgroundTask: Задача; её можно ожидать через await.
+        """
+        loop = asyncio.get_running_loop()
+        task = BackgroundTask(name or getattr(func, '__name__', 'task'),
+                              loop, on_progress)
+        task.future = loop.run_in_executor(
+            self._executor,
+            functools.partial(contextvars.copy_context().run, self._call,
+                              task, func, args, kwargs)
+        )
+        self._tasks.add(task)
+        self._active_metric.set(len(self._tasks))
+        task.future.add_done_callback(
+            lambda _: self._finished(task)
+        )
+        return task
+
+    async def run(self, func, *args, name=None, on_progress=None, **kwargs):
+        """
+        Выполнение блокирующей функции в пуле и ожидание результата.
+
+        Аргументы те же, что у start().
+
+        Returns:
+            Результат функции.
+
+        Raises:
+            TaskCancelled: Если задача отменена.
+        """
+        task = self.start(func, *args, name=name, on_progress=on_progress,
+                          **kwargs)
+        try:
+            return await task
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+
+    def _call(self, task, func, args, kwargs):
+        """
+        Выполнение задачи в потоке пула.
+        """
+        task.check()
+        _current.task = task
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current.task = None
+            self._seconds_metric.observe(time.perf_counter() - start,
+                                         task=task.name)
+
+    def _finished(self, task):
+        """
+        Учёт завершения задачи (вызывается в event loop).
+        """
+        self._tasks.discard(task)
+        self._active_metric.set(len(self._tasks))
+        if task.cancelled:
+            self._cancelled_metric.inc(task=task.name)
+
+    def cancel_all(self):
+        """
+        Отмена всех задач в очереди и выполняющихся.
+        """
+        for task in list(self._tasks):
+            task.cancel()
+
+    def shutdown(self, wait=True):
+        """
+        Отмена оставшихся задач и остановка пула.
+
+        Args:
+            wait (bool): Дождаться завершения уже выполняющихся задач.
+        """
+        self.cancel_all()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    async def close(self):
+        """
+        shutdown() из event loop: задачи отменяются в цикле, а завершения
+        уже выполняющихся задач пул дожидается в отдельном потоке.
+        """
+        self.cancel_all()
+        await asyncio.to_thread(self._executor.shutdown, wait=True,
+                                cancel_futures=True)
+
+
+class LoopWatchdog:
+    """
+    Сторож зависаний event loop.
+
+    Фоновый поток каждые interval секунд ставит в цикл пустой вызов
+    и ждёт его выполнения. Если цикл не отвечает дольше threshold
+    секунд, запоминается стек потока цикла (место блокирующего
+    вызова), а после восстановления в лог пишется длительность
+    зависания вместе с этим стеком.
+
+    Args:
+        threshold (float): Порог зависания в секундах.
+        interval (float): Интервал проверок в секундах.
+        logger (AppLogger): Логгер (необязательно).
+        metrics (MetricsRegistry): Реестр метрик (необязательно).
+    """
+
+    def __init__(self, threshold=0.25, interval=0.5, logger=None,
+                 metrics=None):
+        self.threshold = threshold
+        self.interval = interval
+        self.logger = logger or AppLogger()
+
+        metrics = metrics or MetricsRegistry()
+        self._stall_metric = metrics.histogram(
+            "event_loop_stall_seconds",
+            "Event loop stalls longer than the watchdog threshold",
+            buckets=(0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+
+        self._loop = None
+        self._loop_thread_id = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def start(self, loop=None):
+        """
+        Запуск сторожа для цикла (вызывается из потока цикла).
+
+        Args:
+            loop (asyncio.AbstractEventLoop): Цикл (по умолчанию текущий).
+        """
+        if self._thread is not None:
+            return
+        self._loop = loop or asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """
+        Остановка сторожа.
+        """
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        """
+        Цикл потока сторожа.
+        """
+        while not self._stop_event.wait(self.interval):
+            beat = threading.Event()
+            sent = time.perf_counter()
+            try:
+                self._loop.call_soon_threadsafe(beat.set)
+            except RuntimeError:
+                # Цикл закрыт
+                return
+            if beat.wait(self.threshold):
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else ""
+            while not beat.wait(self.interval):
+                if self._stop_event.is_set():
+                    return
+            stalled = time.perf_counter() - sent
+            self._stall_metric.observe(stalled)
+            self.logger.warning(
+                "Event loop stalled for %.3f s, blocked at:\n%s",
+                stalled, stack
+            )
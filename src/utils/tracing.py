@@ -0,0 +1,200 @@
+import contextvars  # Текущий span в пределах задачи asyncio
+import itertools   # Счётчик идентификаторов трассировок
+import json        # Запись трассировок в JSONL-файл
+import logging     # Записи очереди вывода span'ов
+import logging.handlers  # Фоновая запись файла через QueueListener
+import queue       # Очередь span'ов для фонового потока записи
+import time        # Измерение длительности этапов
+from collections import deque  # Кольцевой буфер последних трассировок
+from contextlib import contextmanager  # Span как контекстный менеджер
+
+
+class Tracer:
+    """
+    Лёгкая трассировка этапов обработки запроса.
+
+    Внешний span (например, отправка сообщения) открывает трассировку,
+    вложенные span'ы — этапы запроса к API, записи в кэш, аналитики
+    и обновления интерфейса — добавляются в неё с длительностью
+    и смещением от начала. Текущий span хранится в contextvars,
+    поэтому вложенность сохраняется между await и в дочерних задачах.
+
+    Завершённые трассировки попадают в кольцевой буфер traces.
+    Если задан path, каждый span по завершении (и каждая отметка
+    mark()) дописывается отдельной строкой JSONL с trace_id своей
+    трассировки, включая этапы, закончившиеся позже корня (фоновая
+    запись в базу). Сериализацию и запись в файл выполняет фоновый
+    поток QueueListener, как у AppLogger.
+
+    Args:
+        capacity (int): Количество хранимых трассировок.
+        path (str): Путь к JSONL-файлу трассировок (необязательно).
+        enabled (bool): При False span'ы ничего не записывают.
+    """
+
+    def __init__(self, capacity=1000, path=None, enabled=True):
+        self.enabled = enabled
+        self.path = path
+        self.traces = deque(maxlen=capacity)
+
+        # Текущая трассировка: (трассировка, начало, глубина)
+        self._current = contextvars.ContextVar(f"tracer_{id(self)}",
+                                               default=None)
+        self._ids = itertools.count(1)
+
+        # Фоновая запись span'ов в файл
+        self._queue = None
+        self._listener = None
+        if enabled and path:
+            handler = logging.FileHandler(path, encoding="utf-8", delay=True)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._queue = queue.SimpleQueue()
+            self._listener = logging.handlers.QueueListener(self._queue,
+                                                            handler)
+            self._listener.start()
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """
+        Замер этапа обработки запроса.
+
+        Без открытой трассировки span становится её корнем.
+        В блоке можно дополнить атрибуты span'а через возвращаемый
+        словарь (например, код ответа).
+
+        Args:
+            name (str): Название этапа, например "api.request".
+            **attrs: Атрибуты span'а.
+
+        Yields:
+            dict: Атрибуты span'а.
+        """
+        if not self.enabled:
+            yield attrs
+            return
+
+        parent = self._current.get()
+        start = time.perf_counter()
+        if parent is None:
+            trace = {
+                'id': next(self._ids),
+                'name': name,
+                'start': time.time(),
+                'attrs': attrs,
+                'spans': [],
+            }
+            token = self._current.set((trace, start, 0))
+        else:
+            trace, origin, depth = parent
+            token = self._current.set((trace, origin, depth + 1))
+
+        try:
+            yield attrs
+        except BaseException as e:
+            attrs['error'] = type(e).__name__
+            raise
+        finally:
+            self._current.reset(token)
+            duration = (time.perf_counter() - start) * 1000
+            if parent is None:
+                trace['duration_ms'] = duration
+                self.traces.append(trace)
+                self._export(trace, {
+                    'name': name,
+                    'start': trace['start'],
+                    'duration_ms': duration,
+                    'depth': 0,
+                    **attrs
+                })
+            else:
+                self._add_span(trace, {
+                    'name': name,
+                    'offset_ms': (start - origin) * 1000,
+                    'duration_ms': duration,
+                    'depth': depth + 1,
+                    **attrs
+                })
+
+    def mark(self, name: str, **attrs):
+        """
+        Отметка момента внутри текущей трассировки
+        (например, получение первого токена).
+
+        Args:
+            name (str): Название события.
+            **attrs: Атрибуты события.
+        """
+        current = self._current.get() if self.enabled else None
+        if current is None:
+            return
+        trace, origin, depth = current
+        self._add_span(trace, {
+            'name': name,
+            'offset_ms': (time.perf_counter() - origin) * 1000,
+            'duration_ms': 0.0,
+            'depth': depth + 1,
+            **attrs
+        })
+
+    def recent(self, count=None) -> list:
+        """
+        Последние завершённые трассировки от старых к новым.
+
+        Args:
+            count (int): Количество трассировок (по умолчанию все).
+
+        Returns:
+            list: Словари трассировок.
+        """
+        traces = list(self.traces)
+        return traces if count is None else traces[-count:]
+
+    def _add_span(self, trace: dict, span: dict):
+        """
+        Добавление завершённого этапа в трассировку и файл.
+
+        Args:
+            trace (dict): Трассировка.
+            span (dict): Этап.
+        """
+        trace['spans'].append(span)
+        self._export(trace, span)
+
+    def _export(self, trace: dict, span: dict):
+        """
+        Постановка span'а в очередь записи в файл.
+
+        Args:
+            trace (dict): Трассировка span'а.
+            span (dict): Завершённый span.
+        """
+        if self._queue is None:
+            return
+        self._queue.put(logging.makeLogRecord(
+            {'msg': _JsonLine({'trace_id': trace['id'], **span})}
+        ))
+
+    def close(self):
+        """
+        Запись оставшихся span'ов и закрытие файла трассировок.
+        """
+        if self._listener is not None:
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+            self._listener = None
+            self._queue = None
+
+
+class _JsonLine:
+    """
+    Строка JSONL, сериализуемая при выводе (в потоке записи).
+    """
+
+    __slots__ = ('data',)
+
+    def __init__(self, data: dict):
+        self.data = data
+
+    def __str__(self):
+        return json.dumps(self.data, ensure_ascii=False, default=str)